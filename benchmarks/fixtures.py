@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-16
+
+"""
+Upstream API response fixtures for the sensors benchmarks.
+
+Responses follow the structure and the typical size of the real Docker Hub,
+DistroWatch, Vagrant Cloud, GitHub, Reddit and Mattermost responses, but they
+are generated for any number of targets, so the sensors throughput can be
+measured for large organizations too. All values are deterministic.
+
+Response functions return encoded response bodies, the EPEL countme database
+is created on disk with `create_countme_db`.
+"""
+
+import datetime
+import hashlib
+import json
+import random
+import sqlite3
+import typing
+
+
+__all__ = ['create_countme_db', 'distrowatch_page', 'docker_hub_repository',
+           'docker_hub_repositories_page', 'github_releases', 'github_repo',
+           'github_repos_page', 'mattermost_analytics', 'reddit_about',
+           'vagrant_box', 'vagrant_user']
+
+
+LOREM = ('AlmaLinux OS is an open-source, community-driven Linux operating '
+         'system that fills the gap left by the discontinuation of the '
+         'CentOS Linux stable release. ')
+
+COUNTME_OS_NAMES = ('AlmaLinux', 'CentOS Linux', 'CentOS Stream',
+                    'Oracle Linux Server', 'Red Hat Enterprise Linux',
+                    'Rocky Linux', 'Fedora Linux', 'Virtuozzo Linux',
+                    'EuroLinux', 'Scientific Linux')
+
+
+def _number(*seed: typing.Any, maximum: int = 1000000) -> int:
+    digest = hashlib.md5(repr(seed).encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') % maximum
+
+
+def _dumps(data: typing.Any) -> bytes:
+    return json.dumps(data).encode('utf-8')
+
+
+def docker_hub_repository(org: str, name: str) -> bytes:
+    """
+    Returns a Docker Hub repository description.
+
+    Parameters
+    ----------
+    org : str
+        Docker Hub organization name.
+    name : str
+        Docker image name.
+
+    Returns
+    -------
+    bytes
+        JSON encoded response body.
+    """
+    return _dumps(_docker_hub_repository(org, name))
+
+
+def _docker_hub_repository(org: str, name: str) -> dict:
+    return {
+        'user': org, 'name': name, 'namespace': org,
+        'repository_type': 'image', 'status': 1, 'status_description':
+        'active', 'description': f'The official build of {name}.',
+        'is_private': False, 'is_automated': False,
+        'star_count': _number(org, name, 'stars', maximum=1000),
+        'pull_count': _number(org, name, 'pulls', maximum=10 ** 8),
+        'last_updated': '2026-10-14T09:12:41.533948Z',
+        'date_registered': '2021-03-31T12:42:11.276153Z',
+        'collaborator_count': 0, 'affiliation': None, 'hub_user': org,
+        'has_starred': False, 'full_description': LOREM * 30,
+        'permissions': {'read': True, 'write': False, 'admin': False},
+        'media_types': ['application/vnd.oci.image.index.v1+json'],
+        'content_types': ['image'],
+        'categories': [{'name': 'Operating systems', 'slug': 'os'}],
+        'storage_size': _number(org, name, 'size', maximum=10 ** 10)
+    }
+
+
+def docker_hub_repositories_page(org: str, names: typing.List[str],
+                                 next_url: typing.Optional[str]) -> bytes:
+    """
+    Returns a Docker Hub organization repositories list page.
+
+    Parameters
+    ----------
+    org : str
+        Docker Hub organization name.
+    names : list
+        Docker image names listed on the page.
+    next_url : str or None
+        Next page URL.
+
+    Returns
+    -------
+    bytes
+        JSON encoded response body.
+    """
+    results = []
+    for name in names:
+        repo = _docker_hub_repository(org, name)
+        del repo['full_description'], repo['permissions']
+        results.append(repo)
+    return _dumps({'count': len(names), 'next': next_url, 'previous': None,
+                   'results': results})
+
+
+def distrowatch_page(names: typing.List[str], rows: int = 100) -> bytes:
+    """
+    Returns a DistroWatch front page with the page hit ranking table.
+
+    Parameters
+    ----------
+    names : list
+        Distribution names to include into the ranking, the rest of the
+        table is filled with generated names.
+    rows : int, optional
+        Number of ranking table rows.
+
+    Returns
+    -------
+    bytes
+        HTML encoded response body.
+    """
+    names = list(names) + [f'Distribution {i}'
+                           for i in range(len(names), rows)]
+    news = ''.join(
+        f'<tr><td class="NewsText"><b>News item {i}</b><br>{LOREM * 8}'
+        f'<a href="?newsid={i}">read more</a></td></tr>\n'
+        for i in range(25)
+    )
+    ranking = ''.join(
+        f'<tr><th class="phr1">{rank}</th>'
+        f'<td class="phr2"><a href="table.php?distribution={rank}">{name}'
+        f'</a></td><td class="phr3" title="Yesterday: {3000 - rank}">'
+        f'{3000 - rank * 7}<img src="images/alevel.png" alt="="></td></tr>\n'
+        for rank, name in enumerate(names[:rows], 1)
+    )
+    page = (
+        '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.01 Transitional//EN">\n'
+        '<html><head><title>DistroWatch.com: Put the fun back into '
+        'computing.</title></head><body>\n'
+        '<table class="Logo"><tr><td>\n'
+        f'<table class="News">{news}</table>\n'
+        '</td><td>\n'
+        '<table class="News" style="direction: ltr">\n'
+        '<tr><th class="News" colspan="3">Page Hit Ranking</th></tr>\n'
+        '<tr><th class="News">Rank</th><th class="News">Distribution</th>'
+        '<th class="News">HPD*</th></tr>\n'
+        f'{ranking}</table>\n'
+        # the rest of the page which isn't needed by the sensor
+        f'<table class="News">{news}{news}</table>\n'
+        '</td></tr></table></body></html>\n'
+    )
+    return page.encode('utf-8')
+
+
+def vagrant_box(org: str, name: str, versions: int = 10) -> bytes:
+    """
+    Returns a Vagrant Cloud box description with its versions.
+
+    Parameters
+    ----------
+    org : str
+        Vagrant Cloud organization name.
+    name : str
+        Vagrant box name.
+    versions : int, optional
+        Number of box versions.
+
+    Returns
+    -------
+    bytes
+        JSON encoded response body.
+    """
+    return _dumps(_vagrant_box(org, name, versions))
+
+
+def _vagrant_box(org: str, name: str, versions: int) -> dict:
+    box = {
+        'created_at': '2021-03-30T19:19:22.516Z',
+        'updated_at': '2026-10-12T11:22:31.178Z',
+        'tag': f'{org}/{name}', 'name': name, 'username': org,
+        'short_description': f'AlmaLinux OS {name} official Vagrant box',
+        'description_html': f'<p>{LOREM * 4}</p>\n',
+        'description_markdown': LOREM * 4, 'private': False,
+        'downloads': _number(org, name, 'downloads', maximum=10 ** 7)
+    }
+    box['versions'] = [
+        {
+            'version': f'{name}.{i}.20260{i % 9 + 1}01',
+            'status': 'active', 'description_html': '<p>Updates</p>\n',
+            'created_at': '2026-01-01T00:00:00.000Z',
+            'downloads': _number(org, name, i, maximum=10 ** 5),
+            'providers': [
+                {'name': provider, 'hosted': True,
+                 'checksum': hashlib.sha256(provider.encode()).hexdigest(),
+                 'checksum_type': 'sha256', 'architecture': 'amd64',
+                 'downloads': _number(org, name, i, provider,
+                                      maximum=10 ** 5),
+                 'original_url': None,
+                 'download_url': f'https://vagrantcloud.com/{org}/boxes/'
+                                 f'{name}/versions/{i}/providers/{provider}'
+                                 f'/amd64/vagrant.box'}
+                for provider in ('hyperv', 'libvirt', 'virtualbox',
+                                 'vmware_desktop')
+            ]
+        }
+        for i in range(versions)
+    ]
+    return box
+
+
+def vagrant_user(org: str, names: typing.List[str]) -> bytes:
+    """
+    Returns a Vagrant Cloud organization description with its boxes list.
+
+    Parameters
+    ----------
+    org : str
+        Vagrant Cloud organization name.
+    names : list
+        Vagrant box names.
+
+    Returns
+    -------
+    bytes
+        JSON encoded response body.
+    """
+    boxes = []
+    for name in names:
+        box = _vagrant_box(org, name, 1)
+        box['current_version'] = box.pop('versions')[0]
+        boxes.append(box)
+    return _dumps({'username': org, 'avatar_url': None,
+                   'profile_html': f'<p>{LOREM}</p>\n',
+                   'profile_markdown': LOREM, 'boxes': boxes})
+
+
+def github_repo(org: str, name: str) -> bytes:
+    """
+    Returns a GitHub repository description.
+
+    Parameters
+    ----------
+    org : str
+        GitHub organization name.
+    name : str
+        GitHub repository name.
+
+    Returns
+    -------
+    bytes
+        JSON encoded response body.
+    """
+    repo = _github_repo(org, name)
+    repo['subscribers_count'] = _number(org, name, 'subscribers',
+                                        maximum=300)
+    repo['network_count'] = repo['forks_count']
+    return _dumps(repo)
+
+
+def _github_repo(org: str, name: str) -> dict:
+    # a repository as it is listed in an organization repositories list
+    api_url = f'https://api.github.com/repos/{org}/{name}'
+    repo = {
+        'id': _number(org, name), 'node_id': 'MDEwOlJlcG9zaXRvcnkz',
+        'name': name, 'full_name': f'{org}/{name}', 'private': False,
+        'owner': {'login': org, 'id': _number(org), 'type': 'Organization',
+                  'url': f'https://api.github.com/users/{org}',
+                  'html_url': f'https://github.com/{org}'},
+        'html_url': f'https://github.com/{org}/{name}',
+        'description': LOREM, 'fork': False, 'url': api_url,
+        'created_at': '2021-01-07T12:47:25Z',
+        'updated_at': '2026-10-15T08:01:12Z',
+        'pushed_at': '2026-10-15T07:59:59Z', 'homepage': None,
+        'size': _number(org, name, 'size', maximum=10 ** 6),
+        'stargazers_count': _number(org, name, 'stars', maximum=10 ** 4),
+        'watchers_count': _number(org, name, 'stars', maximum=10 ** 4),
+        'language': 'Python', 'has_issues': True, 'has_wiki': False,
+        'forks_count': _number(org, name, 'forks', maximum=10 ** 3),
+        'archived': False, 'disabled': False,
+        'open_issues_count': _number(org, name, 'issues', maximum=500),
+        'license': {'key': 'gpl-3.0', 'name': 'GNU General Public License '
+                                              'v3.0', 'spdx_id': 'GPL-3.0'},
+        'topics': ['almalinux', 'linux', 'rhel'], 'visibility': 'public',
+        'default_branch': 'main'
+    }
+    repo['forks'] = repo['forks_count']
+    repo['open_issues'] = repo['open_issues_count']
+    repo['watchers'] = repo['watchers_count']
+    for rel in ('forks', 'keys', 'collaborators', 'teams', 'hooks',
+                'issue_events', 'events', 'assignees', 'branches', 'tags',
+                'blobs', 'git_tags', 'git_refs', 'trees', 'statuses',
+                'languages', 'stargazers', 'contributors', 'subscribers',
+                'subscription', 'commits', 'git_commits', 'comments',
+                'issue_comment', 'contents', 'compare', 'merges', 'archive',
+                'downloads', 'issues', 'pulls', 'milestones',
+                'notifications', 'labels', 'releases', 'deployments'):
+        repo[f'{rel}_url'] = f'{api_url}/{rel}'
+    return repo
+
+
+def github_repos_page(org: str, names: typing.List[str]) -> bytes:
+    """
+    Returns a GitHub organization repositories list page.
+
+    Parameters
+    ----------
+    org : str
+        GitHub organization name.
+    names : list
+        GitHub repository names listed on the page.
+
+    Returns
+    -------
+    bytes
+        JSON encoded response body.
+    """
+    return _dumps([_github_repo(org, name) for name in names])
+
+
+def github_releases(org: str, name: str, releases: int = 10) -> bytes:
+    """
+    Returns a GitHub repository releases list page.
+
+    Parameters
+    ----------
+    org : str
+        GitHub organization name.
+    name : str
+        GitHub repository name.
+    releases : int, optional
+        Number of releases.
+
+    Returns
+    -------
+    bytes
+        JSON encoded response body.
+    """
+    return _dumps([
+        {'id': _number(org, name, i), 'tag_name': f'v{i}.0',
+         'name': f'Release {i}.0', 'draft': False, 'prerelease': False,
+         'created_at': '2026-01-01T00:00:00Z', 'body': LOREM * 5,
+         'assets': [
+             {'name': f'{name}-{i}.0-{arch}.tar.gz', 'state': 'uploaded',
+              'content_type': 'application/gzip',
+              'size': _number(org, name, i, arch),
+              'download_count': _number(org, name, i, arch, maximum=1000),
+              'browser_download_url': f'https://github.com/{org}/{name}/'
+                                      f'releases/download/v{i}.0/{name}-'
+                                      f'{i}.0-{arch}.tar.gz'}
+             for arch in ('x86_64', 'aarch64', 'ppc64le', 's390x')
+         ]}
+        for i in range(releases)
+    ])
+
+
+def reddit_about(subreddit: str) -> bytes:
+    """
+    Returns a subreddit description.
+
+    Parameters
+    ----------
+    subreddit : str
+        Subreddit name.
+
+    Returns
+    -------
+    bytes
+        JSON encoded response body.
+    """
+    return _dumps(_reddit_about(subreddit))
+
+
+def reddit_info(subreddits: typing.List[str]) -> bytes:
+    """
+    Returns a subreddits listing of the Reddit `/api/info` endpoint.
+
+    Listings don't contain active users counts.
+
+    Parameters
+    ----------
+    subreddits : list
+        Subreddit names.
+
+    Returns
+    -------
+    bytes
+        JSON encoded response body.
+    """
+    return _dumps({
+        'kind': 'Listing',
+        'data': {'after': None, 'dist': len(subreddits), 'modhash': '',
+                 'geo_filter': '', 'before': None,
+                 'children': [_reddit_listing_item(name)
+                              for name in subreddits]}
+    })
+
+
+def _reddit_listing_item(subreddit: str) -> dict:
+    item = _reddit_about(subreddit)
+    item['data'].update(active_user_count=None, accounts_active=None,
+                        accounts_active_is_fuzzed=False)
+    return item
+
+
+def _reddit_about(subreddit: str) -> dict:
+    return {
+        'kind': 't5',
+        'data': {
+            'display_name': subreddit, 'title': f'{subreddit} community',
+            'name': f't5_{_number(subreddit):x}',
+            'subscribers': _number(subreddit, 'subscribers'),
+            'active_user_count': _number(subreddit, 'active',
+                                         maximum=10000),
+            # Reddit hides small active users counts
+            'accounts_active_is_fuzzed': _number(subreddit) % 4 == 0,
+            'accounts_active': _number(subreddit, 'active', maximum=10000),
+            'public_description': LOREM, 'description': LOREM * 10,
+            'description_html': f'<div class="md"><p>{LOREM * 10}</p></div>',
+            'submit_text': LOREM * 2, 'lang': 'en', 'over18': False,
+            'subreddit_type': 'public', 'created_utc': 1610000000.0,
+            'url': f'/r/{subreddit}/', 'icon_img': '', 'header_img': None,
+            'user_is_subscriber': False, 'allow_images': True,
+            'allow_videos': True, 'wiki_enabled': True
+        }
+    }
+
+
+def mattermost_analytics(name: str = 'standard',
+                         team_id: typing.Optional[str] = None,
+                         days: int = 30) -> bytes:
+    """
+    Returns a Mattermost server analytics report.
+
+    Parameters
+    ----------
+    name : str, optional
+        Report name: standard or a daily report (e.g. post_counts_day).
+    team_id : str, optional
+        Team identifier.
+    days : int, optional
+        Number of days in a daily report.
+
+    Returns
+    -------
+    bytes
+        JSON encoded response body.
+    """
+    if name != 'standard':
+        today = datetime.date.today()
+        return _dumps([
+            {'name': str(today - datetime.timedelta(days=i)),
+             'value': _number(name, team_id, i, maximum=10 ** 4)}
+            for i in range(days)
+        ])
+    names = ('channel_open_count', 'channel_private_count', 'post_count',
+             'unique_user_count', 'team_count', 'total_websocket_connections',
+             'total_master_db_connections', 'total_read_db_connections',
+             'daily_active_users', 'monthly_active_users',
+             'inactive_user_count', 'total_file_count', 'total_file_size')
+    return _dumps([{'name': name,
+                    'value': _number(name, team_id, maximum=10 ** 5)}
+                   for name in names])
+
+
+def mattermost_teams_page(names: typing.List[str]) -> bytes:
+    """
+    Returns a Mattermost server teams list page.
+
+    Parameters
+    ----------
+    names : list
+        Team names.
+
+    Returns
+    -------
+    bytes
+        JSON encoded response body.
+    """
+    return _dumps([{'id': hashlib.md5(name.encode('utf-8')).hexdigest(),
+                    'name': name,
+                    'display_name': name.title(),
+                    'type': 'O',
+                    'allow_open_invite': True}
+                   for name in names])
+
+
+def create_countme_db(db_path: str, weeks: int = 260,
+                      os_names: typing.Sequence[str] = COUNTME_OS_NAMES
+                      ) -> int:
+    """
+    Creates a synthetic EPEL countme `countme_totals` database.
+
+    Every week has records for each OS name, OS version, repository, system
+    age and architecture combination, the same way as the real database
+    does (which is about 2 GiB large).
+
+    Parameters
+    ----------
+    db_path : str
+        Database file path.
+    weeks : int, optional
+        Number of weeks to generate.
+    os_names : list, optional
+        OS names to generate.
+
+    Returns
+    -------
+    int
+        Number of generated records.
+    """
+    rnd = random.Random(weeks)
+    last_week = 2860
+    rows = (
+        (rnd.randint(1, 10000), weeknum, os_name, version, sys_age,
+         repo_tag, arch)
+        for weeknum in range(last_week - weeks, last_week + 1)
+        for os_name in os_names
+        for version in ('7', '8', '9', '10')
+        for repo_tag in (f'epel-{version}', f'epel-testing-{version}',
+                         f'epel-next-{version}', 'epel-modular')
+        for sys_age in ('0', '1', '2', '3')
+        for arch in ('x86_64', 'aarch64', 'ppc64le')
+    )
+    with sqlite3.connect(db_path) as con:
+        con.executescript("""
+          DROP TABLE IF EXISTS countme_totals;
+          CREATE TABLE countme_totals (
+            hits INTEGER NOT NULL,
+            weeknum TEXT NOT NULL,
+            os_name TEXT NOT NULL,
+            os_version TEXT NOT NULL,
+            sys_age TEXT NOT NULL,
+            repo_tag TEXT NOT NULL,
+            repo_arch TEXT NOT NULL
+          );
+        """)
+        con.executemany('INSERT INTO countme_totals VALUES '
+                        '(?, ?, ?, ?, ?, ?, ?)', rows)
+        count = con.execute('SELECT count(*) FROM countme_totals').fetchone()
+    con.close()
+    return count[0]
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-16
+
+"""
+In-process MQTT broker stub for the sensors benchmarks.
+
+The stub implements just enough of MQTT 3.1.1 to accept connections from the
+paho-mqtt client and acknowledge published messages (QoS 0, 1 and 2), the
+messages are counted and dropped. Subscriptions are not supported.
+"""
+
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import typing
+
+
+__all__ = ['MQTTBrokerStub']
+
+
+CONNECT, CONNACK, PUBLISH, PUBACK, PUBREC, PUBREL, PUBCOMP = range(1, 8)
+PINGREQ, PINGRESP, DISCONNECT = 12, 13, 14
+
+
+class _MQTTRequestHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        sock = self.request
+        broker = self.server.broker
+        try:
+            while True:
+                packet_type, flags, body = self._read_packet(sock)
+                if packet_type == CONNECT:
+                    sock.sendall(bytes((CONNACK << 4, 2, 0, 0)))
+                elif packet_type == PUBLISH:
+                    qos = (flags >> 1) & 3
+                    topic_len = struct.unpack('>H', body[:2])[0]
+                    topic = body[2:2 + topic_len].decode('utf-8')
+                    payload = body[2 + topic_len + (2 if qos else 0):]
+                    broker.add_message(topic, payload)
+                    if qos:
+                        packet_id = body[2 + topic_len:4 + topic_len]
+                        ack = PUBACK if qos == 1 else PUBREC
+                        sock.sendall(bytes((ack << 4, 2)) + packet_id)
+                elif packet_type == PUBREL:
+                    sock.sendall(bytes((PUBCOMP << 4, 2)) + body[:2])
+                elif packet_type == PINGREQ:
+                    sock.sendall(bytes((PINGRESP << 4, 0)))
+                elif packet_type == DISCONNECT:
+                    return
+        except (ConnectionError, EOFError, OSError):
+            pass
+
+    def _read_packet(self, sock: socket.socket
+                     ) -> typing.Tuple[int, int, bytes]:
+        header = self._read(sock, 1)[0]
+        length = 0
+        multiplier = 1
+        while True:
+            byte = self._read(sock, 1)[0]
+            length += (byte & 0x7f) * multiplier
+            if not byte & 0x80:
+                break
+            multiplier *= 128
+        return header >> 4, header & 0x0f, self._read(sock, length)
+
+    @staticmethod
+    def _read(sock: socket.socket, size: int) -> bytes:
+        data = b''
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise EOFError('connection is closed')
+            data += chunk
+        return data
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn,
+                          socketserver.TCPServer):
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients close idle keep-alive connections at any time
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class MQTTBrokerStub:
+
+    """
+    MQTT broker stub which listens on a random loopback interface port.
+    """
+
+    def __init__(self, keep_messages: bool = False):
+        """
+        MQTTBrokerStub initialization.
+
+        Parameters
+        ----------
+        keep_messages : bool, optional
+            Keep received messages in the `messages` list, otherwise they
+            are only counted.
+        """
+        self.keep_messages = keep_messages
+        self.messages = []
+        self.received = 0
+        self._lock = threading.Lock()
+        self._server = _ThreadingTCPServer(('127.0.0.1', 0),
+                                           _MQTTRequestHandler)
+        self._server.broker = self
+
+    @property
+    def port(self) -> int:
+        """Server TCP port."""
+        return self._server.server_address[1]
+
+    def add_message(self, topic: str, payload: bytes):
+        """Registers a received message."""
+        with self._lock:
+            self.received += 1
+            if self.keep_messages:
+                self.messages.append((topic, payload))
+
+    def start(self):
+        """Starts the broker in a background thread."""
+        threading.Thread(target=self._server.serve_forever,
+                         daemon=True).start()
+
+    def stop(self):
+        """Stops the broker."""
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-16
+
+"""
+AlmaLinux Witness sensors benchmarks.
+
+Every sensor `main()` function is run for N targets and its statistics
+function is run for a single target against a local fake upstream server
+(see the `upstream` module) and an in-process MQTT broker stub, nothing is
+sent over the network. The EPEL sensor uses a synthetic countme database.
+
+The following data is reported for every benchmark:
+
+  * median, min, max - run time in milliseconds
+  * targets/s - number of processed targets per second for the median run
+  * requests, messages - number of upstream requests and MQTT messages
+    per run
+  * peak KiB - Python memory allocations peak during a run, measured with
+    tracemalloc in a separate run
+
+Execution examples:
+
+    $ python3 benchmarks/run_benchmarks.py
+    $ python3 benchmarks/run_benchmarks.py -n 500 -r 10 -s docker_hub epel
+    $ python3 benchmarks/run_benchmarks.py --latency 0.05 --json before.json
+    $ python3 benchmarks/run_benchmarks.py --compare before.json
+
+The `--latency` argument delays every upstream response to emulate a network
+round trip, so that the requests concurrency is taken into account.
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing
+
+from almawitness.registry import BUILTIN_SENSORS, load_sensor
+from almawitness.sensors import common
+
+from fixtures import create_countme_db
+from mqtt_stub import MQTTBrokerStub
+from upstream import FakeUpstream, UpstreamHTTPClient
+
+
+class Benchmark:
+
+    """Single benchmark: a sensor function call which is timed."""
+
+    def __init__(self, sensor: str, name: str, targets: int,
+                 run: typing.Callable[[], typing.Any],
+                 setup: typing.Optional[typing.Callable[[], None]] = None):
+        """
+        Benchmark initialization.
+
+        Parameters
+        ----------
+        sensor : str
+            Sensor name.
+        name : str
+            Benchmark name.
+        targets : int
+            Number of targets processed by a run.
+        run : callable
+            Function to benchmark.
+        setup : callable, optional
+            Function which is called before every run, it isn't timed.
+        """
+        self.sensor = sensor
+        self.name = name
+        self.targets = targets
+        self.run = run
+        self.setup = setup or (lambda: None)
+
+
+def init_arg_parser() -> argparse.ArgumentParser:
+    """
+    Creates and initializes a command line arguments parser.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        Command line arguments parser.
+    """
+    arg_parser = argparse.ArgumentParser(
+        description='AlmaLinux Witness sensors benchmarks'
+    )
+    arg_parser.add_argument('-s', '--sensor', nargs='+',
+                            choices=sorted(BUILTIN_SENSORS),
+                            help='Sensors to benchmark. Default is all')
+    arg_parser.add_argument('-n', '--targets', default=50, type=int,
+                            help='Number of targets (images, boxes, '
+                                 'repositories, subreddits) per sensor '
+                                 'run. Default is 50')
+    arg_parser.add_argument('-r', '--repeat', default=5, type=int,
+                            help='Number of timed runs. Default is 5')
+    arg_parser.add_argument('-w', '--warmup', default=1, type=int,
+                            help='Number of untimed runs. Default is 1')
+    arg_parser.add_argument('--latency', default=0, type=float,
+                            help='Upstream response delay in seconds. '
+                                 'Default is 0')
+    arg_parser.add_argument('--countme-weeks', default=260, type=int,
+                            help='Number of weeks in the synthetic EPEL '
+                                 'countme database. Default is 260')
+    arg_parser.add_argument('--json', metavar='FILE',
+                            help='Save results to a JSON file')
+    arg_parser.add_argument('--compare', metavar='FILE',
+                            help='Compare results with previously saved '
+                                 'ones')
+    return arg_parser
+
+
+def get_benchmarks(sensors: typing.List[str], targets: int, mqtt_port: int,
+                   work_dir: str) -> typing.List[Benchmark]:
+    """
+    Returns benchmarks for the specified sensors.
+
+    Parameters
+    ----------
+    sensors : list
+        Sensor names.
+    targets : int
+        Number of targets per sensor run.
+    mqtt_port : int
+        MQTT broker stub port.
+    work_dir : str
+        Working directory which contains the countme database.
+
+    Returns
+    -------
+    list
+        List of benchmarks.
+    """
+    run_args = ['-s', '127.0.0.1', '-p', str(mqtt_port), '--deadline', '0',
+                '--no-self-stats']
+
+    def names(prefix: str) -> typing.List[str]:
+        return [f'{prefix}-{i}' for i in range(targets)]
+
+    def main(module, *args):
+        return lambda: module.main(list(args) + run_args)
+    #
+    benchmarks = []
+    if 'distrowatch' in sensors:
+        distrowatch = load_sensor('distrowatch')
+        spans = [str(span) for span in sorted(distrowatch.DATASPAN_TTL)]
+        benchmarks += [
+            Benchmark('distrowatch', 'get_distro_ranking', 1,
+                      distrowatch.get_distro_ranking),
+            Benchmark('distrowatch', 'main --span (all)', len(spans),
+                      main(distrowatch, '-m', 'almalinux=almalinux', '-m',
+                           'rocky=rocky', '--no-cache', '--span', *spans))
+        ]
+    if 'docker_hub' in sensors:
+        docker_hub = load_sensor('docker_hub')
+        benchmarks += [
+            Benchmark('docker_hub', 'get_image_stats', 1,
+                      functools.partial(docker_hub.get_image_stats,
+                                        'almalinux', 'image-0')),
+            Benchmark('docker_hub', 'main -i', targets,
+                      main(docker_hub, '-o', 'almalinux', '-i',
+                           *names('image'))),
+            Benchmark('docker_hub', 'main --all', targets,
+                      main(docker_hub, '-o', 'almalinux', '--all'))
+        ]
+    if 'epel' in sensors:
+        epel = load_sensor('epel')
+        db_path = os.path.join(work_dir, 'epel', 'totals.db')
+        queries = ['-m', 'almalinux=almalinux%', '-m', 'rocky=rocky%',
+                   '-m', 'centos=centos%']
+
+        def clean_epel_dir():
+            shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+            os.makedirs(os.path.dirname(db_path))
+
+        def prepare_epel_db():
+            if not os.path.exists(f'{db_path}.summary'):
+                clean_epel_dir()
+                epel.build_summary_db(epel.download_db(db_path))
+        #
+        benchmarks += [
+            Benchmark('epel', 'main (download, summary)', 3,
+                      main(epel, '-d', db_path, *queries),
+                      setup=clean_epel_dir),
+            Benchmark('epel', 'get_epel_stats', 1,
+                      lambda: list(epel.get_epel_stats(db_path, 'almalinux%')),
+                      setup=prepare_epel_db),
+            Benchmark('epel', 'main --backfill', 3,
+                      main(epel, '-d', db_path, '--backfill', *queries),
+                      setup=prepare_epel_db)
+        ]
+    if 'github_repo' in sensors:
+        github = load_sensor('github_repo')
+        benchmarks += [
+            Benchmark('github_repo', 'get_github_repo_stats', 1,
+                      functools.partial(github.get_github_repo_stats,
+                                        'almalinux', 'repo-0')),
+            Benchmark('github_repo', 'main -r', targets,
+                      main(github, '-o', 'almalinux', '-r', *names('repo'))),
+            Benchmark('github_repo', 'main --all --releases', targets,
+                      main(github, '-o', 'almalinux', '--all', '--releases'))
+        ]
+    if 'mattermost' in sensors:
+        mattermost = load_sensor('mattermost')
+        benchmarks += [
+            Benchmark('mattermost', 'get_mattermost_stats', 1,
+                      functools.partial(mattermost.get_mattermost_stats,
+                                        'chat.example.org', 'token')),
+            Benchmark('mattermost', 'main', 1,
+                      main(mattermost, '-c', 'chat.example.org', '-t',
+                           'token')),
+            Benchmark('mattermost', 'main --teams', targets + 1,
+                      main(mattermost, '-c', 'chat.example.org', '-t',
+                           'token', '--teams'))
+        ]
+    if 'reddit' in sensors:
+        reddit = load_sensor('reddit')
+        benchmarks += [
+            Benchmark('reddit', 'get_reddit_stats', 1,
+                      functools.partial(reddit.get_reddit_stats,
+                                        'AlmaLinux')),
+            Benchmark('reddit', 'main -r', targets,
+                      main(reddit, '-r', *names('subreddit'))),
+            Benchmark('reddit', 'main -r --active-users', targets,
+                      main(reddit, '-r', *names('subreddit'),
+                           '--active-users'))
+        ]
+    if 'vagrantup' in sensors:
+        vagrant = load_sensor('vagrantup')
+        benchmarks += [
+            Benchmark('vagrantup', 'get_box_versions_stats', 1,
+                      functools.partial(vagrant.get_box_versions_stats,
+                                        'almalinux', 'box-0')),
+            Benchmark('vagrantup', 'main --all', targets,
+                      main(vagrant, '-o', 'almalinux', '--all')),
+            Benchmark('vagrantup', 'main --all --versions', targets,
+                      main(vagrant, '-o', 'almalinux', '--all', '--versions'))
+        ]
+    return benchmarks
+
+
+def run_benchmark(benchmark: Benchmark, upstream: FakeUpstream,
+                  broker: MQTTBrokerStub, repeat: int,
+                  warmup: int) -> typing.Dict[str, typing.Any]:
+    """
+    Runs a benchmark.
+
+    Parameters
+    ----------
+    benchmark : Benchmark
+        Benchmark to run.
+    upstream : FakeUpstream
+        Fake upstream server.
+    broker : MQTTBrokerStub
+        MQTT broker stub.
+    repeat : int
+        Number of timed runs.
+    warmup : int
+        Number of untimed runs.
+
+    Returns
+    -------
+    dict
+        Benchmark results.
+    """
+    for _ in range(warmup):
+        benchmark.setup()
+        benchmark.run()
+    times = []
+    requests = messages = 0
+    for _ in range(repeat):
+        benchmark.setup()
+        requests, messages = upstream.requests, broker.received
+        start = time.perf_counter()
+        benchmark.run()
+        times.append(time.perf_counter() - start)
+        requests = upstream.requests - requests
+        messages = broker.received - messages
+    benchmark.setup()
+    tracemalloc.start()
+    try:
+        benchmark.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    median = statistics.median(times)
+    return {'sensor': benchmark.sensor, 'name': benchmark.name,
+            'targets': benchmark.targets,
+            'median': median, 'min': min(times), 'max': max(times),
+            'throughput': benchmark.targets / median if median else 0.0,
+            'requests': requests, 'messages': messages, 'peak': peak}
+
+
+def print_results(results: typing.List[typing.Dict[str, typing.Any]],
+                  baseline: typing.Optional[typing.List[dict]] = None):
+    """
+    Prints benchmark results as a table.
+
+    Parameters
+    ----------
+    results : list
+        Benchmark results.
+    baseline : list, optional
+        Previous benchmark results, the median time and peak memory changes
+        are printed if specified.
+    """
+    previous = {(r['sensor'], r['name'], r['targets']): r
+                for r in baseline or ()}
+    header = (f'{"sensor":<12} {"benchmark":<28} {"targets":>7} '
+              f'{"median":>9} {"min":>9} {"max":>9} {"targets/s":>10} '
+              f'{"requests":>8} {"messages":>8} {"peak KiB":>9}')
+    if baseline is not None:
+        header += f' {"time":>7} {"memory":>7}'
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        line = (f'{r["sensor"]:<12} {r["name"]:<28} {r["targets"]:>7} '
+                f'{r["median"] * 1000:>9.2f} {r["min"] * 1000:>9.2f} '
+                f'{r["max"] * 1000:>9.2f} {r["throughput"]:>10.1f} '
+                f'{r["requests"]:>8} {r["messages"]:>8} '
+                f'{r["peak"] / 1024:>9.1f}')
+        if baseline is not None:
+            prev = previous.get((r['sensor'], r['name'], r['targets']))
+            if prev:
+                line += (f' {_format_change(r["median"], prev["median"])}'
+                         f' {_format_change(r["peak"], prev["peak"])}')
+        print(line)
+
+
+def _format_change(value: float, previous: float) -> str:
+    if not previous:
+        return f'{"n/a":>7}'
+    return f'{(value - previous) / previous * 100:>+6.1f}%'
+
+
+def main(sys_args: typing.List[str]):
+    arg_parser = init_arg_parser()
+    args = arg_parser.parse_args(sys_args)
+    sensors = args.sensor or sorted(BUILTIN_SENSORS)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as fd:
+            baseline = json.load(fd)
+    with tempfile.TemporaryDirectory(prefix='witness-bench-') as work_dir:
+        # run locks and caches must not interfere with a real installation
+        common.CACHE_DIR = os.path.join(work_dir, 'cache')
+        countme_db_path = None
+        if 'epel' in sensors:
+            countme_db_path = os.path.join(work_dir, 'countme-totals.db')
+            start = time.perf_counter()
+            records = create_countme_db(countme_db_path, args.countme_weeks)
+            sys.stderr.write(
+                f'created countme database with {records} records '
+                f'({os.stat(countme_db_path).st_size / 2 ** 20:.1f} MiB) in '
+                f'{time.perf_counter() - start:.1f} seconds\n'
+            )
+        upstream = FakeUpstream(args.targets, args.latency, countme_db_path)
+        broker = MQTTBrokerStub()
+        upstream.start()
+        broker.start()
+        common._http_client = UpstreamHTTPClient(
+            upstream.port, rate_limiter=common.RateLimiter(),
+            circuit_breaker=common.CircuitBreaker(),
+            timings=common.get_timings()
+        )
+        results = []
+        try:
+            for benchmark in get_benchmarks(sensors, args.targets,
+                                            broker.port, work_dir):
+                sys.stderr.write(f'running {benchmark.sensor} '
+                                 f'{benchmark.name}\n')
+                # the EPEL sensor reports every message to stdout
+                with open(os.devnull, 'w') as devnull, \
+                        contextlib.redirect_stdout(devnull):
+                    results.append(run_benchmark(benchmark, upstream, broker,
+                                                 args.repeat, args.warmup))
+        finally:
+            common._http_client.close()
+            upstream.stop()
+            broker.stop()
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as fd:
+            json.dump(results, fd, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
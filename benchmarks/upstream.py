@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-16
+
+"""
+Local stand-in for the upstream APIs used by the sensors.
+
+`FakeUpstream` is an HTTP server which serves the `fixtures` responses for
+the Docker Hub, DistroWatch, Vagrant Cloud, GitHub, Reddit and Mattermost
+request paths and the EPEL countme database file (with byte ranges support).
+`UpstreamHTTPClient` is an `HTTPClient` which sends requests to any host to
+the fake server, so the sensors code is used unmodified.
+"""
+
+import http.client
+import http.server
+import os
+import re
+import socketserver
+import sys
+import threading
+import time
+import typing
+import urllib.parse
+
+from almawitness.sensors.common import HTTPClient, HTTP_CHUNK_SIZE
+
+import fixtures
+
+
+__all__ = ['FakeUpstream', 'UpstreamHTTPClient']
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           http.server.HTTPServer):
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients close idle keep-alive connections at any time
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _UpstreamRequestHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self, send_body: bool):
+        upstream = self.server.upstream
+        upstream.count_request()
+        if upstream.latency:
+            time.sleep(upstream.latency)
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == upstream.COUNTME_PATH:
+            self._send_file(upstream.countme_db_path, send_body)
+            return
+        response = upstream.get_response(url.path, url.query)
+        if response is None:
+            self._send(404, 'application/json', b'{"message": "Not Found"}',
+                       send_body)
+        else:
+            self._send(200, *response, send_body=send_body)
+
+    def _send(self, status: int, content_type: str, body: bytes,
+              send_body: bool = True):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _send_file(self, file_path: typing.Optional[str], send_body: bool):
+        if not file_path:
+            self._send(404, 'text/plain', b'Not Found', send_body)
+            return
+        size = os.stat(file_path).st_size
+        start, end = 0, size - 1
+        re_rslt = re.match(r'^bytes=(\d+)-(\d*)$',
+                           self.headers.get('Range', ''))
+        if re_rslt:
+            start = int(re_rslt.group(1))
+            if re_rslt.group(2):
+                end = min(int(re_rslt.group(2)), end)
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', f'"{size:x}"')
+        self.end_headers()
+        if not send_body:
+            return
+        with open(file_path, 'rb') as fd:
+            fd.seek(start)
+            left = end - start + 1
+            while left > 0:
+                chunk = fd.read(min(HTTP_CHUNK_SIZE, left))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                left -= len(chunk)
+
+
+class FakeUpstream:
+
+    """
+    Fake upstream APIs HTTP server.
+
+    Organization listings (Docker Hub repositories, Vagrant Cloud boxes,
+    GitHub repositories, Mattermost teams) contain `targets` items named
+    `{prefix}-{index}`, e.g. `image-0`, `box-0`, `repo-0` and `team-0`.
+    Response bodies are rendered once and reused, so that the server doesn't
+    affect the sensors measurements much.
+    """
+
+    COUNTME_PATH = '/csv-reports/countme/totals.db'
+
+    DOCKER_HUB_PAGE_SIZE = 100
+
+    def __init__(self, targets: int = 10, latency: float = 0,
+                 countme_db_path: typing.Optional[str] = None):
+        """
+        FakeUpstream initialization.
+
+        Parameters
+        ----------
+        targets : int, optional
+            Number of items in organization listings.
+        latency : float, optional
+            Delay in seconds before every response, it emulates a network
+            round trip time.
+        countme_db_path : str, optional
+            EPEL countme database file path.
+        """
+        self.targets = targets
+        self.latency = latency
+        self.countme_db_path = countme_db_path
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._responses = {}
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0),
+                                            _UpstreamRequestHandler)
+        self._server.upstream = self
+        self._routes = [
+            (r'^/v2/repositories/([^/]+)/([^/]+)/$',
+             self._docker_hub_repository),
+            (r'^/v2/repositories/([^/]+)/$', self._docker_hub_repositories),
+            (r'^/index\.php$', self._distrowatch_page),
+            (r'^/api/v1/user/([^/]+)/?$', self._vagrant_user),
+            (r'^/api/v1/box/([^/]+)/([^/]+)$', self._vagrant_box),
+            (r'^/orgs/([^/]+)/repos$', self._github_repos),
+            (r'^/repos/([^/]+)/([^/]+)$', self._github_repo),
+            (r'^/repos/([^/]+)/([^/]+)/releases$', self._github_releases),
+            (r'^/r/([^/]+)/about\.json$', self._reddit_about),
+            (r'^/api/info\.json$', self._reddit_info),
+            (r'^/api/v4/analytics/old$', self._mattermost_analytics),
+            (r'^/api/v4/teams$', self._mattermost_teams),
+        ]
+
+    @property
+    def port(self) -> int:
+        """Server TCP port."""
+        return self._server.server_address[1]
+
+    def start(self):
+        """Starts the server in a background thread."""
+        threading.Thread(target=self._server.serve_forever,
+                         daemon=True).start()
+
+    def stop(self):
+        """Stops the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count_request(self):
+        """Increments the served requests counter."""
+        with self._lock:
+            self.requests += 1
+
+    def get_response(self, path: str, query: str
+                     ) -> typing.Optional[typing.Tuple[str, bytes]]:
+        """
+        Returns a response for the request path and query string.
+
+        Parameters
+        ----------
+        path : str
+            Request path.
+        query : str
+            Request query string.
+
+        Returns
+        -------
+        tuple or None
+            Content type and response body pair or None if the path is
+            unknown.
+        """
+        key = (path, query, self.targets)
+        with self._lock:
+            response = self._responses.get(key)
+        if response is not None:
+            return response
+        params = dict(urllib.parse.parse_qsl(query))
+        for regex, handler in self._routes:
+            re_rslt = re.match(regex, path)
+            if re_rslt:
+                response = handler(params, *re_rslt.groups())
+                break
+        else:
+            return None
+        with self._lock:
+            self._responses[key] = response
+        return response
+
+    def _docker_hub_repository(self, params: dict, org: str, image: str):
+        return 'application/json', fixtures.docker_hub_repository(org, image)
+
+    def _docker_hub_repositories(self, params: dict, org: str):
+        page_size = int(params.get('page_size', self.DOCKER_HUB_PAGE_SIZE))
+        page = int(params.get('page', 1))
+        names = [f'image-{i}' for i in range(self.targets)]
+        start = (page - 1) * page_size
+        next_url = None
+        if start + page_size < len(names):
+            next_url = (f'https://hub.docker.com/v2/repositories/{org}/'
+                        f'?page={page + 1}&page_size={page_size}')
+        return 'application/json', fixtures.docker_hub_repositories_page(
+            org, names[start:start + page_size], next_url
+        )
+
+    def _distrowatch_page(self, params: dict):
+        names = ['MX Linux', 'Mint', 'EndeavourOS', 'Debian', 'Manjaro',
+                 'AlmaLinux', 'Rocky Linux', 'Fedora']
+        return 'text/html; charset=UTF-8', fixtures.distrowatch_page(names)
+
+    def _vagrant_user(self, params: dict, org: str):
+        names = [f'box-{i}' for i in range(self.targets)]
+        return 'application/json', fixtures.vagrant_user(org, names)
+
+    def _vagrant_box(self, params: dict, org: str, box: str):
+        return 'application/json', fixtures.vagrant_box(org, box)
+
+    def _github_repos(self, params: dict, org: str):
+        per_page = int(params.get('per_page', 30))
+        start = (int(params.get('page', 1)) - 1) * per_page
+        names = [f'repo-{i}' for i in range(self.targets)]
+        return 'application/json', fixtures.github_repos_page(
+            org, names[start:start + per_page]
+        )
+
+    def _github_repo(self, params: dict, org: str, repo: str):
+        return 'application/json', fixtures.github_repo(org, repo)
+
+    def _github_releases(self, params: dict, org: str, repo: str):
+        return 'application/json', fixtures.github_releases(org, repo)
+
+    def _reddit_about(self, params: dict, subreddit: str):
+        return 'application/json', fixtures.reddit_about(subreddit)
+
+    def _reddit_info(self, params: dict):
+        names = [name for name in params.get('sr_name', '').split(',')
+                 if name]
+        return 'application/json', fixtures.reddit_info(names)
+
+    def _mattermost_analytics(self, params: dict):
+        return 'application/json', fixtures.mattermost_analytics(
+            params.get('name', 'standard'), params.get('team_id')
+        )
+
+    def _mattermost_teams(self, params: dict):
+        per_page = int(params.get('per_page', 60))
+        start = int(params.get('page', 0)) * per_page
+        names = [f'team-{i}' for i in range(self.targets)]
+        return 'application/json', fixtures.mattermost_teams_page(
+            names[start:start + per_page]
+        )
+
+
+class UpstreamHTTPClient(HTTPClient):
+
+    """
+    HTTP client which connects to a fake upstream server instead of the
+    requested hosts. HTTPS requests are sent using plain HTTP.
+    """
+
+    def __init__(self, upstream_port: int, **kwargs):
+        """
+        UpstreamHTTPClient initialization.
+
+        Parameters
+        ----------
+        upstream_port : int
+            Fake upstream server TCP port on the loopback interface.
+        kwargs : dict
+            `HTTPClient` arguments.
+        """
+        super().__init__(**kwargs)
+        self.upstream_port = upstream_port
+
+    def _acquire(self, pool_key: tuple) -> typing.Tuple[
+            http.client.HTTPConnection, bool]:
+        with self._lock:
+            pool = self._pools[pool_key]
+            if pool:
+                return pool.pop(), True
+        conn = http.client.HTTPConnection('127.0.0.1', self.upstream_port,
+                                          timeout=self.timeout)
+        return conn, False
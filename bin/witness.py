@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-16
+
+"""
+AlmaLinux Witness command line interface.
+
+See the `almawitness.cli` module documentation for usage details.
+"""
+
+import sys
+
+from almawitness.cli import main
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
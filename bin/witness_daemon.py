@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-16
+
+"""
+AlmaLinux Witness scheduler daemon.
+
+See the `almawitness.daemon` module documentation for usage details.
+"""
+
+import sys
+
+from almawitness.daemon import main
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
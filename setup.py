@@ -25,4 +25,18 @@ setuptools.setup(
     package_dir={"": "src"},
     packages=setuptools.find_packages(where="src"),
     python_requires=">=3.6",
+    entry_points={
+        "console_scripts": [
+            "witness = almawitness.cli:main",
+        ],
+        "almawitness.sensors": [
+            "distrowatch = almawitness.sensors.distrowatch",
+            "docker_hub = almawitness.sensors.docker_hub",
+            "epel = almawitness.sensors.epel",
+            "github_repo = almawitness.sensors.github_repo",
+            "mattermost = almawitness.sensors.mattermost",
+            "reddit = almawitness.sensors.reddit",
+            "vagrantup = almawitness.sensors.vagrantup",
+        ],
+    },
 )
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-16
+
+"""
+AlmaLinux Witness command line interface.
+
+The `witness` program runs a sensor or the scheduler daemon, all arguments
+following the command name are passed to the selected sensor (daemon) as is.
+Only the selected sensor module is imported.
+
+Execution examples:
+
+    $ witness list
+    $ witness docker_hub -o library -i almalinux
+    $ witness --import-time epel -o almalinux
+    $ witness daemon -c witness.ini
+"""
+
+import argparse
+import importlib
+import sys
+import time
+import typing
+
+from almawitness.registry import get_sensor_module_name, get_sensors
+
+
+__all__ = ['main']
+
+
+COMMANDS = {
+    'daemon': 'almawitness.daemon',
+}
+
+
+def init_arg_parser() -> argparse.ArgumentParser:
+    """
+    Creates and initializes a command line arguments parser.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        Command line arguments parser.
+    """
+    arg_parser = argparse.ArgumentParser(
+        prog='witness',
+        description='AlmaLinux Witness sensors runner',
+        epilog='Use "witness list" to list available sensors and '
+               '"witness COMMAND --help" for the command help.'
+    )
+    arg_parser.add_argument('-t', '--import-time', action='store_true',
+                            help='Report the command module import time to '
+                                 'stderr')
+    arg_parser.add_argument('command',
+                            help='Sensor name, "daemon" or "list"')
+    arg_parser.add_argument('args', nargs=argparse.REMAINDER,
+                            help='Command arguments')
+    return arg_parser
+
+
+def main(sys_args: typing.Optional[typing.List[str]] = None):
+    arg_parser = init_arg_parser()
+    args = arg_parser.parse_args(sys_args)
+    if args.command == 'list':
+        for name in sorted(get_sensors()):
+            print(name)
+        return
+    module_name = COMMANDS.get(args.command) or \
+        get_sensor_module_name(args.command)
+    if module_name is None:
+        arg_parser.error(f'unknown command {args.command}')
+    import_start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    if args.import_time:
+        elapsed = (time.perf_counter() - import_start) * 1000
+        sys.stderr.write(f'witness: {args.command} imported in '
+                         f'{elapsed:.1f} ms\n')
+    # make the command name appear in the command's usage messages
+    sys.argv[0] = f'{arg_parser.prog} {args.command}'
+    return module.main(args.args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-16
+
+"""
+AlmaLinux Witness scheduler daemon.
+
+The daemon runs all configured sensors in a single long-running process using
+one shared MQTT connection. Every job is executed periodically, a random
+jitter is added to its scheduled start time so that jobs with the same
+interval don't fire simultaneously.
+
+Configuration file format (INI):
+
+    [DEFAULT]
+    interval = 3600
+    jitter = 300
+
+    [almalinux-docker]
+    sensor = docker_hub
+    args = -o library -i almalinux
+
+    [almalinux-epel]
+    sensor = epel
+    args = -o almalinux --query 'almalinux%%' -d /var/lib/witness/epel.db
+    interval = 86400
+
+`interval` and `jitter` are defined in seconds, `args` are the sensor command
+line arguments (MQTT-specific arguments are ignored).
+
+Every job run statistics are submitted to the `stats/witness/{job_name}`
+topic in the same format as the standalone sensors statistics (see
+`almawitness.sensors.common.guarded_run`) with an additional field:
+
+    {"run_time": float, "collect_time": float, "publish_time": float,
+     "messages": int, "skipped_messages": int, "errors": int, "ts": str,
+     ...}
+
+where `collect_time` and `publish_time` are time in seconds spent in the
+sensor and in publishing its messages respectively, `messages` is a number
+of collected messages and `skipped_messages` is a number of unchanged
+messages which weren't published in the change-only mode (the
+`--changes-only` argument). HTTP requests and their phases are counted by
+the sensors standalone runs only.
+
+If the `--spool` argument is specified, collected messages are saved to the
+spool first and replayed to the MQTT server when it is available, the daemon
+doesn't require the MQTT server to be running on startup. The daemon
+publishes messages to an MQTT server only, the `--output influxdb` argument
+is rejected.
+
+Execution example:
+
+    $ witness daemon -c witness.ini
+"""
+
+import argparse
+import concurrent.futures
+import configparser
+import heapq
+import logging
+import random
+import shlex
+import signal
+import sys
+import threading
+import time
+import typing
+
+from almawitness.registry import get_sensor_module_name, load_sensor
+from almawitness.sensors.common import (
+    add_mqtt_arg_parser_args,
+    ChangesOnlyPublisher,
+    drain_spool,
+    get_run_stats,
+    LastValueStore,
+    mqtt_client,
+    MQTTPublisher,
+    PublishError,
+    Spool,
+    Timings
+)
+
+
+__all__ = ['Job', 'load_jobs', 'run_jobs']
+
+
+class Job:
+
+    """Periodically executed sensor."""
+
+    def __init__(self, name: str, sensor: str, args: typing.List[str],
+                 interval: float, jitter: float):
+        """
+        Job initialization.
+
+        Parameters
+        ----------
+        name : str
+            Job name.
+        sensor : str
+            Sensor name, see `almawitness.registry`.
+        args : list
+            Sensor command line arguments.
+        interval : float
+            Execution interval in seconds.
+        jitter : float
+            Maximum random start time delay in seconds.
+        """
+        if get_sensor_module_name(sensor) is None:
+            raise ValueError(f'unknown sensor {sensor} for job {name}')
+        if interval <= 0:
+            raise ValueError(f'job {name} interval must be positive')
+        self.name = name
+        self.sensor = sensor
+        self.args = args
+        self.interval = interval
+        self.jitter = jitter
+        module = load_sensor(sensor)
+        self._collect = module.collect
+        # parse arguments early to report configuration errors on startup
+        self._parsed_args = module.init_arg_parser().parse_args(args)
+
+    def next_delay(self) -> float:
+        """
+        Returns a random delay to add to the job start time.
+
+        Returns
+        -------
+        float
+        """
+        return random.uniform(0, self.jitter)
+
+    def collect(self) -> typing.Iterator[typing.Tuple[str, dict]]:
+        """
+        Runs the sensor.
+
+        Returns
+        -------
+        typing.Iterator[typing.Tuple[str, dict]]
+            Iterator over MQTT topic name and message pairs.
+        """
+        return self._collect(self._parsed_args)
+
+
+def load_jobs(config_path: str) -> typing.List[Job]:
+    """
+    Loads jobs from a configuration file.
+
+    Parameters
+    ----------
+    config_path : str
+        Configuration file path.
+
+    Returns
+    -------
+    list
+        List of configured jobs.
+    """
+    config = configparser.ConfigParser(
+        defaults={'interval': '3600', 'jitter': '300', 'args': ''}
+    )
+    with open(config_path, 'r') as fd:
+        config.read_file(fd)
+    jobs = []
+    for name in config.sections():
+        section = config[name]
+        jobs.append(Job(name, section['sensor'],
+                        shlex.split(section['args']),
+                        section.getfloat('interval'),
+                        section.getfloat('jitter')))
+    return jobs
+
+
+def run_jobs(jobs: typing.List[Job], server: str, port: int, qos: int,
+             stop_event: threading.Event, workers: int = 4,
+             max_inflight: int = 100, spool: typing.Optional[Spool] = None,
+             last_values: typing.Optional[LastValueStore] = None,
+             payload_format: str = 'json'):
+    """
+    Executes jobs periodically until the stop event is set.
+
+    Parameters
+    ----------
+    jobs : list
+        Jobs to execute.
+    server : str
+        MQTT server hostname or IP address.
+    port : int
+        MQTT server port.
+    qos : int
+        QoS level for MQTT protocol.
+    stop_event : threading.Event
+        Event which terminates the scheduler loop when set.
+    workers : int, optional
+        Maximum number of simultaneously running jobs.
+    max_inflight : int, optional
+        Maximum number of unacknowledged MQTT messages.
+    spool : Spool, optional
+        Spool to save messages to before publishing.
+    last_values : LastValueStore, optional
+        Last published values store, unchanged messages are skipped if
+        specified.
+    payload_format : str, optional
+        MQTT messages format: "json" or "influx" (the line protocol).
+    """
+    def run_job(job: Job):
+        start = time.monotonic()
+        timings = Timings()
+        count = 0
+        failed = False
+        # every job waits for acknowledgements of its own messages only
+        output = spool if spool is not None else publisher.batch()
+        changes_only = last_values is not None
+        sink = ChangesOnlyPublisher(output, last_values) if changes_only \
+            else output
+        try:
+            messages = iter(job.collect())
+            while True:
+                with timings.measure('collect'):
+                    item = next(messages, None)
+                if item is None:
+                    break
+                with timings.measure('publish'):
+                    sink.publish(*item)
+                count += 1
+            with timings.measure('publish'):
+                sink.flush()
+        except Exception:
+            failed = True
+            raise
+        finally:
+            stats = get_run_stats(time.monotonic() - start, failed, timings)
+            stats.update(messages=count,
+                         skipped_messages=sink.skipped if changes_only else 0)
+            output.publish(f'stats/witness/{job.name}', stats)
+        output.flush()
+        logging.info('%s: collected %d message(s) in %.2f seconds',
+                     job.name, count, time.monotonic() - start)
+        if spool is not None:
+            drain()
+
+    def drain():
+        if not mqtt_cli.is_connected():
+            logging.warning('MQTT server is unavailable, %d message(s) are '
+                            'kept in the spool', len(spool))
+            return
+        try:
+            with drain_lock:
+                count = drain_spool(spool, publisher)
+            if count:
+                logging.info('replayed %d spooled message(s)', count)
+        except PublishError as e:
+            logging.warning('can not deliver spooled messages: %s', e)
+    #
+    drain_lock = threading.Lock()
+    now = time.monotonic()
+    # the jitter is added to a fixed schedule base, so that it doesn't
+    # accumulate from run to run
+    queue = [(now + job.next_delay(), idx, now, job)
+             for idx, job in enumerate(jobs)]
+    heapq.heapify(queue)
+    running = {}
+    asynchronous = spool is not None
+    with mqtt_client(server, port, asynchronous) as mqtt_cli, \
+            concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        publisher = MQTTPublisher(mqtt_cli, qos=qos,
+                                  max_inflight=max_inflight,
+                                  payload_format=payload_format)
+        while queue and not stop_event.is_set():
+            start_at, idx, base, job = queue[0]
+            delay = start_at - time.monotonic()
+            if delay > 0:
+                stop_event.wait(delay)
+                continue
+            heapq.heappop(queue)
+            base += job.interval
+            heapq.heappush(queue, (base + job.next_delay(), idx, base, job))
+            future = running.get(job.name)
+            if future and not future.done():
+                logging.warning('%s: previous run is still in progress, '
+                                'skipping', job.name)
+                continue
+            logging.debug('%s: starting', job.name)
+            future = executor.submit(run_job, job)
+            future.add_done_callback(_log_job_error(job))
+            running[job.name] = future
+
+
+def _log_job_error(job: Job) -> typing.Callable:
+    def callback(future: concurrent.futures.Future):
+        error = future.exception()
+        if error:
+            logging.error('%s: run failed: %s', job.name, error,
+                          exc_info=error)
+    return callback
+
+
+def init_arg_parser() -> argparse.ArgumentParser:
+    """
+    Creates and initializes a command line arguments parser.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        Command line arguments parser.
+    """
+    arg_parser = argparse.ArgumentParser(
+        description='AlmaLinux Witness scheduler daemon'
+    )
+    arg_parser.add_argument('-c', '--config', required=True,
+                            help='Jobs configuration file path')
+    arg_parser.add_argument('-w', '--workers', default=4, type=int,
+                            help='Maximum number of simultaneously running '
+                                 'jobs. Default is 4')
+    arg_parser.add_argument('-v', '--verbose', action='store_true',
+                            help='Enable debug output')
+    add_mqtt_arg_parser_args(arg_parser)
+    return arg_parser
+
+
+def main(sys_args: typing.List[str]):
+    arg_parser = init_arg_parser()
+    args = arg_parser.parse_args(sys_args)
+    if args.output != 'mqtt':
+        arg_parser.error(f'{args.output} output is not supported by the '
+                         f'daemon, only mqtt is')
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(message)s',
+        level=logging.DEBUG if args.verbose else logging.INFO
+    )
+    jobs = load_jobs(args.config)
+    if not jobs:
+        logging.error('there are no jobs defined in %s', args.config)
+        return 1
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+    logging.info('starting %d job(s)', len(jobs))
+    spool = Spool(args.spool, args.spool_size) if args.spool else None
+    last_values = None
+    if args.changes_only:
+        last_values = LastValueStore(args.state_db, args.deadband,
+                                     args.heartbeat)
+    try:
+        run_jobs(jobs, args.server, args.port, args.qos, stop_event,
+                 workers=args.workers, max_inflight=args.max_inflight,
+                 spool=spool, last_values=last_values,
+                 payload_format=args.payload_format)
+    finally:
+        if spool is not None:
+            spool.close()
+        if last_values is not None:
+            last_values.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-16
+
+"""
+AlmaLinux Witness sensors registry.
+
+Sensor is a module which provides the `init_arg_parser`, `collect` and `main`
+functions. The built-in sensors are always available, third-party sensors
+are registered using the `almawitness.sensors` entry point group, e.g.:
+
+    entry_points={
+        'almawitness.sensors': [
+            'my_sensor = my_package.my_sensor',
+        ]
+    }
+
+Sensor modules are imported only when they are requested, so that the
+startup time doesn't depend on a number of installed sensors and their
+dependencies.
+"""
+
+import importlib
+import types
+import typing
+
+
+__all__ = ['BUILTIN_SENSORS', 'ENTRY_POINT_GROUP', 'get_sensor_module_name',
+           'get_sensors', 'load_sensor']
+
+
+BUILTIN_SENSORS = {
+    'distrowatch': 'almawitness.sensors.distrowatch',
+    'docker_hub': 'almawitness.sensors.docker_hub',
+    'epel': 'almawitness.sensors.epel',
+    'github_repo': 'almawitness.sensors.github_repo',
+    'mattermost': 'almawitness.sensors.mattermost',
+    'reddit': 'almawitness.sensors.reddit',
+    'vagrantup': 'almawitness.sensors.vagrantup',
+}
+
+ENTRY_POINT_GROUP = 'almawitness.sensors'
+
+_plugins = None
+
+
+def _get_plugins() -> typing.Dict[str, str]:
+    global _plugins
+    if _plugins is not None:
+        return _plugins
+    _plugins = {}
+    try:
+        import importlib.metadata as metadata
+    except ImportError:
+        # Python < 3.8
+        try:
+            import pkg_resources
+        except ImportError:
+            return _plugins
+        for entry_point in pkg_resources.iter_entry_points(ENTRY_POINT_GROUP):
+            _plugins[entry_point.name] = entry_point.module_name
+        return _plugins
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        entry_points = entry_points.select(group=ENTRY_POINT_GROUP)
+    else:
+        entry_points = entry_points.get(ENTRY_POINT_GROUP, ())
+    for entry_point in entry_points:
+        _plugins[entry_point.name] = entry_point.value.split(':')[0]
+    return _plugins
+
+
+def get_sensors() -> typing.Dict[str, str]:
+    """
+    Returns all available sensors.
+
+    Returns
+    -------
+    dict
+        Sensor names to module names mapping.
+    """
+    sensors = dict(_get_plugins())
+    sensors.update(BUILTIN_SENSORS)
+    return sensors
+
+
+def get_sensor_module_name(name: str) -> typing.Optional[str]:
+    """
+    Returns a sensor module name.
+
+    Parameters
+    ----------
+    name : str
+        Sensor name.
+
+    Returns
+    -------
+    str or None
+        Sensor module name or None if there is no such sensor registered.
+    """
+    # installed entry points are scanned only for non built-in sensors
+    return BUILTIN_SENSORS.get(name) or _get_plugins().get(name)
+
+
+def load_sensor(name: str) -> types.ModuleType:
+    """
+    Imports a sensor module.
+
+    Parameters
+    ----------
+    name : str
+        Sensor name.
+
+    Returns
+    -------
+    types.ModuleType
+        Sensor module.
+
+    Raises
+    ------
+    KeyError
+        If there is no such sensor registered.
+    """
+    module_name = get_sensor_module_name(name)
+    if module_name is None:
+        raise KeyError(f'unknown sensor {name}')
+    return importlib.import_module(module_name)
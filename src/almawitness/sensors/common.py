@@ -6,23 +6,85 @@
 """Common functions used by AlmaLinux Witness sensors."""
 
 import argparse
+import codecs
+import collections
+import concurrent.futures
 import contextlib
 import datetime
+import email.utils
+import fcntl
+import functools
+import gzip
+import hashlib
+import http.client
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import sqlite3
+import ssl
+import threading
+import time
+import typing
+import urllib.error
+import urllib.parse
+import zlib
 
-import paho.mqtt.client
+if typing.TYPE_CHECKING:
+    import paho.mqtt.client
 
 __all__ = [
-    'add_mqtt_arg_parser_args', 'get_iso8601_ts', 'get_usage_stats_topic_name',
-    'mqtt_client', 'USER_AGENT'
+    'add_fetch_arg_parser_args', 'add_mqtt_arg_parser_args',
+    'add_run_arg_parser_args', 'AlreadyRunningError', 'CACHE_DIR',
+    'ChangesOnlyPublisher', 'CircuitBreaker', 'CircuitOpenError',
+    'DeadlineExceeded', 'drain_spool', 'fetch_concurrently', 'FetchError',
+    'file_lock', 'format_line_protocol', 'get_http_client', 'get_iso8601_ts',
+    'get_run_stats', 'get_timings', 'guarded_run',
+    'get_usage_stats_topic_name',
+    'HTTP_CHUNK_SIZE', 'HTTPClient', 'HTTPResponse', 'INFLUX_TOPIC_PREFIX',
+    'InfluxDBPublisher',
+    'LastValueStore', 'load_json_file', 'MESSAGE_TAG_KEYS', 'mqtt_client',
+    'mqtt_publisher', 'MQTTPublishBatch', 'MQTTPublisher', 'open_publisher',
+    'parse_org_query',
+    'PublishError', 'RateLimiter', 'RateLimitError', 'save_json_file',
+    'Spool', 'Timings', 'topic_to_point', 'USER_AGENT', 'ValidatorCache'
 ]
 
 USER_AGENT = 'AlmaBot/0.1 (+https://github.com/AlmaLinux)'
 
+HTTP_CHUNK_SIZE = 64 * 1024
+
+# seconds to wait after the run deadline before interrupting the run and
+# then before terminating the process, see guarded_run
+DEADLINE_GRACE_PERIOD = 60
+
+CACHE_DIR = os.path.join(
+    os.path.expanduser(os.environ.get('XDG_CACHE_HOME') or '~/.cache'),
+    'almawitness'
+)
+
+# message keys which are stored as tags, see the Telegraf `tag_keys` option
+MESSAGE_TAG_KEYS = ('span', 'version', 'provider')
+
+# MQTT topic prefix for messages in the InfluxDB line protocol format
+INFLUX_TOPIC_PREFIX = 'influx/'
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+_timings = None
+_timings_lock = threading.Lock()
+
 
 def add_mqtt_arg_parser_args(arg_parser: argparse.ArgumentParser,
                              server: str = 'localhost',
                              port: int = 1883,
-                             qos: int = 1):
+                             qos: int = 1,
+                             max_inflight: int = 100,
+                             spool_size: int = 100000,
+                             heartbeat: int = 12):
     """
     Adds MQTT-specific command line arguments to an argument parser.
 
@@ -36,6 +98,13 @@ def add_mqtt_arg_parser_args(arg_parser: argparse.ArgumentParser,
         Default MQTT server TCP port.
     qos : int, optional
         Default QoS level for MQTT protocol.
+    max_inflight : int, optional
+        Default maximum number of unacknowledged MQTT messages.
+    spool_size : int, optional
+        Default maximum number of spooled messages.
+    heartbeat : int, optional
+        Default number of runs after which an unchanged message is published
+        in the change-only mode.
     """
     arg_parser.add_argument('-s', '--server', default=server,
                             help=f'MQTT server hostname or IP address. '
@@ -45,6 +114,1355 @@ def add_mqtt_arg_parser_args(arg_parser: argparse.ArgumentParser,
     arg_parser.add_argument('-q', '--qos', default=qos, type=int,
                             help=f'MQTT Quality of Service level to use. '
                                  f'Default is {qos}')
+    arg_parser.add_argument('--max-inflight', default=max_inflight, type=int,
+                            help=f'Maximum number of unacknowledged MQTT '
+                                 f'messages. Default is {max_inflight}')
+    arg_parser.add_argument('--payload-format', choices=('json', 'influx'),
+                            default='json',
+                            help=f'MQTT messages format: JSON or the '
+                                 f'InfluxDB line protocol (published to '
+                                 f'{INFLUX_TOPIC_PREFIX}* topics). Default '
+                                 f'is json')
+    arg_parser.add_argument('--spool',
+                            help='Spool database file path. If specified, '
+                                 'messages are saved to the spool first, so '
+                                 'they are delivered later if the MQTT '
+                                 'server is unavailable')
+    arg_parser.add_argument('--spool-size', default=spool_size, type=int,
+                            help=f'Maximum number of spooled messages, the '
+                                 f'oldest ones are dropped first. Default '
+                                 f'is {spool_size}')
+    arg_parser.add_argument('--output', choices=('mqtt', 'influxdb'),
+                            default='mqtt',
+                            help='Messages output backend: an MQTT server or '
+                                 'direct writes to InfluxDB. Default is mqtt')
+    influx_group = arg_parser.add_argument_group('InfluxDB output')
+    influx_group.add_argument('--influxdb-url',
+                              default='http://localhost:8086',
+                              help='InfluxDB server URL. Default is '
+                                   'http://localhost:8086')
+    influx_group.add_argument('--influxdb-token',
+                              default=os.environ.get('INFLUX_TOKEN'),
+                              help='InfluxDB authentication token. Default '
+                                   'is the INFLUX_TOKEN environment variable '
+                                   'value')
+    influx_group.add_argument('--influxdb-org', default='AlmaLinux',
+                              help='InfluxDB organization. Default is '
+                                   'AlmaLinux')
+    influx_group.add_argument('--influxdb-bucket', default='distro_spread',
+                              help='InfluxDB bucket. Default is '
+                                   'distro_spread')
+    influx_group.add_argument('--influxdb-tag', action='append', default=[],
+                              metavar='KEY=VALUE', type=parse_tag,
+                              help='Additional tag to add to every point '
+                                   '(e.g. host=witness.almalinux.org). Can '
+                                   'be specified multiple times')
+    changes_group = arg_parser.add_argument_group('Change-only publishing')
+    changes_group.add_argument('--changes-only', action='store_true',
+                               help='Skip messages which have not changed '
+                                    'since the last published ones')
+    changes_group.add_argument('--deadband', default=0, type=float,
+                               metavar='PERCENT',
+                               help='Consider numeric values changed by no '
+                                    'more than PERCENT percent unchanged. '
+                                    'Default is 0')
+    changes_group.add_argument('--heartbeat', default=heartbeat, type=int,
+                               help=f'Publish an unchanged message at least '
+                                    f'every N-th run, 0 disables heartbeats. '
+                                    f'Default is {heartbeat}')
+    changes_group.add_argument('--state-db',
+                               default=os.path.join(CACHE_DIR,
+                                                    'last-values.db'),
+                               help='Last published values database file '
+                                    'path')
+
+
+def load_json_file(file_path: str) -> typing.Optional[typing.Any]:
+    """
+    Loads a JSON file, broken or missing files are ignored.
+
+    Parameters
+    ----------
+    file_path : str
+        JSON file path.
+
+    Returns
+    -------
+    typing.Any
+        Decoded file content or None if the file can't be loaded.
+    """
+    try:
+        with open(file_path, 'r') as fd:
+            return json.load(fd)
+    except (OSError, ValueError):
+        return None
+
+
+def save_json_file(file_path: str, data: typing.Any):
+    """
+    Atomically saves data to a JSON file.
+
+    Parameters
+    ----------
+    file_path : str
+        JSON file path.
+    data : typing.Any
+        Data to save.
+    """
+    tmp_path = f'{file_path}.tmp'
+    with open(tmp_path, 'w') as fd:
+        json.dump(data, fd)
+    os.replace(tmp_path, file_path)
+
+
+def parse_org_query(value: str) -> typing.Tuple[str, str]:
+    """
+    Parses an `organization=query` command line argument.
+
+    Parameters
+    ----------
+    value : str
+        Command line argument value.
+
+    Returns
+    -------
+    tuple
+        Organization name and OS name query pair.
+    """
+    org, sep, query = value.partition('=')
+    if not sep or not org or not query:
+        raise argparse.ArgumentTypeError(
+            f'{value} is not in the organization=query format'
+        )
+    return org, query
+
+
+def parse_tag(value: str) -> typing.Tuple[str, str]:
+    """
+    Parses a `key=value` tag command line argument.
+
+    Parameters
+    ----------
+    value : str
+        Command line argument value.
+
+    Returns
+    -------
+    tuple
+        Tag key and value pair.
+    """
+    key, sep, tag_value = value.partition('=')
+    if not sep or not key or not tag_value:
+        raise argparse.ArgumentTypeError(f'{value} is not in the key=value '
+                                         f'format')
+    return key, tag_value
+
+
+def add_fetch_arg_parser_args(arg_parser: argparse.ArgumentParser,
+                              concurrency: int = 8,
+                              host_concurrency: int = 4):
+    """
+    Adds concurrent fetching command line arguments to an argument parser.
+
+    Parameters
+    ----------
+    arg_parser : argparse.ArgumentParser
+        Command line arguments parser.
+    concurrency : int, optional
+        Default maximum number of simultaneous requests.
+    host_concurrency : int, optional
+        Default maximum number of simultaneous requests to the same host.
+    """
+    arg_parser.add_argument('--concurrency', default=concurrency, type=int,
+                            help=f'Maximum number of simultaneous requests. '
+                                 f'Default is {concurrency}')
+    arg_parser.add_argument('--host-concurrency', default=host_concurrency,
+                            type=int,
+                            help=f'Maximum number of simultaneous requests '
+                                 f'to the same host. Default is '
+                                 f'{host_concurrency}')
+
+
+def add_run_arg_parser_args(arg_parser: argparse.ArgumentParser,
+                            deadline: float = 1800):
+    """
+    Adds request timeout and run deadline command line arguments to an
+    argument parser. See `guarded_run` for details.
+
+    Parameters
+    ----------
+    arg_parser : argparse.ArgumentParser
+        Command line arguments parser.
+    deadline : float, optional
+        Default run deadline in seconds.
+    """
+    arg_parser.add_argument('--timeout', default=30, type=float,
+                            help='HTTP request socket operations timeout in '
+                                 'seconds. Default is 30')
+    arg_parser.add_argument('--deadline', default=deadline, type=float,
+                            help=f'Maximum run time in seconds, 0 disables '
+                                 f'the limit. Default is {deadline:g}')
+    arg_parser.add_argument('--no-self-stats', action='store_true',
+                            help='Do not submit the sensor run timing '
+                                 'statistics to the stats/witness/{sensor} '
+                                 'topic')
+
+
+class FetchError(Exception):
+
+    """Some of the concurrently fetched targets have failed."""
+
+    def __init__(self, errors: typing.List[typing.Tuple[tuple, Exception]]):
+        """
+        FetchError initialization.
+
+        Parameters
+        ----------
+        errors : list
+            Failed targets and their exceptions.
+        """
+        self.errors = errors
+        details = '; '.join(f'{target}: {error}' for target, error in errors)
+        super().__init__(f'{len(errors)} target(s) failed: {details}')
+
+
+def fetch_concurrently(
+        fetch: typing.Callable,
+        targets: typing.Iterable[tuple],
+        get_host: typing.Optional[typing.Callable[[tuple], str]] = None,
+        max_workers: int = 8,
+        max_per_host: int = 4,
+        rate_limiter: typing.Optional['RateLimiter'] = None
+) -> typing.Iterator[typing.Tuple[tuple, typing.Any]]:
+    """
+    Calls a fetch function for each target concurrently and yields results
+    as soon as they are ready.
+
+    Failed targets don't interrupt the processing: all successful results are
+    yielded first and a FetchError describing the failed targets is raised
+    in the end.
+
+    Parameters
+    ----------
+    fetch : typing.Callable
+        Function to call, a target tuple is passed as positional arguments.
+    targets : typing.Iterable[tuple]
+        Fetch function arguments for each target.
+    get_host : typing.Callable, optional
+        Function which returns a host name for a target. It is used to
+        enforce the per-host concurrency limit. All targets are considered
+        to belong to the same host if omitted.
+    max_workers : int, optional
+        Maximum number of simultaneous fetch calls.
+    max_per_host : int, optional
+        Maximum number of simultaneous fetch calls for the same host.
+    rate_limiter : RateLimiter, optional
+        Rate limiter of the HTTP client used by the fetch function. Targets
+        of hosts which have a request budget left are processed first.
+
+    Returns
+    -------
+    typing.Iterator[typing.Tuple[tuple, typing.Any]]
+        Iterator over target and fetch result pairs in completion order.
+    """
+    pending = collections.OrderedDict()
+    for target in targets:
+        host = get_host(target) if get_host else ''
+        pending.setdefault(host, collections.deque()).append(target)
+    active = collections.Counter()
+    errors = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        futures = {}
+
+        def submit():
+            # round-robin over hosts so that a single slow host doesn't
+            # occupy all workers
+            while len(futures) < max_workers:
+                ready = [h for h, queue in pending.items()
+                         if queue and active[h] < max_per_host]
+                if not ready:
+                    return
+                if rate_limiter and get_host:
+                    ready.sort(key=rate_limiter.delay)
+                for h in ready:
+                    if len(futures) >= max_workers:
+                        return
+                    item = pending[h].popleft()
+                    futures[executor.submit(fetch, *item)] = (h, item)
+                    active[h] += 1
+        submit()
+        while futures:
+            done, _ = concurrent.futures.wait(
+                futures, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                h, target = futures.pop(future)
+                active[h] -= 1
+                error = future.exception()
+                if error:
+                    errors.append((target, error))
+                else:
+                    yield target, future.result()
+            submit()
+    if errors:
+        raise FetchError(errors)
+
+
+class Timings:
+
+    """
+    Thread-safe accumulator of time spent in execution phases (DNS
+    resolution, connection, parsing, publishing, etc.) and event counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phases = collections.defaultdict(float)
+        self._counters = collections.Counter()
+
+    @contextlib.contextmanager
+    def measure(self, phase: str):
+        """
+        Context manager which adds the execution time of its body to a
+        phase.
+
+        Parameters
+        ----------
+        phase : str
+            Phase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def add(self, phase: str, seconds: float):
+        """
+        Adds time to a phase.
+
+        Parameters
+        ----------
+        phase : str
+            Phase name.
+        seconds : float
+            Time in seconds.
+        """
+        with self._lock:
+            self._phases[phase] += seconds
+
+    def count(self, counter: str, value: int = 1):
+        """
+        Increments a counter.
+
+        Parameters
+        ----------
+        counter : str
+            Counter name.
+        value : int, optional
+            Increment value.
+        """
+        with self._lock:
+            self._counters[counter] += value
+
+    def summary(self) -> typing.Dict[str, typing.Union[int, float]]:
+        """
+        Returns accumulated values.
+
+        Returns
+        -------
+        dict
+            Dictionary of `{phase}_time` values in seconds and counters.
+        """
+        with self._lock:
+            summary = {f'{phase}_time': round(seconds, 6)
+                       for phase, seconds in self._phases.items()}
+            summary.update(self._counters)
+        return summary
+
+
+def get_timings() -> Timings:
+    """
+    Returns the timings accumulator shared by all sensors within a process.
+
+    Returns
+    -------
+    Timings
+    """
+    global _timings
+    with _timings_lock:
+        if _timings is None:
+            _timings = Timings()
+        return _timings
+
+
+def _create_connection(timings: Timings, address: typing.Tuple[str, int],
+                       timeout: typing.Any = socket._GLOBAL_DEFAULT_TIMEOUT,
+                       source_address: typing.Optional[tuple] = None
+                       ) -> socket.socket:
+    # socket.create_connection replacement which measures the DNS
+    # resolution and TCP connection time separately
+    host, port = address
+    with timings.measure('dns'):
+        addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    error = None
+    with timings.measure('connect'):
+        for family, sock_type, proto, _, sock_address in addresses:
+            sock = socket.socket(family, sock_type, proto)
+            try:
+                if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sock_address)
+                return sock
+            except OSError as e:
+                error = e
+                sock.close()
+    raise error or OSError(f'{host} address is not resolved')
+
+
+class HTTPResponse:
+
+    """
+    HTTP response which transparently decompresses a gzip or deflate encoded
+    body while it is being read.
+
+    The underlying connection is returned to the client pool when the
+    response is closed after the body has been read completely.
+    """
+
+    def __init__(self, client: 'HTTPClient', pool_key: tuple,
+                 conn: http.client.HTTPConnection,
+                 rsp: http.client.HTTPResponse, url: str):
+        """
+        HTTPResponse initialization.
+
+        Parameters
+        ----------
+        client : HTTPClient
+            HTTP client the connection belongs to.
+        pool_key : tuple
+            Connection pool key.
+        conn : http.client.HTTPConnection
+            Connection used for the request.
+        rsp : http.client.HTTPResponse
+            Raw HTTP response.
+        url : str
+            Requested URL.
+        """
+        self._client = client
+        self._pool_key = pool_key
+        self._conn = conn
+        self._rsp = rsp
+        self._buffer = b''
+        self._eof = False
+        self.url = url
+        self.status = rsp.status
+        self.reason = rsp.reason
+        self.headers = rsp.headers
+        encoding = rsp.getheader('Content-Encoding', '').strip().lower()
+        if encoding in ('gzip', 'x-gzip'):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            self._decompressor = _DeflateDecompressor()
+        else:
+            self._decompressor = None
+
+    def read(self, amt: typing.Optional[int] = None) -> bytes:
+        """
+        Reads and decompresses the response body.
+
+        Parameters
+        ----------
+        amt : int, optional
+            Maximum number of bytes to return. The whole remaining body is
+            returned if omitted.
+
+        Returns
+        -------
+        bytes
+        """
+        with self._client.timings.measure('download'):
+            self._read_buffer(amt)
+        if amt is None:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def _read_buffer(self, amt: typing.Optional[int]):
+        while not self._eof and (amt is None or len(self._buffer) < amt):
+            # a slow server can send data just often enough to never hit
+            # the socket timeout, check the deadline after every read
+            self._client.get_request_timeout()
+            chunk = self._rsp.read1(HTTP_CHUNK_SIZE)
+            if not chunk:
+                self._eof = True
+                if self._decompressor:
+                    self._buffer += self._decompressor.flush()
+                break
+            if self._decompressor:
+                chunk = self._decompressor.decompress(chunk)
+            self._buffer += chunk
+
+    def json(self) -> typing.Any:
+        """
+        Reads and decodes a JSON response body.
+
+        Returns
+        -------
+        typing.Any
+        """
+        data = self.read()
+        with self._client.timings.measure('parse'):
+            return json.loads(data)
+
+    def iter_json_array(self) -> typing.Iterator[typing.Any]:
+        """
+        Incrementally reads and decodes a JSON array response body. Array
+        items are returned as soon as they are downloaded, so a large body
+        is never kept in memory as a whole.
+
+        Returns
+        -------
+        typing.Iterator[typing.Any]
+            Iterator over decoded array items.
+
+        Raises
+        ------
+        ValueError
+            If the response body is not a JSON array.
+        """
+        charset = self.headers.get_content_charset() or 'utf-8'
+        text_decoder = codecs.getincrementaldecoder(charset)()
+        decoder = json.JSONDecoder()
+        timings = self._client.timings
+        buf = ''
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            if eof:
+                return False
+            chunk = self.read(HTTP_CHUNK_SIZE)
+            eof = not chunk
+            buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+            pos = 0
+            return True
+
+        def next_char() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos].isspace():
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    return ''
+        #
+        if next_char() != '[':
+            raise ValueError(f'{self.url} response is not a JSON array')
+        pos += 1
+        char = next_char()
+        while char != ']':
+            try:
+                with timings.measure('parse'):
+                    item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # a value is complete only if it's followed by a delimiter: a
+            # number truncated at the end of the buffer (e.g. "10." or "1")
+            # is decoded successfully as well
+            delim_pos = end
+            while delim_pos < len(buf) and buf[delim_pos].isspace():
+                delim_pos += 1
+            if delim_pos == len(buf) or buf[delim_pos] not in ',]':
+                if fill():
+                    continue
+                raise ValueError(f'{self.url} response is not a valid JSON '
+                                 f'array')
+            pos = delim_pos
+            yield item
+            char = buf[pos]
+            if char == ',':
+                pos += 1
+                if next_char() in (']', ''):
+                    raise ValueError(f'{self.url} response is not a valid '
+                                     f'JSON array')
+        # read the rest of the body, so that the connection can be reused
+        self.read()
+
+    def close(self):
+        """
+        Releases the response connection.
+
+        The connection is returned to the pool if the body has been read
+        completely and the server allows to keep it alive, otherwise it is
+        closed.
+        """
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        if self._rsp.isclosed() and not self._rsp.will_close:
+            self._client._release(self._pool_key, conn)
+        else:
+            self._rsp.close()
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _DeflateDecompressor:
+
+    """
+    Deflate decompressor which supports both zlib wrapped and raw deflate
+    streams since servers use both for the "deflate" content encoding.
+    """
+
+    def __init__(self):
+        self._decompressor = zlib.decompressobj()
+        self._first_chunk = True
+
+    def decompress(self, data: bytes) -> bytes:
+        if self._first_chunk:
+            self._first_chunk = False
+            try:
+                return self._decompressor.decompress(data)
+            except zlib.error:
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._decompressor.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._decompressor.flush()
+
+
+class HTTPClient:
+
+    """
+    Thread-safe HTTP client which keeps per-host pools of keep-alive
+    connections and negotiates compressed transfers.
+    """
+
+    def __init__(self, timeout: float = 30, max_idle_per_host: int = 4,
+                 user_agent: str = USER_AGENT,
+                 cache: typing.Optional['ValidatorCache'] = None,
+                 rate_limiter: typing.Optional['RateLimiter'] = None,
+                 circuit_breaker: typing.Optional['CircuitBreaker'] = None,
+                 timings: typing.Optional[Timings] = None):
+        """
+        HTTPClient initialization.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Socket operations timeout in seconds.
+        max_idle_per_host : int, optional
+            Maximum number of idle connections to keep for each host.
+        user_agent : str, optional
+            User-Agent header value.
+        cache : ValidatorCache, optional
+            Cache used for conditional JSON requests.
+        rate_limiter : RateLimiter, optional
+            Per-host request budget tracker. Requests are delayed while a
+            host rate limit is exhausted and rate limited requests are
+            retried.
+        circuit_breaker : CircuitBreaker, optional
+            Per-host circuit breaker which rejects requests to a failing
+            host.
+        timings : Timings, optional
+            Accumulator of the connection, response waiting and downloading
+            time.
+        """
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.timings = timings or Timings()
+        # monotonic time after which requests fail, see set_deadline()
+        self.deadline = None
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.user_agent = user_agent
+        self._ssl_context = ssl.create_default_context()
+        self._pools = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str,
+                headers: typing.Optional[typing.Dict[str, str]] = None,
+                body: typing.Optional[bytes] = None,
+                max_redirects: int = 5) -> HTTPResponse:
+        """
+        Sends an HTTP request.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method.
+        url : str
+            Request URL.
+        headers : dict, optional
+            Additional request headers.
+        body : bytes, optional
+            Request body.
+        max_redirects : int, optional
+            Maximum number of redirects to follow.
+
+        Returns
+        -------
+        HTTPResponse
+            Response object. It should be closed by a caller, preferably
+            using the `with` statement.
+
+        Raises
+        ------
+        urllib.error.HTTPError
+            If a server returned an error status code.
+        RateLimitError
+            If a host rate limit is exhausted for too long.
+        CircuitOpenError
+            If a host is considered to be unavailable.
+        DeadlineExceeded
+            If the client deadline is reached.
+        """
+        rqst_headers = {'Accept-Encoding': 'gzip, deflate',
+                        'User-Agent': self.user_agent}
+        if headers:
+            rqst_headers.update(headers)
+        for _ in range(max_redirects + 1):
+            rsp = self._send(method, url, rqst_headers, body)
+            location = rsp.headers.get('Location')
+            if rsp.status in (301, 302, 303, 307, 308) and location:
+                with rsp:
+                    rsp.read()
+                url = urllib.parse.urljoin(url, location)
+                if rsp.status == 303:
+                    method, body = 'GET', None
+                continue
+            if rsp.status >= 400:
+                with rsp:
+                    data = rsp.read()
+                raise urllib.error.HTTPError(url, rsp.status, rsp.reason,
+                                             rsp.headers, io.BytesIO(data))
+            return rsp
+        raise urllib.error.URLError(f'too many redirects for {url}')
+
+    def get(self, url: str,
+            headers: typing.Optional[typing.Dict[str, str]] = None
+            ) -> HTTPResponse:
+        """
+        Sends an HTTP GET request.
+
+        Parameters
+        ----------
+        url : str
+            Request URL.
+        headers : dict, optional
+            Additional request headers.
+
+        Returns
+        -------
+        HTTPResponse
+        """
+        return self.request('GET', url, headers=headers)
+
+    def get_json(self, url: str,
+                 headers: typing.Optional[typing.Dict[str, str]] = None,
+                 use_cache: bool = True) -> typing.Any:
+        """
+        Sends an HTTP GET request and decodes a JSON response body.
+
+        If the client has a validator cache, the request is sent with the
+        If-None-Match / If-Modified-Since headers and a cached body is
+        returned when a server replies with 304 Not Modified.
+
+        Parameters
+        ----------
+        url : str
+            Request URL.
+        headers : dict, optional
+            Additional request headers.
+        use_cache : bool, optional
+            Use the validator cache if it is configured.
+
+        Returns
+        -------
+        typing.Any
+            Decoded response body.
+        """
+        cache = self.cache if use_cache else None
+        cache_key = ValidatorCache.get_key(url, headers)
+        cached = None
+        if cache:
+            try:
+                cached = cache.get(cache_key)
+            except (sqlite3.Error, OSError) as e:
+                # the cache is an optimization, it must not break requests
+                logging.warning('can not read %s validator cache: %s',
+                                cache.db_path, e)
+                cache = None
+        rqst_headers = dict(headers or {})
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                rqst_headers['If-None-Match'] = etag
+            if last_modified:
+                rqst_headers['If-Modified-Since'] = last_modified
+        with self.get(url, headers=rqst_headers) as rsp:
+            if rsp.status == 304 and cached:
+                rsp.read()
+                return cached[2]
+            data = rsp.json()
+            etag = rsp.headers.get('ETag')
+            last_modified = rsp.headers.get('Last-Modified')
+        if cache and (etag or last_modified):
+            try:
+                cache.put(cache_key, etag, last_modified, data)
+            except (sqlite3.Error, OSError) as e:
+                logging.warning('can not update %s validator cache: %s',
+                                cache.db_path, e)
+        return data
+
+    def set_deadline(self, seconds: typing.Optional[float]):
+        """
+        Sets time after which all requests fail with DeadlineExceeded.
+
+        Parameters
+        ----------
+        seconds : float or None
+            Number of seconds from now, None removes the deadline.
+        """
+        self.deadline = None if seconds is None \
+            else time.monotonic() + seconds
+
+    def get_request_timeout(self) -> float:
+        """
+        Returns a socket operations timeout for the next request, it is
+        reduced to fit the deadline.
+
+        Returns
+        -------
+        float
+
+        Raises
+        ------
+        DeadlineExceeded
+            If the deadline is reached.
+        """
+        if self.deadline is None:
+            return self.timeout
+        left = self.deadline - time.monotonic()
+        if left <= 0:
+            raise DeadlineExceeded('HTTP requests deadline is exceeded')
+        return min(self.timeout, left)
+
+    def close(self):
+        """Closes all idle connections and the validator cache."""
+        with self._lock:
+            pools, self._pools = self._pools, collections.defaultdict(list)
+        for connections in pools.values():
+            for conn in connections:
+                conn.close()
+        if self.cache:
+            self.cache.close()
+
+    def _send(self, method: str, url: str, headers: typing.Dict[str, str],
+              body: typing.Optional[bytes]) -> HTTPResponse:
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ('http', 'https'):
+            raise ValueError(f'unsupported URL scheme: {url}')
+        pool_key = (parsed.scheme, parsed.hostname,
+                    parsed.port or (443 if parsed.scheme == 'https' else 80))
+        path = parsed.path or '/'
+        if parsed.query:
+            path = f'{path}?{parsed.query}'
+        host = parsed.hostname
+        limiter = self.rate_limiter
+        breaker = self.circuit_breaker
+        rate_limit_retries = 2
+        while True:
+            timeout = self.get_request_timeout()
+            if limiter:
+                limiter.acquire(host)
+            if breaker:
+                try:
+                    breaker.acquire(host)
+                except CircuitOpenError:
+                    if limiter:
+                        limiter.release(host)
+                    raise
+            conn, reused = self._acquire(pool_key)
+            conn.timeout = timeout
+            if conn.sock:
+                conn.sock.settimeout(timeout)
+            self.timings.count('http_requests')
+            try:
+                if not reused:
+                    self._connect(conn)
+                with self.timings.measure('ttfb'):
+                    conn.request(method, path, body=body, headers=headers)
+                    rsp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError,
+                    BrokenPipeError):
+                conn.close()
+                if limiter:
+                    limiter.release(host)
+                # an idle keep-alive connection could be closed by a server,
+                # retry using a fresh one
+                if reused:
+                    if breaker:
+                        breaker.release(host)
+                    continue
+                if breaker:
+                    breaker.record(host, False)
+                self.timings.count('http_errors')
+                raise
+            except Exception:
+                self.timings.count('http_errors')
+                conn.close()
+                if limiter:
+                    limiter.release(host)
+                if breaker:
+                    breaker.record(host, False)
+                raise
+            if breaker:
+                breaker.record(host, rsp.status < 500)
+            if rsp.status >= 400:
+                self.timings.count('http_errors')
+            response = HTTPResponse(self, pool_key, conn, rsp, url)
+            if not limiter:
+                return response
+            limiter.update(host, rsp.status, rsp.headers)
+            if rsp.status in (403, 429) and rate_limit_retries and \
+                    limiter.delay(host) > 0:
+                # the request is throttled, retry it when the rate limit
+                # is reset
+                rate_limit_retries -= 1
+                with response:
+                    response.read()
+                continue
+            return response
+
+    def _connect(self, conn: http.client.HTTPConnection):
+        # TLS handshake time is the connection time left after the DNS
+        # resolution and TCP connection
+        phases = Timings()
+        conn._create_connection = functools.partial(_create_connection,
+                                                    phases)
+        start = time.perf_counter()
+        conn.connect()
+        elapsed = time.perf_counter() - start
+        for phase, seconds in phases.summary().items():
+            phase = phase[:-len('_time')]
+            self.timings.add(phase, seconds)
+            elapsed -= seconds
+        if isinstance(conn, http.client.HTTPSConnection):
+            self.timings.add('tls', max(0.0, elapsed))
+
+    def _acquire(self, pool_key: tuple) -> typing.Tuple[
+            http.client.HTTPConnection, bool]:
+        with self._lock:
+            pool = self._pools[pool_key]
+            if pool:
+                return pool.pop(), True
+        scheme, host, port = pool_key
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port,
+                                               timeout=self.timeout,
+                                               context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port,
+                                              timeout=self.timeout)
+        return conn, False
+
+    def _release(self, pool_key: tuple, conn: http.client.HTTPConnection):
+        with self._lock:
+            pool = self._pools[pool_key]
+            if len(pool) < self.max_idle_per_host:
+                pool.append(conn)
+                return
+        conn.close()
+
+
+class DeadlineExceeded(TimeoutError):
+
+    """Run deadline is reached."""
+
+    pass
+
+
+class CircuitOpenError(ConnectionError):
+
+    """Requests to a host are rejected after repeated failures."""
+
+    pass
+
+
+class CircuitBreaker:
+
+    """
+    Thread-safe per-host circuit breaker.
+
+    After `failure_threshold` consecutive failures (connection errors,
+    timeouts and 5xx responses) a host circuit is opened and requests to the
+    host fail immediately. When `recovery_time` passes, a single probe
+    request is let through: the circuit is closed if it succeeds and opened
+    again otherwise.
+    """
+
+    def __init__(self, failure_threshold: int = 5,
+                 recovery_time: float = 60):
+        """
+        CircuitBreaker initialization.
+
+        Parameters
+        ----------
+        failure_threshold : int, optional
+            Number of consecutive failures which opens a circuit.
+        recovery_time : float, optional
+            Time in seconds before a probe request is sent to a failing
+            host.
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self._lock = threading.Lock()
+        # host: [consecutive failures count, opened at, probe in progress]
+        self._hosts = collections.defaultdict(lambda: [0, None, False])
+
+    def acquire(self, host: str):
+        """
+        Checks that a request to a host is allowed.
+
+        Parameters
+        ----------
+        host : str
+            Host name.
+
+        Raises
+        ------
+        CircuitOpenError
+            If the host circuit is open.
+        """
+        with self._lock:
+            state = self._hosts[host]
+            failures, opened_at, probing = state
+            if opened_at is None:
+                return
+            wait = opened_at + self.recovery_time - time.monotonic()
+            if wait > 0 or probing:
+                raise CircuitOpenError(f'{host} is unavailable after '
+                                       f'{failures} failure(s), next probe '
+                                       f'in {max(wait, 0):.0f} seconds')
+            state[2] = True
+
+    def release(self, host: str):
+        """
+        Cancels an allowed request without recording its result.
+
+        Parameters
+        ----------
+        host : str
+            Host name.
+        """
+        with self._lock:
+            self._hosts[host][2] = False
+
+    def record(self, host: str, success: bool):
+        """
+        Records a request result.
+
+        Parameters
+        ----------
+        host : str
+            Host name.
+        success : bool
+            True if the request succeeded, False otherwise.
+        """
+        with self._lock:
+            state = self._hosts[host]
+            if success:
+                state[:] = [0, None, False]
+                return
+            state[0] += 1
+            if state[2] or state[0] >= self.failure_threshold:
+                state[1] = time.monotonic()
+            state[2] = False
+
+    def is_open(self, host: str) -> bool:
+        """
+        Checks if requests to a host are currently rejected.
+
+        Parameters
+        ----------
+        host : str
+            Host name.
+
+        Returns
+        -------
+        bool
+        """
+        with self._lock:
+            state = self._hosts.get(host)
+            return bool(state and state[1] is not None)
+
+
+class RateLimitError(Exception):
+
+    """Upstream host rate limit is exhausted."""
+
+    pass
+
+
+class _HostBudget:
+
+    __slots__ = ('remaining', 'reset_at', 'blocked_until', 'inflight')
+
+    def __init__(self):
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+        self.inflight = 0
+
+
+class RateLimiter:
+
+    """
+    Thread-safe per-host request budget tracker.
+
+    Every host has a token bucket which is filled from the
+    X-RateLimit-Remaining / X-RateLimit-Reset response headers (both the
+    GitHub style epoch reset time and the Reddit style number of seconds are
+    supported) and emptied by sent requests. Requests are delayed while the
+    bucket is empty or a host asked to back off using the Retry-After header.
+    Hosts which don't report their rate limits are never throttled.
+    """
+
+    def __init__(self, max_wait: float = 300, default_backoff: float = 60):
+        """
+        RateLimiter initialization.
+
+        Parameters
+        ----------
+        max_wait : float, optional
+            Maximum time in seconds to wait for a rate limit reset. A
+            RateLimitError is raised instead of waiting longer.
+        default_backoff : float, optional
+            Time in seconds to back off after a 429 Too Many Requests
+            response without rate limit headers.
+        """
+        self.max_wait = max_wait
+        self.default_backoff = default_backoff
+        self._cond = threading.Condition()
+        self._hosts = collections.defaultdict(_HostBudget)
+
+    def acquire(self, host: str):
+        """
+        Takes a token from a host bucket, waiting for the rate limit reset
+        if the bucket is empty.
+
+        Parameters
+        ----------
+        host : str
+            Host name.
+
+        Raises
+        ------
+        RateLimitError
+            If the rate limit won't be reset in `max_wait` seconds.
+        """
+        with self._cond:
+            budget = self._hosts[host]
+            while True:
+                delay = self._get_delay(budget, time.monotonic())
+                if delay > self.max_wait:
+                    raise RateLimitError(f'{host} rate limit is exhausted, '
+                                         f'it will be reset in '
+                                         f'{delay:.0f} seconds')
+                if delay > 0:
+                    self._cond.wait(delay)
+                elif budget.inflight and budget.remaining is not None and \
+                        budget.remaining <= budget.inflight:
+                    # the budget may be spent by requests in flight, wait
+                    # for their responses to get the actual value
+                    self._cond.wait(1)
+                else:
+                    budget.inflight += 1
+                    return
+
+    def release(self, host: str):
+        """
+        Returns a token to a host bucket if a request hasn't been sent.
+
+        Parameters
+        ----------
+        host : str
+            Host name.
+        """
+        with self._cond:
+            budget = self._hosts[host]
+            budget.inflight = max(0, budget.inflight - 1)
+            self._cond.notify_all()
+
+    def update(self, host: str, status: int, headers: typing.Mapping):
+        """
+        Refills a host bucket from response headers.
+
+        Parameters
+        ----------
+        host : str
+            Host name.
+        status : int
+            Response status code.
+        headers : typing.Mapping
+            Response headers.
+        """
+        now = time.monotonic()
+        remaining = _parse_header_number(headers.get('X-RateLimit-Remaining'))
+        reset = _parse_header_number(headers.get('X-RateLimit-Reset'))
+        reset_at = None
+        if reset is not None:
+            # GitHub sends an epoch time, Reddit a number of seconds
+            reset_in = reset - time.time() if reset > 10 ** 9 else reset
+            reset_at = now + max(0.0, reset_in)
+        retry_after = _parse_retry_after(headers.get('Retry-After'))
+        with self._cond:
+            budget = self._hosts[host]
+            budget.inflight = max(0, budget.inflight - 1)
+            if remaining is not None:
+                if budget.remaining is None or reset_at is None or \
+                        budget.reset_at is None or \
+                        reset_at > budget.reset_at + 1:
+                    budget.remaining = int(remaining)
+                    budget.reset_at = reset_at
+                else:
+                    # responses may arrive out of order within a window
+                    budget.remaining = min(budget.remaining, int(remaining))
+            if retry_after is not None:
+                budget.blocked_until = max(budget.blocked_until,
+                                           now + retry_after)
+            elif status == 429 and remaining is None:
+                budget.blocked_until = max(budget.blocked_until,
+                                           now + self.default_backoff)
+            self._cond.notify_all()
+
+    def remaining(self, host: str) -> typing.Optional[int]:
+        """
+        Returns a number of requests which can be sent to a host before its
+        rate limit is reset.
+
+        Parameters
+        ----------
+        host : str
+            Host name.
+
+        Returns
+        -------
+        int or None
+            Remaining requests budget or None if it's unknown.
+        """
+        with self._cond:
+            budget = self._hosts.get(host)
+            if budget is None:
+                return None
+            self._get_delay(budget, time.monotonic())
+            if budget.remaining is None:
+                return None
+            return max(0, budget.remaining - budget.inflight)
+
+    def delay(self, host: str) -> float:
+        """
+        Returns time in seconds until a request to a host can be sent.
+
+        Parameters
+        ----------
+        host : str
+            Host name.
+
+        Returns
+        -------
+        float
+        """
+        with self._cond:
+            budget = self._hosts.get(host)
+            if budget is None:
+                return 0.0
+            return self._get_delay(budget, time.monotonic())
+
+    def get_budgets(self) -> typing.Dict[str, typing.Optional[int]]:
+        """
+        Returns remaining requests budget of all known hosts.
+
+        Returns
+        -------
+        dict
+            Host names to remaining requests budget mapping, the budget is
+            None if a host doesn't report its rate limit.
+        """
+        with self._cond:
+            hosts = list(self._hosts)
+        return {host: self.remaining(host) for host in hosts}
+
+    @staticmethod
+    def _get_delay(budget: _HostBudget, now: float) -> float:
+        if budget.reset_at is not None and now >= budget.reset_at:
+            # a new rate limit window has started
+            budget.remaining = budget.reset_at = None
+        delay = max(0.0, budget.blocked_until - now)
+        if budget.remaining is not None and budget.remaining <= 0 and \
+                budget.reset_at is not None:
+            delay = max(delay, budget.reset_at - now)
+        return delay
+
+
+def _parse_header_number(value: typing.Optional[str]
+                         ) -> typing.Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _parse_retry_after(value: typing.Optional[str]
+                       ) -> typing.Optional[float]:
+    if not value:
+        return None
+    seconds = _parse_header_number(value)
+    if seconds is not None:
+        return max(0.0, seconds)
+    try:
+        dt = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, dt.timestamp() - time.time())
+
+
+def get_http_client() -> HTTPClient:
+    """
+    Returns the HTTP client shared by all sensors within a process.
+
+    Returns
+    -------
+    HTTPClient
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            cache = ValidatorCache(os.path.join(CACHE_DIR, 'http-cache.db'))
+            _http_client = HTTPClient(cache=cache,
+                                      rate_limiter=RateLimiter(),
+                                      circuit_breaker=CircuitBreaker(),
+                                      timings=get_timings())
+        return _http_client
 
 
 def get_iso8601_ts() -> str:
@@ -79,8 +1497,213 @@ def get_usage_stats_topic_name(platform: str, org: str,  image: str) -> str:
     return f'stats/usage/{platform}/{org}/{image}'
 
 
+def topic_to_point(topic: str, message: dict) -> typing.Tuple[
+        str, typing.Dict[str, str], typing.Dict[str, typing.Any], int]:
+    """
+    Converts an MQTT topic name and message to an InfluxDB data point the
+    same way as the Telegraf configuration shipped with the project does.
+
+    Parameters
+    ----------
+    topic : str
+        MQTT topic name.
+    message : dict
+        Message with an ISO 8601 `ts` field.
+
+    Returns
+    -------
+    tuple
+        Measurement name, tags, fields and timestamp in nanoseconds.
+
+    Raises
+    ------
+    ValueError
+        If the topic name format is not supported.
+    """
+    parts = topic.split('/')
+    if len(parts) == 5 and parts[:2] == ['stats', 'usage']:
+        measurement = 'distro_spread'
+        tags = dict(zip(('platform', 'org', 'image'), parts[2:]))
+    elif len(parts) == 5 and parts[:3] == ['stats', 'social', 'github']:
+        measurement = 'alma_social'
+        tags = dict(zip(('platform', 'org', 'repo'), parts[2:]))
+    elif 3 <= len(parts) <= 4 and parts[:2] == ['stats', 'social']:
+        measurement = 'alma_social'
+        tags = dict(zip(('platform', 'org'), parts[2:]))
+    elif len(parts) == 3 and parts[:2] == ['stats', 'witness']:
+        measurement = 'witness'
+        tags = {'sensor': parts[2]}
+    else:
+        raise ValueError(f'unsupported MQTT topic {topic}')
+    fields = {}
+    for key, value in message.items():
+        if key == 'ts':
+            continue
+        if key in MESSAGE_TAG_KEYS:
+            tags[key] = str(value)
+            continue
+        # Telegraf JSON parser stores all numbers as floats, keep the same
+        # field types to avoid InfluxDB field type conflicts
+        if isinstance(value, bool):
+            fields[key] = value
+        elif isinstance(value, (int, float)):
+            fields[key] = float(value)
+    if 'ts' in message:
+        dt = datetime.datetime.strptime(message['ts'], '%Y-%m-%dT%H:%M:%SZ')
+        ts = int(dt.replace(tzinfo=datetime.timezone.utc).timestamp())
+    else:
+        ts = int(time.time())
+    return measurement, tags, fields, ts * 10 ** 9
+
+
+def format_line_protocol(measurement: str, tags: typing.Dict[str, str],
+                         fields: typing.Dict[str, typing.Any],
+                         ts: int) -> str:
+    """
+    Formats a data point using the InfluxDB line protocol.
+
+    Parameters
+    ----------
+    measurement : str
+        Measurement name.
+    tags : dict
+        Point tags.
+    fields : dict
+        Point fields.
+    ts : int
+        Timestamp in nanoseconds.
+
+    Returns
+    -------
+    str
+    """
+    def escape(value: str, chars: str) -> str:
+        for char in '\\' + chars:
+            value = value.replace(char, f'\\{char}')
+        return value
+
+    def format_field(value: typing.Any) -> str:
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        elif isinstance(value, int):
+            return f'{value}i'
+        elif isinstance(value, float):
+            return repr(value)
+        return '"{0}"'.format(str(value).replace('\\', '\\\\')
+                              .replace('"', '\\"'))
+    #
+    line = escape(measurement, ', ')
+    for key, value in sorted(tags.items()):
+        if value != '':
+            line += f',{escape(key, ",= ")}={escape(str(value), ",= ")}'
+    line += ' ' + ','.join(f'{escape(key, ",= ")}={format_field(value)}'
+                           for key, value in sorted(fields.items()))
+    return f'{line} {ts}'
+
+
+class InfluxDBPublisher:
+
+    """
+    Publisher which writes messages directly to the InfluxDB v2 HTTP API
+    using the line protocol, bypassing MQTT and Telegraf.
+    """
+
+    def __init__(self, url: str, token: str, org: str, bucket: str,
+                 batch_size: int = 5000,
+                 tags: typing.Optional[typing.Dict[str, str]] = None):
+        """
+        InfluxDBPublisher initialization.
+
+        Parameters
+        ----------
+        url : str
+            InfluxDB server URL.
+        token : str
+            InfluxDB authentication token.
+        org : str
+            InfluxDB organization name.
+        bucket : str
+            InfluxDB bucket name.
+        batch_size : int, optional
+            Maximum number of points to send in one request.
+        tags : dict, optional
+            Additional tags to add to every point.
+        """
+        params = urllib.parse.urlencode({'org': org, 'bucket': bucket,
+                                         'precision': 'ns'})
+        self.write_url = f'{url.rstrip("/")}/api/v2/write?{params}'
+        self.token = token
+        self.batch_size = batch_size
+        self.tags = tags or {}
+        self.published = 0
+        self._lines = []
+        self._lock = threading.Lock()
+        # a dedicated client isn't affected by the upstream fetching
+        # deadline and circuit breaker
+        self._http_client = HTTPClient()
+
+    def publish(self, topic: str, message: dict):
+        """
+        Adds a message to the write batch. The batch is sent when it is full
+        or on flush. Messages of topics which can't be mapped to a point and
+        messages without numeric fields are skipped.
+
+        Parameters
+        ----------
+        topic : str
+            MQTT topic name which defines the point measurement and tags.
+        message : dict
+            Message to publish.
+        """
+        try:
+            measurement, tags, fields, ts = topic_to_point(topic, message)
+        except ValueError as e:
+            logging.warning('can not write %s message to InfluxDB: %s',
+                            topic, e)
+            return
+        if not fields:
+            return
+        line = format_line_protocol(measurement, dict(self.tags, **tags),
+                                    fields, ts)
+        with self._lock:
+            self._lines.append(line)
+            if len(self._lines) >= self.batch_size:
+                self._write()
+
+    def flush(self):
+        """
+        Sends buffered points to InfluxDB.
+
+        Raises
+        ------
+        PublishError
+            If InfluxDB rejected the points.
+        """
+        with self._lock:
+            self._write()
+
+    def _write(self):
+        if not self._lines:
+            return
+        body = gzip.compress('\n'.join(self._lines).encode('utf-8'))
+        headers = {'Authorization': f'Token {self.token}',
+                   'Content-Encoding': 'gzip',
+                   'Content-Type': 'text/plain; charset=utf-8'}
+        try:
+            with get_timings().measure('publish'), \
+                    self._http_client.request('POST', self.write_url,
+                                              headers=headers,
+                                              body=body) as rsp:
+                rsp.read()
+        except urllib.error.HTTPError as e:
+            raise PublishError(f'InfluxDB write failed with status {e.code}: '
+                               f'{e.read().decode("utf-8", "replace")}')
+        self.published += len(self._lines)
+        self._lines.clear()
+
+
 @contextlib.contextmanager
-def mqtt_client(server: str, port: int):
+def mqtt_client(server: str, port: int, asynchronous: bool = False):
     """
     MQTT client context manager.
 
@@ -90,11 +1713,1095 @@ def mqtt_client(server: str, port: int):
         MQTT server hostname or IP address.
     port : int
         MQTT server port.
+    asynchronous : bool, optional
+        Connect to the server in background, retrying until it's available,
+        instead of raising an error if it's not reachable.
     """
+    # paho-mqtt is imported on demand to keep the sensors start up fast
+    import paho.mqtt.client
     cli = paho.mqtt.client.Client()
-    cli.connect(server, port)
+    if asynchronous:
+        cli.connect_async(server, port)
+    else:
+        cli.connect(server, port)
     cli.loop_start()
     try:
         yield cli
     finally:
         cli.disconnect()
+
+
+class PublishError(Exception):
+
+    """MQTT messages publishing has failed."""
+
+    pass
+
+
+class MQTTPublisher:
+
+    """
+    Thread-safe MQTT publisher which pipelines encoded messages: up to
+    `max_inflight` messages are sent without waiting for acknowledgements,
+    which are collected asynchronously.
+
+    Messages are encoded either as JSON or using the InfluxDB line protocol.
+    Line protocol messages carry their measurement, tags and timestamp, so
+    they don't need any topic name parsing on the consumer side. They are
+    published to the original topic name prefixed with
+    `INFLUX_TOPIC_PREFIX`, messages without numeric fields are skipped.
+    """
+
+    def __init__(self, cli: 'paho.mqtt.client.Client', qos: int = 1,
+                 max_inflight: int = 100, timeout: float = 60,
+                 payload_format: str = 'json'):
+        """
+        MQTTPublisher initialization.
+
+        Parameters
+        ----------
+        cli : paho.mqtt.client.Client
+            Connected MQTT client with a running network loop.
+        qos : int, optional
+            QoS level for MQTT protocol.
+        max_inflight : int, optional
+            Maximum number of unacknowledged messages.
+        timeout : float, optional
+            Maximum time in seconds to wait for an acknowledgement.
+        payload_format : str, optional
+            Messages format: "json" or "influx" (the line protocol).
+        """
+        self.qos = qos
+        self.payload_format = payload_format
+        self.max_inflight = max_inflight
+        self.timeout = timeout
+        self.published = 0
+        self._cli = cli
+        self._cond = threading.Condition()
+        # unacknowledged message ids to their batches mapping
+        self._pending = {}
+        # acknowledgements received before publish() returned a message id
+        self._acked = set()
+        self._batch = MQTTPublishBatch(self)
+        cli.max_inflight_messages_set(max_inflight)
+        cli.on_publish = self._on_publish
+
+    def batch(self) -> 'MQTTPublishBatch':
+        """
+        Creates a batch of messages which are flushed independently from
+        other batches of this publisher, so that several threads can share
+        one MQTT connection.
+
+        Returns
+        -------
+        MQTTPublishBatch
+        """
+        return MQTTPublishBatch(self)
+
+    def publish(self, topic: str, message: dict):
+        """
+        Publishes a JSON encoded message to an MQTT topic without waiting
+        for its delivery. The call blocks if there are too many
+        unacknowledged messages.
+
+        Parameters
+        ----------
+        topic : str
+            MQTT topic name.
+        message : dict
+            Message to publish.
+
+        Raises
+        ------
+        PublishError
+            If an acknowledgement waiting timeout is reached.
+        """
+        self._publish(topic, message, self._batch)
+
+    def flush(self):
+        """
+        Waits until all messages published using the `publish` method are
+        acknowledged.
+
+        Raises
+        ------
+        PublishError
+            If some messages weren't published or acknowledged.
+        """
+        self._flush(self._batch)
+
+    def _publish(self, topic: str, message: dict, batch: 'MQTTPublishBatch'):
+        encoded = self._encode(topic, message)
+        if encoded is None:
+            return
+        with self._cond, get_timings().measure('publish'):
+            if not self._cond.wait_for(
+                    lambda: len(self._pending) < self.max_inflight,
+                    self.timeout):
+                raise PublishError(f'{len(self._pending)} message(s) are '
+                                   f'not acknowledged in {self.timeout} '
+                                   f'seconds')
+        import paho.mqtt.client
+        topic, payload = encoded
+        message_info = self._cli.publish(topic, payload, qos=self.qos)
+        # a QoS > 0 message is queued and will be delivered after
+        # reconnection if there is no connection to the server
+        if message_info.rc not in (paho.mqtt.client.MQTT_ERR_SUCCESS,
+                                   paho.mqtt.client.MQTT_ERR_NO_CONN) \
+                or (message_info.rc != paho.mqtt.client.MQTT_ERR_SUCCESS
+                    and self.qos == 0):
+            error = paho.mqtt.client.error_string(message_info.rc)
+            with self._cond:
+                batch._errors.append(f'{topic}: {error}')
+            return
+        with self._cond:
+            self.published += 1
+            batch.published += 1
+            if self.qos == 0:
+                return
+            if message_info.mid in self._acked:
+                self._acked.discard(message_info.mid)
+            else:
+                self._pending[message_info.mid] = batch
+                batch._pending.add(message_info.mid)
+
+    def _flush(self, batch: 'MQTTPublishBatch'):
+        with self._cond, get_timings().measure('publish'):
+            delivered = self._cond.wait_for(lambda: not batch._pending,
+                                            self.timeout)
+            errors, batch._errors = batch._errors, []
+            if not delivered:
+                errors.append(f'{len(batch._pending)} message(s) are not '
+                              f'acknowledged in {self.timeout} seconds')
+                for mid in batch._pending:
+                    self._pending.pop(mid, None)
+                batch._pending.clear()
+        if errors:
+            raise PublishError('; '.join(errors))
+
+    def _encode(self, topic: str, message: dict
+                ) -> typing.Optional[typing.Tuple[str, str]]:
+        if self.payload_format == 'influx':
+            try:
+                point = topic_to_point(topic, message)
+            except ValueError:
+                # third-party sensors topics are unknown to topic_to_point,
+                # they are published as is
+                pass
+            else:
+                # a line protocol point without fields is invalid
+                if not point[2]:
+                    return None
+                return (f'{INFLUX_TOPIC_PREFIX}{topic}',
+                        format_line_protocol(*point))
+        return topic, json.dumps(message)
+
+    def _on_publish(self, cli: 'paho.mqtt.client.Client',
+                    userdata: typing.Any, mid: int):
+        with self._cond:
+            batch = self._pending.pop(mid, None)
+            if batch is not None:
+                batch._pending.discard(mid)
+                self._cond.notify_all()
+            else:
+                self._acked.add(mid)
+
+
+class MQTTPublishBatch:
+
+    """
+    Messages published using a shared `MQTTPublisher` which are
+    acknowledged and reported independently from other batches, see
+    `MQTTPublisher.batch`.
+    """
+
+    def __init__(self, publisher: MQTTPublisher):
+        """
+        MQTTPublishBatch initialization.
+
+        Parameters
+        ----------
+        publisher : MQTTPublisher
+            Publisher to send messages with.
+        """
+        self.publisher = publisher
+        self.published = 0
+        self._pending = set()
+        self._errors = []
+
+    def publish(self, topic: str, message: dict):
+        """
+        Publishes a message, see `MQTTPublisher.publish`.
+
+        Parameters
+        ----------
+        topic : str
+            MQTT topic name.
+        message : dict
+            Message to publish.
+        """
+        self.publisher._publish(topic, message, self)
+
+    def flush(self):
+        """
+        Waits until all messages of the batch are acknowledged.
+
+        Raises
+        ------
+        PublishError
+            If some messages weren't published or acknowledged.
+        """
+        self.publisher._flush(self)
+
+
+@contextlib.contextmanager
+def mqtt_publisher(server: str, port: int, qos: int = 1,
+                   max_inflight: int = 100, payload_format: str = 'json'):
+    """
+    Pipelined MQTT publisher context manager. All published messages are
+    flushed on exit, even if an exception is raised.
+
+    Parameters
+    ----------
+    server : str
+        MQTT server hostname or IP address.
+    port : int
+        MQTT server port.
+    qos : int, optional
+        QoS level for MQTT protocol.
+    max_inflight : int, optional
+        Maximum number of unacknowledged messages.
+    payload_format : str, optional
+        Messages format: "json" or "influx" (the line protocol).
+    """
+    with mqtt_client(server, port) as cli:
+        publisher = MQTTPublisher(cli, qos=qos, max_inflight=max_inflight,
+                                  payload_format=payload_format)
+        try:
+            yield publisher
+        except BaseException:
+            _flush_on_error(publisher)
+            raise
+        publisher.flush()
+
+
+def _flush_on_error(publisher: typing.Any):
+    # messages of successfully processed targets are delivered even if the
+    # run has failed, a flush error must not hide the original one
+    try:
+        publisher.flush()
+    except Exception as e:
+        logging.warning('can not flush published messages: %s', e)
+
+
+class Spool:
+
+    """
+    Persistent append-only outbox of MQTT messages.
+
+    Messages are saved to an SQLite database (in the WAL mode) first and are
+    replayed to an MQTT server later, so they aren't lost if the server is
+    unavailable. The oldest messages are evicted when the spool size limit
+    is exceeded.
+    """
+
+    def __init__(self, db_path: str, max_messages: int = 100000,
+                 buffer_size: int = 1000):
+        """
+        Spool initialization.
+
+        Parameters
+        ----------
+        db_path : str
+            Spool database file path.
+        max_messages : int, optional
+            Maximum number of spooled messages.
+        buffer_size : int, optional
+            Number of messages to buffer in memory before writing them to the
+            database.
+        """
+        self.db_path = db_path
+        self.max_messages = max_messages
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._con = None
+        self._lock = threading.RLock()
+
+    def publish(self, topic: str, message: dict):
+        """
+        Adds a message to the spool. The message is written to the database
+        on the next flush.
+
+        Parameters
+        ----------
+        topic : str
+            MQTT topic name.
+        message : dict
+            Message to spool.
+        """
+        with self._lock:
+            self._buffer.append((topic, json.dumps(message), time.time()))
+            if len(self._buffer) >= self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        """Writes buffered messages to the database."""
+        with self._lock:
+            if not self._buffer:
+                return
+            con = self._connect()
+            with con:
+                con.executemany('INSERT INTO spool (topic, message, created) '
+                                'VALUES (?, ?, ?)', self._buffer)
+                con.execute(
+                    'DELETE FROM spool WHERE id IN ('
+                    '  SELECT id FROM spool ORDER BY id DESC '
+                    '  LIMIT -1 OFFSET ?)', (self.max_messages,)
+                )
+            self._buffer.clear()
+
+    def get_batch(self, limit: int) -> typing.List[
+            typing.Tuple[int, str, dict]]:
+        """
+        Returns the oldest spooled messages.
+
+        Parameters
+        ----------
+        limit : int
+            Maximum number of messages to return.
+
+        Returns
+        -------
+        list
+            List of message ID, MQTT topic name and message tuples.
+        """
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT id, topic, message FROM spool ORDER BY id LIMIT ?',
+                (limit,)
+            ).fetchall()
+        return [(msg_id, topic, json.loads(message))
+                for msg_id, topic, message in rows]
+
+    def delete(self, max_id: int):
+        """
+        Deletes delivered messages.
+
+        Parameters
+        ----------
+        max_id : int
+            Messages with IDs less or equal to this value are deleted.
+        """
+        with self._lock:
+            con = self._connect()
+            with con:
+                con.execute('DELETE FROM spool WHERE id <= ?', (max_id,))
+
+    def close(self):
+        """Writes buffered messages and closes the spool database."""
+        with self._lock:
+            self.flush()
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            count = self._connect().execute(
+                'SELECT count(*) FROM spool'
+            ).fetchone()[0]
+            return count + len(self._buffer)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._con is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            con = sqlite3.connect(self.db_path, timeout=30,
+                                  check_same_thread=False)
+            con.execute('PRAGMA journal_mode=WAL')
+            with con:
+                con.execute('CREATE TABLE IF NOT EXISTS spool ('
+                            '  id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                            '  topic TEXT NOT NULL, message TEXT NOT NULL, '
+                            '  created REAL NOT NULL)')
+            self._con = con
+        return self._con
+
+
+def drain_spool(spool: Spool, publisher: typing.Union[MQTTPublisher,
+                                                      'InfluxDBPublisher'],
+                batch_size: int = 1000) -> int:
+    """
+    Replays spooled messages to an output, oldest first.
+
+    A batch of messages is removed from the spool only after all of them
+    are acknowledged. Nothing is done if another process is draining the
+    same spool.
+
+    Parameters
+    ----------
+    spool : Spool
+        Messages spool.
+    publisher : MQTTPublisher or InfluxDBPublisher
+        Output publisher.
+    batch_size : int, optional
+        Number of messages to replay at once.
+
+    Returns
+    -------
+    int
+        Number of replayed messages.
+
+    Raises
+    ------
+    PublishError
+        If messages publishing has failed. Not delivered messages are kept
+        in the spool.
+    """
+    spool.flush()
+    count = 0
+    try:
+        with file_lock(f'{spool.db_path}.lock', blocking=False):
+            while True:
+                batch = spool.get_batch(batch_size)
+                if not batch:
+                    break
+                for _, topic, message in batch:
+                    publisher.publish(topic, message)
+                publisher.flush()
+                spool.delete(batch[-1][0])
+                count += len(batch)
+    except BlockingIOError:
+        pass
+    return count
+
+
+class LastValueStore:
+
+    """
+    Persistent store of the last published messages values, it is shared by
+    all sensors.
+
+    A message is identified by its topic and tag values (see
+    `MESSAGE_TAG_KEYS`), so e.g. every DistroWatch data span or Vagrant box
+    version has its own last value. A message is unchanged if it has the same
+    fields as the last published one and its numeric fields differ from the
+    published values by no more than the deadband.
+    """
+
+    def __init__(self, db_path: str, deadband: float = 0,
+                 heartbeat: int = 12):
+        """
+        LastValueStore initialization.
+
+        Parameters
+        ----------
+        db_path : str
+            Store database file path.
+        deadband : float, optional
+            Maximum numeric value change, in percent of the last published
+            value, which is considered insignificant.
+        heartbeat : int, optional
+            Number of runs after which an unchanged message is published
+            anyway, so that gaps in the data are visible. 0 disables
+            heartbeats.
+        """
+        self.db_path = db_path
+        self.deadband = deadband
+        self.heartbeat = heartbeat
+        self._con = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(topic: str, message: dict) -> str:
+        """
+        Returns a message identifier.
+
+        Parameters
+        ----------
+        topic : str
+            MQTT topic name.
+        message : dict
+            Message.
+
+        Returns
+        -------
+        str
+        """
+        tags = [[key, message[key]] for key in MESSAGE_TAG_KEYS
+                if key in message]
+        return json.dumps([topic] + tags)
+
+    @staticmethod
+    def get_values(message: dict) -> dict:
+        """
+        Returns message values which are compared to the last published
+        ones: everything except the timestamp and tags.
+
+        Parameters
+        ----------
+        message : dict
+            Message.
+
+        Returns
+        -------
+        dict
+        """
+        return {key: value for key, value in message.items()
+                if key != 'ts' and key not in MESSAGE_TAG_KEYS}
+
+    def is_unchanged(self, last_values: dict, values: dict) -> bool:
+        """
+        Checks if message values are the same as the last published ones
+        within the deadband.
+
+        Parameters
+        ----------
+        last_values : dict
+            Last published values.
+        values : dict
+            New values.
+
+        Returns
+        -------
+        bool
+        """
+        if last_values.keys() != values.keys():
+            return False
+        for key, value in values.items():
+            last_value = last_values[key]
+            if _is_number(value) and _is_number(last_value):
+                if abs(value - last_value) > \
+                        abs(last_value) * self.deadband / 100:
+                    return False
+            elif value != last_value:
+                return False
+        return True
+
+    def get(self, key: str) -> typing.Optional[typing.Tuple[dict, int]]:
+        """
+        Returns the last published values of a message.
+
+        Parameters
+        ----------
+        key : str
+            Message identifier, see `get_key`.
+
+        Returns
+        -------
+        tuple or None
+            Last published values and a number of skipped messages since
+            then or None if the message has never been published.
+        """
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT message_values, skipped FROM last_values '
+                'WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def update(self, entries: typing.Dict[str, typing.Tuple[dict, int]]):
+        """
+        Saves last published values of messages.
+
+        Parameters
+        ----------
+        entries : dict
+            Message identifiers to last published values and skipped
+            messages count mapping.
+        """
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            con = self._connect()
+            with con:
+                con.executemany(
+                    'INSERT OR REPLACE INTO last_values '
+                    '(key, message_values, skipped, updated) '
+                    'VALUES (?, ?, ?, ?)',
+                    [(key, json.dumps(values), skipped, now)
+                     for key, (values, skipped) in entries.items()]
+                )
+
+    def close(self):
+        """Closes the store database."""
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._con is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            con = sqlite3.connect(self.db_path, timeout=30,
+                                  check_same_thread=False)
+            con.execute('PRAGMA journal_mode=WAL')
+            with con:
+                con.execute('CREATE TABLE IF NOT EXISTS last_values ('
+                            '  key TEXT PRIMARY KEY, '
+                            '  message_values TEXT NOT NULL, '
+                            '  skipped INTEGER NOT NULL, '
+                            '  updated REAL NOT NULL)')
+            self._con = con
+        return self._con
+
+
+def _is_number(value: typing.Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class ChangesOnlyPublisher:
+
+    """
+    Publisher wrapper which skips messages that haven't changed since the
+    last published ones, an unchanged message is still published every
+    `heartbeat`-th time.
+
+    Changes are compared to the last published values rather than to the
+    last seen ones, so slowly growing counters are published as soon as
+    they leave the deadband. The store is updated on flush, after the
+    wrapped publisher has delivered messages.
+    """
+
+    def __init__(self, publisher: typing.Union[MQTTPublisher, Spool,
+                                               'InfluxDBPublisher'],
+                 store: LastValueStore):
+        """
+        ChangesOnlyPublisher initialization.
+
+        Parameters
+        ----------
+        publisher : MQTTPublisher or Spool or InfluxDBPublisher
+            Wrapped publisher.
+        store : LastValueStore
+            Last published values store.
+        """
+        self.skipped = 0
+        self._publisher = publisher
+        self._store = store
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def publish(self, topic: str, message: dict):
+        """
+        Publishes a message if it has changed.
+
+        Parameters
+        ----------
+        topic : str
+            MQTT topic name.
+        message : dict
+            Message to publish.
+        """
+        store = self._store
+        key = store.get_key(topic, message)
+        values = store.get_values(message)
+        with self._lock:
+            last = self._pending.get(key) or store.get(key)
+            if last is not None:
+                last_values, skipped = last
+                if store.is_unchanged(last_values, values) and \
+                        (not store.heartbeat
+                         or skipped + 1 < store.heartbeat):
+                    self._pending[key] = (last_values, skipped + 1)
+                    self.skipped += 1
+                    get_timings().count('skipped_messages')
+                    return
+            self._pending[key] = (values, 0)
+        self._publisher.publish(topic, message)
+
+    def flush(self):
+        """
+        Flushes the wrapped publisher and saves the last published values.
+        """
+        self._publisher.flush()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        self._store.update(pending)
+
+
+@contextlib.contextmanager
+def file_lock(lock_path: str, blocking: bool = True):
+    """
+    Exclusive inter-process file lock context manager.
+
+    Parameters
+    ----------
+    lock_path : str
+        Lock file path.
+    blocking : bool, optional
+        Wait until the lock is released by another process. BlockingIOError
+        is raised if the lock is held and this is False.
+    """
+    lock_dir = os.path.dirname(lock_path)
+    if lock_dir:
+        os.makedirs(lock_dir, exist_ok=True)
+    with open(lock_path, 'a') as fd:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        fcntl.flock(fd, flags)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class AlreadyRunningError(Exception):
+
+    """Previous sensor run with the same arguments is still in progress."""
+
+    pass
+
+
+@contextlib.contextmanager
+def guarded_run(name: str, args: argparse.Namespace,
+                sys_args: typing.List[str]):
+    """
+    Sensor run context manager which prevents overlapping and hung runs.
+
+    A run lock is taken for the sensor and its command line arguments, so a
+    new run doesn't start while the previous one is in progress. HTTP
+    requests timeout and deadline are configured using the arguments added
+    with `add_run_arg_parser_args`. If the process is still running one
+    minute after the deadline, DeadlineExceeded is raised in the main thread
+    by a SIGALRM handler, so that buffered messages and download progress
+    are saved during the stack unwinding. If the unwinding doesn't finish in
+    another minute, the process is terminated by the next SIGALRM.
+
+    When the run is finished (either successfully or not), its statistics
+    are submitted to the `stats/witness/{name}` topic:
+
+        {"run_time": float, "errors": int, "http_requests": int,
+         "http_errors": int, "skipped_messages": int, "dns_time": float,
+         "connect_time": float, "tls_time": float, "ttfb_time": float,
+         "download_time": float, "parse_time": float, "db_time": float,
+         "publish_time": float, "ts": str}
+
+    where `*_time` values are total time in seconds spent in a phase by all
+    threads, phases which didn't happen are omitted. `skipped_messages` is
+    a number of unchanged messages skipped in the change-only mode.
+    `rate_limit_remaining_{host}` values are added for every host which
+    reports its rate limit, they contain the remaining requests budget.
+
+    Parameters
+    ----------
+    name : str
+        Sensor name.
+    args : argparse.Namespace
+        Parsed command line arguments.
+    sys_args : list
+        Command line arguments, they identify the run lock.
+
+    Raises
+    ------
+    AlreadyRunningError
+        If the previous run is still in progress.
+    """
+    key = hashlib.sha1('\0'.join(sys_args).encode('utf-8')).hexdigest()
+    lock_path = os.path.join(CACHE_DIR, 'locks', f'{name}-{key[:16]}.lock')
+    with contextlib.ExitStack() as stack:
+        try:
+            stack.enter_context(file_lock(lock_path, blocking=False))
+        except BlockingIOError:
+            raise AlreadyRunningError(f'{name} sensor is already running '
+                                      f'with the same arguments') from None
+        http_client = get_http_client()
+        http_client.timeout = args.timeout
+        if args.deadline:
+            http_client.set_deadline(args.deadline)
+            if threading.current_thread() is threading.main_thread():
+                prev_handler = signal.signal(signal.SIGALRM,
+                                             _on_deadline_alarm)
+                stack.callback(signal.signal, signal.SIGALRM, prev_handler)
+                signal.alarm(int(args.deadline) + DEADLINE_GRACE_PERIOD)
+                stack.callback(signal.alarm, 0)
+        start = time.monotonic()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            if not args.no_self_stats:
+                _publish_run_stats(name, args, time.monotonic() - start,
+                                   failed)
+
+
+def _on_deadline_alarm(signum: int, frame: typing.Any):
+    # the default SIGALRM action terminates the process if the cleanup code
+    # hangs as well
+    signal.signal(signal.SIGALRM, signal.SIG_DFL)
+    signal.alarm(DEADLINE_GRACE_PERIOD)
+    raise DeadlineExceeded('run deadline is exceeded')
+
+
+def get_run_stats(run_time: float, failed: bool,
+                  timings: typing.Optional[Timings] = None
+                  ) -> typing.Dict[str, typing.Any]:
+    """
+    Returns a run statistics message for the `stats/witness/{name}` topic,
+    see `guarded_run` for its format.
+
+    Parameters
+    ----------
+    run_time : float
+        Run time in seconds.
+    failed : bool
+        Whether the run has failed.
+    timings : Timings, optional
+        Run timings. The timings shared by all sensors are used if omitted.
+
+    Returns
+    -------
+    dict
+        Run statistics message.
+    """
+    stats = (timings or get_timings()).summary()
+    rate_limiter = get_http_client().rate_limiter
+    if rate_limiter:
+        for host, remaining in rate_limiter.get_budgets().items():
+            if remaining is not None:
+                stats[f'rate_limit_remaining_{host}'] = remaining
+    stats.update(run_time=round(run_time, 6), errors=int(failed),
+                 ts=get_iso8601_ts())
+    return stats
+
+
+def _publish_run_stats(name: str, args: argparse.Namespace,
+                       run_time: float, failed: bool):
+    stats = get_run_stats(run_time, failed)
+    try:
+        with open_publisher(args, changes_only=False) as publisher:
+            publisher.publish(f'stats/witness/{name}', stats)
+    except Exception as e:
+        logging.warning('can not submit %s sensor run statistics: %s',
+                        name, e)
+
+
+@contextlib.contextmanager
+def open_publisher(args: argparse.Namespace, changes_only: bool = True):
+    """
+    Opens a messages publisher configured by the command line arguments
+    added with `add_mqtt_arg_parser_args`.
+
+    Messages are sent either to an MQTT server or directly to InfluxDB
+    depending on the selected output. If a spool is configured, messages
+    are saved to the spool first and replayed to the output on exit. The
+    spooled messages are kept for the next run if the output is unavailable.
+
+    If the `--changes-only` argument is specified, messages which haven't
+    changed since the last run are skipped (see `ChangesOnlyPublisher`).
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Parsed command line arguments.
+    changes_only : bool, optional
+        Skip unchanged messages if it's enabled by the arguments.
+    """
+    if not (changes_only and args.changes_only):
+        with _spooled_publisher(args) as publisher:
+            yield publisher
+        return
+    store = LastValueStore(args.state_db, args.deadband, args.heartbeat)
+    try:
+        with _spooled_publisher(args) as publisher:
+            publisher = ChangesOnlyPublisher(publisher, store)
+            yield publisher
+            publisher.flush()
+        if publisher.skipped:
+            logging.info('%d unchanged message(s) are skipped',
+                         publisher.skipped)
+    finally:
+        store.close()
+
+
+@contextlib.contextmanager
+def _spooled_publisher(args: argparse.Namespace):
+    if not args.spool:
+        with _output_publisher(args) as publisher:
+            yield publisher
+        return
+    spool = Spool(args.spool, args.spool_size)
+    try:
+        yield spool
+        spool.flush()
+        try:
+            with _output_publisher(args) as publisher:
+                drain_spool(spool, publisher)
+        except (OSError, PublishError) as e:
+            logging.warning('can not deliver spooled messages, %d message(s) '
+                            'are kept in %s: %s', len(spool), spool.db_path, e)
+    finally:
+        spool.close()
+
+
+@contextlib.contextmanager
+def _output_publisher(args: argparse.Namespace):
+    if args.output == 'influxdb':
+        if not args.influxdb_token:
+            raise ValueError('InfluxDB authentication token is required')
+        publisher = InfluxDBPublisher(args.influxdb_url, args.influxdb_token,
+                                      args.influxdb_org, args.influxdb_bucket,
+                                      tags=dict(args.influxdb_tag))
+        try:
+            yield publisher
+        except BaseException:
+            _flush_on_error(publisher)
+            raise
+        publisher.flush()
+    else:
+        with mqtt_publisher(args.server, args.port, args.qos,
+                            args.max_inflight,
+                            args.payload_format) as publisher:
+            yield publisher
+
+
+class ValidatorCache:
+
+    """
+    Persistent LRU cache of HTTP response validators (ETag and Last-Modified
+    headers) and decoded response bodies keyed by URL and credentials (see
+    `get_key`).
+
+    The cache is used to send conditional requests: a server replies with
+    304 Not Modified if a resource hasn't changed, so the cached body is used
+    instead of downloading it again.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 1024):
+        """
+        ValidatorCache initialization.
+
+        Parameters
+        ----------
+        db_path : str
+            Cache database file path.
+        max_entries : int, optional
+            Maximum number of cached URLs. Least recently used entries are
+            evicted when the limit is exceeded.
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._con = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(url: str,
+                headers: typing.Optional[typing.Mapping[str, str]] = None
+                ) -> str:
+        """
+        Returns a cache key for a request.
+
+        A response may depend on the request credentials (e.g. private
+        repositories are listed for authenticated clients only), so a hash of
+        the Authorization header is added to the URL. The credentials
+        themselves are never stored.
+
+        Parameters
+        ----------
+        url : str
+            Resource URL.
+        headers : dict, optional
+            Request headers.
+
+        Returns
+        -------
+        str
+        """
+        for name, value in (headers or {}).items():
+            if name.lower() == 'authorization':
+                digest = hashlib.sha256(value.encode('utf-8')).hexdigest()
+                return f'{url} {digest}'
+        return url
+
+    def get(self, url: str) -> typing.Optional[typing.Tuple[
+            typing.Optional[str], typing.Optional[str], typing.Any]]:
+        """
+        Returns cached validators and body for the URL.
+
+        Parameters
+        ----------
+        url : str
+            Resource URL or a cache key returned by `get_key`.
+
+        Returns
+        -------
+        tuple or None
+            ETag, Last-Modified and decoded body tuple or None if there is
+            no cache entry for the URL.
+        """
+        with self._lock:
+            con = self._connect()
+            row = con.execute(
+                'SELECT etag, last_modified, body FROM http_cache '
+                'WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            with con:
+                con.execute('UPDATE http_cache SET accessed = ? WHERE url = ?',
+                            (time.time(), url))
+        return row[0], row[1], json.loads(row[2])
+
+    def put(self, url: str, etag: typing.Optional[str],
+            last_modified: typing.Optional[str], body: typing.Any):
+        """
+        Saves validators and decoded body for the URL.
+
+        Parameters
+        ----------
+        url : str
+            Resource URL or a cache key returned by `get_key`.
+        etag : str or None
+            ETag header value.
+        last_modified : str or None
+            Last-Modified header value.
+        body : typing.Any
+            Decoded JSON response body.
+        """
+        with self._lock:
+            con = self._connect()
+            with con:
+                con.execute(
+                    'INSERT OR REPLACE INTO http_cache '
+                    '(url, etag, last_modified, body, accessed) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (url, etag, last_modified, json.dumps(body), time.time())
+                )
+                con.execute(
+                    'DELETE FROM http_cache WHERE url IN ('
+                    '  SELECT url FROM http_cache ORDER BY accessed DESC '
+                    '  LIMIT -1 OFFSET ?)', (self.max_entries,)
+                )
+
+    def close(self):
+        """Closes the cache database."""
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._con is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            con = sqlite3.connect(self.db_path, timeout=30,
+                                  check_same_thread=False)
+            con.execute('PRAGMA journal_mode=WAL')
+            with con:
+                con.execute('CREATE TABLE IF NOT EXISTS http_cache ('
+                            '  url TEXT PRIMARY KEY, etag TEXT, '
+                            '  last_modified TEXT, body TEXT NOT NULL, '
+                            '  accessed REAL NOT NULL)')
+                con.execute('CREATE INDEX IF NOT EXISTS http_cache_accessed '
+                            'ON http_cache (accessed)')
+            self._con = con
+        return self._con
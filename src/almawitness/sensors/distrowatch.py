@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: Eugene Zamriy <ezamriy@almalinux.org>
+# created: 2022-10-13
+
+"""
+Submits DistroWatch rank and hits count for the specified distributions to
+MQTT topics.
+
+MQTT topic name format:
+
+    stats/social/distrowatch/{organization}'
+
+The program uses the JSON format to encode a message:
+
+    {"rank": int, "hits": int, "span": int, "ts": "str"}
+
+where `span` is the ranking data span in weeks: 4, 12, 26 or 52. It is
+omitted for the default last 7 days ranking (span 1), so its series stays
+the same as before data spans were supported. Several data spans are fetched
+concurrently. Since longer span rankings change slowly, they are cached on
+disk for 6 to 48 hours (see `DATASPAN_TTL`).
+
+Execution examples:
+
+    $ distrowatch_stats_sensor.py -o 'almalinux'
+    $ distrowatch_stats_sensor.py -m almalinux=almalinux -m rocky=rocky \
+        --span 1 4 12 26 52
+"""
+
+import argparse
+import codecs
+import html.parser
+import os
+import re
+import sys
+import time
+import typing
+
+
+from almawitness.sensors.common import (
+    add_fetch_arg_parser_args,
+    add_mqtt_arg_parser_args,
+    add_run_arg_parser_args,
+    fetch_concurrently,
+    get_http_client,
+    get_iso8601_ts,
+    get_timings,
+    guarded_run,
+    load_json_file,
+    open_publisher,
+    parse_org_query,
+    save_json_file,
+    CACHE_DIR,
+    HTTP_CHUNK_SIZE
+)
+
+
+# data span in weeks to ranking cache TTL in seconds mapping, the last 7 days
+# ranking is always fetched
+DATASPAN_TTL = {1: 0, 4: 6 * 3600, 12: 12 * 3600, 26: 24 * 3600,
+                52: 48 * 3600}
+
+# messages of the default data span have no `span` tag
+DEFAULT_DATASPAN = 1
+
+
+def init_arg_parser() -> argparse.ArgumentParser:
+    """
+    Creates and initializes a command line arguments parser.
+
+    Returns:
+        Command line arguments parser.
+    """
+    arg_parser = argparse.ArgumentParser(
+        description="DistroWatch page hit ranking statistics sensor"
+    )
+    orgs_group = arg_parser.add_mutually_exclusive_group(required=True)
+    orgs_group.add_argument('-o', '--organization',
+                            help='Organization (distribution) name. It will '
+                                 'be sent to an MQTT topic.')
+    orgs_group.add_argument('-m', '--org-query', action='append',
+                            type=parse_org_query, metavar='ORG=QUERY',
+                            help='Organization name and OS name query '
+                                 'pair. Can be specified multiple times '
+                                 'to process several organizations at once')
+    arg_parser.add_argument('--query',
+                            help='OS name as it shown on the DistroWatch. '
+                                 'Default value is the organization name.')
+    arg_parser.add_argument('--span', nargs='+', type=int,
+                            default=[DEFAULT_DATASPAN],
+                            choices=sorted(DATASPAN_TTL),
+                            help=f'Ranking data spans in weeks. Default is '
+                                 f'{DEFAULT_DATASPAN}')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help='Always fetch fresh rankings')
+    add_fetch_arg_parser_args(arg_parser, host_concurrency=2)
+    add_run_arg_parser_args(arg_parser)
+    add_mqtt_arg_parser_args(arg_parser)
+    return arg_parser
+
+
+class _PageHitRankingParser(html.parser.HTMLParser):
+
+    """
+    Incremental DistroWatch "Page Hit Ranking" table parser.
+
+    The `done` attribute is set as soon as the table is closed, so the rest
+    of the page doesn't need to be downloaded and parsed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.done = False
+        self.ranking = []
+        self._table_depth = 0
+        self._ranking_depth = None
+        self._header = None
+        self._row = {}
+        self._field = None
+
+    def handle_starttag(self, tag: str, attrs: list):
+        if tag == 'table':
+            self._table_depth += 1
+            return
+        if self._ranking_depth is None:
+            if tag == 'th':
+                self._header = ''
+            return
+        if tag == 'tr':
+            self._end_row()
+            return
+        css_class = dict(attrs).get('class')
+        if tag in ('th', 'td') and css_class in ('phr1', 'phr2', 'phr3'):
+            self._field = css_class
+            self._row[css_class] = ''
+        elif self._field == 'phr3':
+            # the hits count is followed by a trend image
+            self._field = None
+
+    def handle_endtag(self, tag: str):
+        if tag == 'table':
+            if self._table_depth == self._ranking_depth:
+                self._end_row()
+                self.done = True
+            self._table_depth -= 1
+        elif self._ranking_depth is None:
+            if tag == 'th' and self._header is not None:
+                if self._header.strip() == 'Page Hit Ranking':
+                    self._ranking_depth = self._table_depth
+                self._header = None
+        elif tag in ('th', 'td'):
+            self._field = None
+        elif tag == 'tr':
+            self._end_row()
+
+    def handle_data(self, data: str):
+        if self._header is not None:
+            self._header += data
+        elif self._field is not None and not self.done:
+            self._row[self._field] += data
+
+    def _end_row(self):
+        row, self._row = self._row, {}
+        self._field = None
+        try:
+            self.ranking.append({'rank': int(row['phr1']),
+                                 'name': row['phr2'].strip(),
+                                 'hits': int(row['phr3'])})
+        except (KeyError, ValueError):
+            pass
+
+
+def get_distro_ranking(dataspan: int = 1) -> typing.List[typing.Dict]:
+    """
+    Returns the DistroWatch page hit ranking table.
+
+    The page is parsed while it is being downloaded, the download stops
+    right after the ranking table.
+
+    Args:
+        dataspan: DistroWatch data span, 1 means the last 7 days.
+
+    Returns:
+        List of dictionaries containing a distribution name, rank and hits
+        count.
+    """
+    url = f'https://distrowatch.com/index.php?dataspan={dataspan}'
+    parser = _PageHitRankingParser()
+    timings = get_timings()
+    with get_http_client().get(url) as rsp:
+        charset = rsp.headers.get_content_charset() or 'utf-8'
+        decoder = codecs.getincrementaldecoder(charset)(errors='replace')
+        while not parser.done:
+            chunk = rsp.read(HTTP_CHUNK_SIZE)
+            with timings.measure('parse'):
+                parser.feed(decoder.decode(chunk, final=not chunk))
+            if not chunk:
+                break
+    parser.close()
+    return parser.ranking
+
+
+def get_cached_distro_ranking(dataspan: int = 1,
+                              cache_dir: typing.Optional[str] = CACHE_DIR
+                              ) -> typing.List[typing.Dict]:
+    """
+    Returns the DistroWatch page hit ranking table, a cached table is used
+    if it's younger than the data span TTL.
+
+    Args:
+        dataspan: DistroWatch data span in weeks.
+        cache_dir: Cache directory path, caching is disabled if None.
+
+    Returns:
+        List of dictionaries containing a distribution name, rank and hits
+        count.
+    """
+    if cache_dir is None or not DATASPAN_TTL[dataspan]:
+        return get_distro_ranking(dataspan)
+    cache_path = os.path.join(cache_dir, f'distrowatch-{dataspan}.json')
+    cached = load_json_file(cache_path)
+    if cached and time.time() - cached['fetched_at'] < DATASPAN_TTL[dataspan]:
+        return cached['ranking']
+    ranking = get_distro_ranking(dataspan)
+    if ranking:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            save_json_file(cache_path, {'fetched_at': time.time(),
+                                        'ranking': ranking})
+        except OSError:
+            pass
+    return ranking
+
+
+def find_distro(ranking: typing.List[typing.Dict],
+                os_name: str) -> typing.Optional[typing.Dict]:
+    """
+    Finds a distribution in the page hit ranking table.
+
+    Args:
+        ranking: Page hit ranking table.
+        os_name: Case-insensitive regular expression matching the
+            distribution name as it specified on DistroWatch.
+
+    Returns:
+        Dictionary containing a distribution rank and hits count or None if
+        the distribution is not found.
+    """
+    regex = re.compile(os_name, re.IGNORECASE)
+    for row in ranking:
+        if regex.search(row['name']):
+            return {'rank': row['rank'],
+                    'hits': row['hits'],
+                    'ts': get_iso8601_ts()}
+
+
+def get_distro_stats(os_name: str) -> typing.Optional[typing.Dict]:
+    """
+    Returns DistroWatch last 7 days hits and rank for the specified
+    distribution.
+
+    Args:
+        os_name: Distribution name as it specified on DistroWatch.
+
+    Returns:
+        Dictionary containing a distribution rank and hits count.
+    """
+    return find_distro(get_distro_ranking(), os_name)
+
+
+def collect(args: argparse.Namespace) -> typing.Iterator[
+        typing.Tuple[str, typing.Dict]]:
+    """
+    Collects DistroWatch statistics for the parsed command line arguments.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Iterator over MQTT topic name and message pairs.
+    """
+    if args.org_query:
+        queries = dict(args.org_query)
+    else:
+        queries = {args.organization: args.query or args.organization}
+    cache_dir = None if args.no_cache else CACHE_DIR
+    targets = [(span, cache_dir) for span in sorted(set(args.span))]
+    for (span, _), ranking in fetch_concurrently(
+            get_cached_distro_ranking, targets,
+            max_workers=args.concurrency,
+            max_per_host=args.host_concurrency):
+        for org, query in queries.items():
+            stats = find_distro(ranking, query)
+            if stats:
+                if span != DEFAULT_DATASPAN:
+                    stats['span'] = span
+                yield f'stats/social/distrowatch/{org}', stats
+
+
+def main(sys_args: typing.List[str]):
+    arg_parser = init_arg_parser()
+    args = arg_parser.parse_args(sys_args)
+    with guarded_run('distrowatch', args, sys_args), \
+            open_publisher(args) as publisher:
+        for mqtt_topic, stats in collect(args):
+            publisher.publish(mqtt_topic, stats)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
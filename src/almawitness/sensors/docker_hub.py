@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: Eugene Zamriy <ezamriy@almalinux.org>
+# created: 2020-06-06
+
+"""
+Submits a Docker Hub image usage statistics to an MQTT topic.
+
+MQTT topic name format:
+
+    stats/usage/dockerhub/{organization}/{image}
+
+The program uses the JSON format to encode a message:
+
+    {"pulls": int, "stars": int, "ts": str}
+
+Execution example:
+
+    $ docker_hub_stats_sensor.py -o library -i almalinux
+
+Several images can be passed at once, they will be queried concurrently:
+
+    $ docker_hub_stats_sensor.py -o almalinux -i 8-base 9-base 9-minimal
+
+Use the `--all` argument to submit statistics for every image of an
+organization. The image list is fetched page by page (100 images per request):
+
+    $ docker_hub_stats_sensor.py -o almalinux --all
+"""
+
+import argparse
+import sys
+import typing
+
+from almawitness.sensors.common import (
+    add_fetch_arg_parser_args,
+    add_mqtt_arg_parser_args,
+    add_run_arg_parser_args,
+    fetch_concurrently,
+    get_http_client,
+    get_iso8601_ts,
+    get_usage_stats_topic_name,
+    guarded_run,
+    open_publisher
+)
+
+
+DOCKER_HUB_HOST = 'hub.docker.com'
+
+
+def init_arg_parser() -> argparse.ArgumentParser:
+    """
+    Creates and initializes a command line arguments parser.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        Command line arguments parser.
+    """
+    arg_parser = argparse.ArgumentParser(
+        description="Docker Hub image statistics sensor"
+    )
+    images_group = arg_parser.add_mutually_exclusive_group(required=True)
+    images_group.add_argument('-i', '--image', nargs='+',
+                              help='Docker image name(s)')
+    images_group.add_argument('--all', action='store_true',
+                              help='Submit statistics for all organization '
+                                   'images')
+    arg_parser.add_argument('-o', '--organization', required=True,
+                            help='Docker Hub organization name')
+    add_fetch_arg_parser_args(arg_parser)
+    add_run_arg_parser_args(arg_parser)
+    add_mqtt_arg_parser_args(arg_parser)
+    return arg_parser
+
+
+def get_image_stats(org: str, image: str) -> dict:
+    """
+    Returns a Docker Hub image pulls and stars count.
+
+    Parameters
+    ----------
+    org : str
+        Docker Hub organization name.
+    image : str
+        Docker image name.
+
+    Returns
+    -------
+    dict
+        Dictionary containing an image pulls and stars count.
+    """
+    url = f'https://{DOCKER_HUB_HOST}/v2/repositories/{org}/{image}/'
+    j = get_http_client().get_json(url)
+    return {'pulls': j['pull_count'],
+            'stars': j['star_count'],
+            'ts': get_iso8601_ts()}
+
+
+def iter_org_images_stats(org: str, page_size: int = 100) -> typing.Iterator[
+        typing.Tuple[str, dict]]:
+    """
+    Iterates over pulls and stars count of all Docker Hub organization images.
+
+    Parameters
+    ----------
+    org : str
+        Docker Hub organization name.
+    page_size : int, optional
+        Number of images to request per page.
+
+    Returns
+    -------
+    typing.Iterator[typing.Tuple[str, dict]]
+        Iterator over image name and statistics pairs.
+    """
+    url = (f'https://{DOCKER_HUB_HOST}/v2/repositories/{org}/'
+           f'?page_size={page_size}')
+    http_client = get_http_client()
+    while url:
+        j = http_client.get_json(url)
+        ts = get_iso8601_ts()
+        for repo in j.get('results', ()):
+            yield repo['name'], {'pulls': repo['pull_count'],
+                                 'stars': repo['star_count'],
+                                 'ts': ts}
+        url = j.get('next')
+
+
+def collect(args: argparse.Namespace) -> typing.Iterator[
+        typing.Tuple[str, dict]]:
+    """
+    Collects Docker Hub statistics for the parsed command line arguments.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Parsed command line arguments.
+
+    Returns
+    -------
+    typing.Iterator[typing.Tuple[str, dict]]
+        Iterator over MQTT topic name and message pairs.
+    """
+    org = args.organization
+    if args.all:
+        images_stats = iter_org_images_stats(org)
+    else:
+        images_stats = (
+            (image, stats) for (_, image), stats in fetch_concurrently(
+                get_image_stats, [(org, image) for image in args.image],
+                get_host=lambda target: DOCKER_HUB_HOST,
+                max_workers=args.concurrency,
+                max_per_host=args.host_concurrency,
+                rate_limiter=get_http_client().rate_limiter
+            )
+        )
+    for image, image_stats in images_stats:
+        yield (get_usage_stats_topic_name('dockerhub', org, image),
+               image_stats)
+
+
+def main(sys_args: typing.List[str]):
+    arg_parser = init_arg_parser()
+    args = arg_parser.parse_args(sys_args)
+    #
+    with guarded_run('docker_hub', args, sys_args), \
+            open_publisher(args) as publisher:
+        for mqtt_topic, image_stats in collect(args):
+            publisher.publish(mqtt_topic, image_stats)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,622 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: Igor Seletskiy <iseletsk@almalinux.org>
+#         Eugene Zamriy <ezamriy@almalinux.org>
+# created: 2022-05-15
+
+"""
+Submits last week EPEL hits statistics to an MQTT topic.
+
+Data source:
+
+    https://data-analysis.fedoraproject.org/csv-reports/countme/totals.db
+
+MQTT topic name format:
+
+    stats/usage/epel/{organization}/{distro_ver}
+
+The sensor will send a message for each version of a distribution and a message
+with total hits number for all versions. The total message will be sent to the
+`stats/usage/epel/{organization/all` topic.
+
+The program uses the JSON format to encode a message:
+
+    {"hits": int, "ts": str}
+
+The `hits` field gives number of hits for the last week from EPEL.
+
+Execution example:
+
+    $ epel_stats_sensor.py -o almalinux --query 'almalinux%%'
+
+Note that OS name is case-insensitive, and you can use % wildcard, like Rocky%
+or Virtuozzo%.
+
+Several organizations can be processed in a single pass over the database
+using `organization=query` mappings:
+
+    $ epel_stats_sensor.py -m 'almalinux=almalinux%%' -m 'rocky=rocky%%' \
+                           -m 'centos=centos%%'
+
+Use the `--backfill` argument to submit the whole available history (or the
+history starting from the `--since` week number or date). Each message is
+timestamped with its week start time:
+
+    $ epel_stats_sensor.py -o almalinux --backfill --since 2023-01-01
+
+The database is re-downloaded only when the upstream file is changed, an
+interrupted download is resumed on the next run. Use the `--download-workers`
+argument to download several byte ranges of the file in parallel.
+"""
+
+import argparse
+import collections
+import datetime
+import os.path
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import typing
+
+from almawitness.sensors.common import (
+    add_mqtt_arg_parser_args,
+    add_run_arg_parser_args,
+    fetch_concurrently,
+    get_http_client,
+    get_iso8601_ts,
+    get_timings,
+    get_usage_stats_topic_name,
+    guarded_run,
+    load_json_file,
+    open_publisher,
+    parse_org_query,
+    save_json_file,
+    HTTP_CHUNK_SIZE
+)
+
+
+def init_arg_parser() -> argparse.ArgumentParser:
+    """
+    Creates and initializes a command line arguments parser.
+
+    Returns:
+        Command line arguments parser.
+    """
+    arg_parser = argparse.ArgumentParser(
+        description="EPEL community statistics sensor"
+    )
+    arg_parser.add_argument('-d', '--db-path', default='epel-totals.db',
+                            help='EPEL countme database download file path. '
+                                 'Default is epel-totals.db')
+    arg_parser.add_argument('--download-workers', default=1, type=int,
+                            help='Number of byte ranges to download in '
+                                 'parallel. Default is 1')
+    arg_parser.add_argument('--backfill', action='store_true',
+                            help='Submit historical statistics for all '
+                                 'available weeks')
+    arg_parser.add_argument('--since', type=parse_week,
+                            help='First week to backfill: a countme week '
+                                 'number or a YYYY-MM-DD date')
+    orgs_group = arg_parser.add_mutually_exclusive_group(required=True)
+    orgs_group.add_argument('-o', '--organization',
+                            help='Organization (distribution) name. It will '
+                                 'be used for grouping all matching records '
+                                 'under the same name')
+    orgs_group.add_argument('-m', '--org-query', action='append',
+                            type=parse_org_query, metavar='ORG=QUERY',
+                            help='Organization name and OS name query '
+                                 'mapping. Can be specified multiple times '
+                                 'to process several organizations at once')
+    arg_parser.add_argument(
+        '--query',
+        help='OS name query for EPEL countme database. Sqlite wildcards are '
+             'supported (e.g. "almalinux%%"). Default value is the '
+             'organization name'
+    )
+    add_run_arg_parser_args(arg_parser, deadline=3600)
+    add_mqtt_arg_parser_args(arg_parser)
+    return arg_parser
+
+
+DB_URL = ('https://data-analysis.fedoraproject.org/csv-reports/countme/'
+          'totals.db')
+
+SQLITE_MAGIC = b'SQLite format 3\x00'
+
+# download progress of a byte range is saved after every 8 MiB
+PROGRESS_SAVE_INTERVAL = 8 * 1024 * 1024
+
+# countme week numbers are counted from Monday, 1970-01-05 00:00:00 UTC
+COUNTME_EPOCH = 345600
+
+COUNTME_WEEK_LEN = 604800
+
+
+def parse_week(value: str) -> int:
+    """
+    Parses a countme week number or a YYYY-MM-DD date command line argument.
+
+    Args:
+        value: Command line argument value.
+
+    Returns:
+        Countme week number.
+    """
+    if value.isdigit():
+        return int(value)
+    try:
+        date = datetime.datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'{value} is neither a week number nor a YYYY-MM-DD date'
+        )
+    ts = date.replace(tzinfo=datetime.timezone.utc).timestamp()
+    return int((ts - COUNTME_EPOCH) // COUNTME_WEEK_LEN)
+
+
+def get_week_iso8601_ts(weeknum: int) -> str:
+    """
+    Returns a countme week start UTC timestamp in the ISO 8601 format.
+
+    Args:
+        weeknum: Countme week number.
+
+    Returns:
+        Week start timestamp.
+    """
+    ts = COUNTME_EPOCH + weeknum * COUNTME_WEEK_LEN
+    dt = datetime.datetime.utcfromtimestamp(ts)
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def is_file_outdated(file_path: str, expire_days: int) -> bool:
+    """
+    Checks if the specified file is outdated.
+
+    Args:
+        file_path: file path.
+        expire_days: file expiration time in days.
+
+    Returns:
+        True if file is outdated, False otherwise.
+    """
+    return (time.time() - os.path.getmtime(file_path)) / 3600 > 24 * expire_days
+
+
+def check_db_integrity(db_path: str, expected_size: typing.Optional[int]):
+    """
+    Checks that a downloaded file is a complete and consistent SQLite
+    database.
+
+    Args:
+        db_path: Database file path.
+        expected_size: Expected file size in bytes.
+
+    Raises:
+        ValueError: If the database is broken.
+    """
+    size = os.stat(db_path).st_size
+    if expected_size is not None and size != expected_size:
+        raise ValueError(f'{db_path} size {size} does not match expected '
+                         f'{expected_size}')
+    with open(db_path, 'rb') as fd:
+        if fd.read(len(SQLITE_MAGIC)) != SQLITE_MAGIC:
+            raise ValueError(f'{db_path} is not an SQLite database')
+    con = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        result = con.execute('PRAGMA quick_check').fetchone()[0]
+    finally:
+        con.close()
+    if result != 'ok':
+        raise ValueError(f'{db_path} integrity check failed: {result}')
+
+
+def download_range(url: str, part_path: str, rng: typing.List,
+                   validator: typing.Optional[str],
+                   save_progress: typing.Optional[
+                       typing.Callable[[], None]] = None):
+    """
+    Downloads a byte range of a file into the corresponding part of a
+    partially downloaded file.
+
+    Args:
+        url: File URL.
+        part_path: Partially downloaded file path.
+        rng: Mutable [start, end, downloaded] list, the `end` offset is
+             exclusive. The downloaded bytes counter is updated in-place
+             after the data is flushed to disk, so an interrupted download
+             can be resumed.
+        validator: ETag or Last-Modified value used to make sure that the
+                   remote file hasn't changed.
+        save_progress: Function which saves the ranges download progress,
+                       it is called after every PROGRESS_SAVE_INTERVAL
+                       bytes.
+    """
+    start, end, downloaded = rng
+    if start + downloaded >= end:
+        return
+    headers = {'Accept-Encoding': 'identity',
+               'Range': f'bytes={start + downloaded}-{end - 1}'}
+    if validator:
+        headers['If-Range'] = validator
+    with get_http_client().get(url, headers=headers) as rsp:
+        if rsp.status != 206:
+            raise ValueError(f'{url} has been changed during download')
+        with open(part_path, 'r+b') as fd:
+            fd.seek(start + downloaded)
+            unsaved = 0
+            while True:
+                chunk = rsp.read(HTTP_CHUNK_SIZE)
+                if chunk:
+                    fd.write(chunk)
+                    unsaved += len(chunk)
+                if unsaved and (not chunk
+                                or unsaved >= PROGRESS_SAVE_INTERVAL):
+                    fd.flush()
+                    os.fsync(fd.fileno())
+                    rng[2] += unsaved
+                    unsaved = 0
+                    if save_progress:
+                        save_progress()
+                if not chunk:
+                    break
+    if start + rng[2] != end:
+        raise ValueError(f'{url} range {start}-{end - 1} is incomplete')
+
+
+def _is_same_remote_file(meta: dict, remote: dict) -> bool:
+    if meta.get('etag') and remote['etag']:
+        return meta['etag'] == remote['etag']
+    return (bool(meta.get('last_modified'))
+            and meta['last_modified'] == remote['last_modified']
+            and meta.get('size') == remote['size'])
+
+
+def download_db(db_path: str, expire_days: int = 1, workers: int = 1,
+                url: str = DB_URL) -> str:
+    """
+    Downloads an EPEL countme database file if it is missing or outdated.
+
+    An outdated file is re-downloaded only if the remote file has been
+    changed (a conditional request based on the ETag and Last-Modified
+    headers is used). The file is downloaded to a temporary location and
+    atomically moved into place after an integrity check, an interrupted
+    download is resumed on the next run if the server supports byte ranges.
+
+    Args:
+        db_path: database file download path.
+        expire_days: database file expiration time in days. The outdated file
+                     will be re-downloaded automatically if it's changed.
+        workers: number of byte ranges to download in parallel.
+        url: database file URL.
+
+    Returns:
+        Downloaded file normalized path.
+    """
+    target_path = os.path.abspath(
+        os.path.expandvars(os.path.expanduser(db_path))
+    )
+    meta_path = f'{target_path}.meta'
+    part_path = f'{target_path}.part'
+    part_meta_path = f'{part_path}.meta'
+    target_exists = (os.path.exists(target_path)
+                     and os.stat(target_path).st_size > 0)
+    if target_exists and not is_file_outdated(target_path, expire_days):
+        return target_path
+    headers = {'Accept-Encoding': 'identity'}
+    meta = load_json_file(meta_path) if target_exists else None
+    if meta and meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta and meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    http_client = get_http_client()
+    with http_client.request('HEAD', url, headers=headers) as rsp:
+        rsp.read()
+        if rsp.status == 304:
+            os.utime(target_path)
+            return target_path
+        content_length = rsp.headers.get('Content-Length')
+        remote = {'etag': rsp.headers.get('ETag'),
+                  'last_modified': rsp.headers.get('Last-Modified'),
+                  'size': int(content_length) if content_length else None}
+        ranges_supported = (
+            'bytes' in rsp.headers.get('Accept-Ranges', '').lower()
+            and remote['size'] is not None
+        )
+    # some servers ignore conditional HEAD requests
+    if meta and _is_same_remote_file(meta, remote):
+        os.utime(target_path)
+        return target_path
+    if ranges_supported:
+        part_meta = load_json_file(part_meta_path)
+        if (part_meta and os.path.exists(part_path)
+                and part_meta['remote'] == remote):
+            ranges = part_meta['ranges']
+        else:
+            size = remote['size']
+            chunk_size = -(-size // max(workers, 1)) or 1
+            ranges = [[start, min(start + chunk_size, size), 0]
+                      for start in range(0, size, chunk_size)]
+            with open(part_path, 'wb') as fd:
+                fd.truncate(size)
+        validator = remote['etag'] or remote['last_modified']
+        save_lock = threading.Lock()
+
+        def save_progress():
+            # the progress is saved periodically as well, so that a killed
+            # process download can be resumed too
+            with save_lock:
+                save_json_file(part_meta_path, {'remote': remote,
+                                                'ranges': ranges})
+        #
+        save_progress()
+        try:
+            for _ in fetch_concurrently(
+                    download_range,
+                    [(url, part_path, rng, validator, save_progress)
+                     for rng in ranges],
+                    max_workers=workers, max_per_host=workers):
+                pass
+        except BaseException:
+            save_progress()
+            raise
+    else:
+        with http_client.get(url, headers={'Accept-Encoding': 'identity'}) \
+                as rsp, open(part_path, 'wb') as fd:
+            shutil.copyfileobj(rsp, fd, HTTP_CHUNK_SIZE)
+    try:
+        check_db_integrity(part_path, remote['size'])
+    except ValueError:
+        os.remove(part_path)
+        raise
+    finally:
+        if os.path.exists(part_meta_path):
+            os.remove(part_meta_path)
+    os.replace(part_path, target_path)
+    save_json_file(meta_path, remote)
+    return target_path
+
+
+def get_db_signature(db_path: str) -> typing.Tuple[int, int]:
+    """
+    Returns an SQLite database file signature which changes whenever the
+    database content is changed.
+
+    Args:
+        db_path: Database file path.
+
+    Returns:
+        File size and the SQLite file change counter pair.
+    """
+    with open(db_path, 'rb') as fd:
+        header = fd.read(28)
+    return os.stat(db_path).st_size, int.from_bytes(header[24:28], 'big')
+
+
+def _iter_epel_rows(cur: sqlite3.Cursor) -> typing.Iterator[tuple]:
+    # skips non-standard EPEL repositories like epel-testing-8
+    for os_name, weeknum, repo_tag, hits in cur:
+        re_rslt = re.search(r'^epel-(\d+)$', repo_tag)
+        if re_rslt:
+            yield os_name, weeknum, re_rslt.group(1), hits
+
+
+def build_summary_db(db_path: str) -> str:
+    """
+    Builds a summary database of weekly EPEL hits grouped by upper-cased OS
+    name and EPEL major version.
+
+    The summary is stored in the `{db_path}.summary` sidecar file and is
+    rebuilt only if the EPEL countme database has been changed since the
+    previous build.
+
+    Args:
+        db_path: EPEL countme database file path.
+
+    Returns:
+        Summary database file path.
+    """
+    summary_path = f'{db_path}.summary'
+    source_size, source_counter = get_db_signature(db_path)
+    if os.path.exists(summary_path):
+        try:
+            with sqlite3.connect(summary_path) as con:
+                row = con.execute('SELECT source_size, source_counter '
+                                  'FROM summary_info').fetchone()
+            if row == (source_size, source_counter):
+                return summary_path
+        except sqlite3.Error:
+            pass
+    sql = """
+      SELECT upper(os_name), weeknum, repo_tag, sum(hits)
+        FROM countme_totals
+        WHERE repo_tag GLOB 'epel-[0-9]*'
+        GROUP BY upper(os_name), weeknum, repo_tag
+    """
+    tmp_path = f'{summary_path}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    with sqlite3.connect(tmp_path) as con:
+        # queries select weeks using the primary key and then match OS
+        # names of the selected rows, a LIKE join against the org_queries
+        # table can't use an os_name index anyway
+        con.executescript("""
+          CREATE TABLE epel_hits (
+            os_name TEXT NOT NULL COLLATE NOCASE,
+            weeknum INTEGER NOT NULL,
+            version TEXT NOT NULL,
+            hits INTEGER NOT NULL,
+            PRIMARY KEY (weeknum, os_name, version)
+          );
+          CREATE TABLE summary_info (
+            source_size INTEGER NOT NULL,
+            source_counter INTEGER NOT NULL
+          );
+        """)
+        con.execute('ATTACH DATABASE ? AS source', (db_path,))
+        con.executemany('INSERT INTO epel_hits VALUES (?, ?, ?, ?)',
+                        _iter_epel_rows(con.execute(sql)))
+        con.execute('INSERT INTO summary_info VALUES (?, ?)',
+                    (source_size, source_counter))
+    con.close()
+    os.replace(tmp_path, summary_path)
+    return summary_path
+
+
+def get_organizations_epel_stats(
+        db_path: str, queries: typing.Dict[str, str]
+) -> typing.Iterator[typing.Tuple[str, dict]]:
+    """
+    Returns a last week number of EPEL hits for several organizations
+    computed in a single pass over the database.
+
+    Args:
+        db_path: EPEL countme database file path.
+        queries: Organization name to OS name query mapping. Sqlite wildcards
+                 are supported in queries.
+
+    Returns:
+        Iterator over organization name and dictionary containing number of
+        EPEL hits for each OS version pairs. The total number of hits for
+        an organization is reported with the "all" version.
+    """
+    sql = """
+      SELECT q.org, h.version, sum(h.hits)
+        FROM epel_hits AS h
+          JOIN org_queries AS q ON h.os_name LIKE q.query
+        WHERE h.weeknum = (SELECT max(weeknum) FROM epel_hits)
+        GROUP BY q.org, h.version
+    """
+    ts = get_iso8601_ts()
+    org_hits = {org: {} for org in queries}
+    with get_timings().measure('db'), \
+            sqlite3.connect(build_summary_db(db_path)) as con:
+        _create_org_queries_table(con, queries)
+        for org, distro_ver, hits in con.execute(sql):
+            org_hits[org][distro_ver] = hits
+    for org, versions in org_hits.items():
+        for distro_ver, hits in sorted(versions.items(),
+                                       key=lambda item: int(item[0])):
+            yield org, {'hits': hits, 'ts': ts, 'version': distro_ver}
+        yield org, {'hits': sum(versions.values()), 'ts': ts,
+                    'version': 'all'}
+
+
+def iter_epel_history(
+        db_path: str, queries: typing.Dict[str, str],
+        since: typing.Optional[int] = None
+) -> typing.Iterator[typing.Tuple[str, dict]]:
+    """
+    Iterates over weekly EPEL hits history for several organizations.
+
+    Records are streamed from the database week by week, so the whole
+    history is never loaded into memory.
+
+    Args:
+        db_path: EPEL countme database file path.
+        queries: Organization name to OS name query mapping. Sqlite wildcards
+                 are supported in queries.
+        since: First week number to report. All available weeks are reported
+               if omitted.
+
+    Returns:
+        Iterator over organization name and dictionary containing number of
+        EPEL hits for an OS version pairs. Each dictionary timestamp is its
+        week start time, the total number of hits for an organization is
+        reported with the "all" version after each week versions.
+    """
+    sql = """
+      SELECT h.weeknum, q.org, h.version, sum(h.hits)
+        FROM epel_hits AS h
+          JOIN org_queries AS q ON h.os_name LIKE q.query
+        WHERE h.weeknum >= ?
+        GROUP BY h.weeknum, q.org, h.version
+        ORDER BY h.weeknum, q.org
+    """
+
+    def iter_totals(week_ts: str, totals: typing.Dict[str, int]):
+        for org, hits in totals.items():
+            yield org, {'hits': hits, 'ts': week_ts, 'version': 'all'}
+        totals.clear()
+    #
+    with sqlite3.connect(build_summary_db(db_path)) as con:
+        _create_org_queries_table(con, queries)
+        prev_weeknum = ts = None
+        totals = collections.OrderedDict()
+        for weeknum, org, distro_ver, hits in con.execute(
+                sql, (since if since is not None else 0,)):
+            if weeknum != prev_weeknum:
+                yield from iter_totals(ts, totals)
+                prev_weeknum = weeknum
+                ts = get_week_iso8601_ts(weeknum)
+            totals[org] = totals.get(org, 0) + hits
+            yield org, {'hits': hits, 'ts': ts, 'version': distro_ver}
+        yield from iter_totals(ts, totals)
+
+
+def _create_org_queries_table(con: sqlite3.Connection,
+                              queries: typing.Dict[str, str]):
+    con.execute('CREATE TEMP TABLE org_queries (org TEXT, query TEXT)')
+    con.executemany('INSERT INTO org_queries VALUES (?, ?)',
+                    [(org, query.upper()) for org, query in queries.items()])
+
+
+def get_epel_stats(db_path: str,
+                   os_name: str) -> typing.Generator[dict, None, None]:
+    """
+    Returns a last week number of EPEL hits for the specified OS.
+
+    Args:
+        db_path: EPEL countme database file path.
+        os_name: Operating system name. Sqlite wildcards are supported.
+
+    Returns:
+        Generator of dictionaries containing number of EPEL hits for each
+        OS version.
+    """
+    for _, rec in get_organizations_epel_stats(db_path, {os_name: os_name}):
+        yield rec
+
+
+def collect(args: argparse.Namespace) -> typing.Iterator[
+        typing.Tuple[str, dict]]:
+    """
+    Collects EPEL statistics for the parsed command line arguments.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Iterator over MQTT topic name and message pairs.
+    """
+    if args.org_query:
+        queries = dict(args.org_query)
+    else:
+        queries = {args.organization: args.query or args.organization}
+    db_path = download_db(args.db_path, workers=args.download_workers)
+    with get_timings().measure('db'):
+        build_summary_db(db_path)
+    if args.backfill:
+        records = iter_epel_history(db_path, queries, args.since)
+    else:
+        records = get_organizations_epel_stats(db_path, queries)
+    for org, rec in records:
+        distro_ver = rec.pop('version')
+        yield get_usage_stats_topic_name('epel', org, distro_ver), rec
+
+
+def main(sys_args: typing.List[str]):
+    arg_parser = init_arg_parser()
+    args = arg_parser.parse_args(sys_args)
+    with guarded_run('epel', args, sys_args), \
+            open_publisher(args) as publisher:
+        for mqtt_topic, rec in collect(args):
+            print(f'Submitting {rec} to MQTT topic {mqtt_topic}')
+            publisher.publish(mqtt_topic, rec)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
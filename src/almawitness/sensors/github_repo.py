@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: Eugene Zamriy <ezamriy@almalinux.org>
+# created: 2021-06-18
+
+"""
+Submits a GitHub repository popularity metrics to an MQTT topic.
+
+MQTT topic name format:
+
+    stats/social/github/{organization}/{repository_name}
+
+The program uses the JSON format to encode a message:
+
+    {
+      "forks": int,
+      "open_issues": int,
+      "stars": int,
+      "subscribers": int,
+      "downloads": int,
+      "ts": str
+    }
+
+where `downloads` is a total download count of all release assets, it is
+submitted only if the `--releases` argument is specified.
+
+Execution example:
+
+    $ github_repo_stats_sensor.py -o AlmaLinux -r almalinux-deploy
+
+Several repositories can be passed at once, they will be queried concurrently:
+
+    $ github_repo_stats_sensor.py -o AlmaLinux -r almalinux-deploy leapp-data
+
+Use the `--all` argument to submit metrics for every organization repository.
+The repository list is fetched page by page (100 repositories per request)
+and only subscribers count (and releases) are requested per repository:
+
+    $ GITHUB_TOKEN=... github_repo_stats_sensor.py -o AlmaLinux --all \
+        --releases
+
+Unauthenticated GitHub API clients are limited to 60 requests per hour, so
+an access token should be provided for the organization mode.
+"""
+
+import argparse
+import os
+import sys
+import typing
+
+from almawitness.sensors.common import (
+    add_fetch_arg_parser_args,
+    add_mqtt_arg_parser_args,
+    add_run_arg_parser_args,
+    fetch_concurrently,
+    get_http_client,
+    get_iso8601_ts,
+    guarded_run,
+    open_publisher
+)
+
+
+GITHUB_API_HOST = 'api.github.com'
+
+GITHUB_API_URL = f'https://{GITHUB_API_HOST}'
+
+GITHUB_PAGE_SIZE = 100
+
+
+def init_arg_parser() -> argparse.ArgumentParser:
+    """
+    Creates and initializes a command line arguments parser.
+
+    Returns:
+        Command line arguments parser.
+    """
+    arg_parser = argparse.ArgumentParser(
+        description="GitHub repository popularity sensor"
+    )
+    arg_parser.add_argument('-o', '--organization', required=True,
+                            help='GitHub organization or user name')
+    repos_group = arg_parser.add_mutually_exclusive_group(required=True)
+    repos_group.add_argument('-r', '--repo', nargs='+',
+                             help='GitHub repository name(s)')
+    repos_group.add_argument('--all', action='store_true',
+                             help='Submit metrics for all organization '
+                                  'repositories')
+    arg_parser.add_argument('--releases', action='store_true',
+                            help='Submit release assets total download count')
+    arg_parser.add_argument('--token', default=os.environ.get('GITHUB_TOKEN'),
+                            help='GitHub access token. Default is the '
+                                 'GITHUB_TOKEN environment variable value')
+    add_fetch_arg_parser_args(arg_parser)
+    add_run_arg_parser_args(arg_parser)
+    add_mqtt_arg_parser_args(arg_parser)
+    return arg_parser
+
+
+def get_github_headers(token: typing.Optional[str] = None) -> typing.Dict:
+    """
+    Returns GitHub API request headers.
+
+    Args:
+        token: GitHub access token.
+
+    Returns:
+        Dictionary of HTTP request headers.
+    """
+    headers = {'Accept': 'application/vnd.github+json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    return headers
+
+
+def iter_github_pages(url: str, token: typing.Optional[str] = None
+                      ) -> typing.Iterator[typing.Dict]:
+    """
+    Iterates over items of a paginated GitHub API list.
+
+    Pages are requested by their numbers rather than by the Link header
+    URLs, so that every page response is validated against the HTTP cache
+    and unchanged pages don't count against the rate limit.
+
+    Args:
+        url: GitHub API list URL.
+        token: GitHub access token.
+
+    Returns:
+        Iterator over the list items.
+    """
+    http_client = get_http_client()
+    headers = get_github_headers(token)
+    sep = '&' if '?' in url else '?'
+    page = 1
+    while True:
+        items = http_client.get_json(
+            f'{url}{sep}per_page={GITHUB_PAGE_SIZE}&page={page}',
+            headers=headers
+        )
+        yield from items
+        if len(items) < GITHUB_PAGE_SIZE:
+            return
+        page += 1
+
+
+def get_github_repo_stats(org: str, repo: str,
+                          token: typing.Optional[str] = None) -> typing.Dict:
+    """
+    Returns a GitHub repository popularity metrics.
+
+    Args:
+        org: GitHub organization name.
+        repo: GitHub repository name.
+        token: GitHub access token.
+
+    Returns:
+        Dictionary containing a GitHub repository popularity metrics.
+    """
+    url = f'{GITHUB_API_URL}/repos/{org}/{repo}'
+    data = get_http_client().get_json(url, headers=get_github_headers(token))
+    return {'forks': data['forks'],
+            'open_issues': data['open_issues_count'],
+            'stars': data['stargazers_count'],
+            'subscribers': data['subscribers_count'],
+            'ts': get_iso8601_ts()}
+
+
+def get_org_repos_stats(org: str, token: typing.Optional[str] = None
+                        ) -> typing.Dict[str, typing.Dict]:
+    """
+    Returns popularity metrics which are available in the GitHub
+    organization repositories list (everything except a subscribers count).
+
+    Args:
+        org: GitHub organization name.
+        token: GitHub access token.
+
+    Returns:
+        Dictionary of repository names and their metrics.
+    """
+    return {
+        repo['name']: {'forks': repo['forks_count'],
+                       'open_issues': repo['open_issues_count'],
+                       'stars': repo['stargazers_count']}
+        for repo in iter_github_pages(f'{GITHUB_API_URL}/orgs/{org}/repos',
+                                      token)
+    }
+
+
+def get_release_downloads(org: str, repo: str,
+                          token: typing.Optional[str] = None) -> int:
+    """
+    Returns a total download count of all GitHub repository release assets.
+
+    Args:
+        org: GitHub organization name.
+        repo: GitHub repository name.
+        token: GitHub access token.
+
+    Returns:
+        Release assets download count.
+    """
+    url = f'{GITHUB_API_URL}/repos/{org}/{repo}/releases'
+    return sum(asset['download_count']
+               for release in iter_github_pages(url, token)
+               for asset in release.get('assets', ()))
+
+
+def get_repo_subscribers(org: str, repo: str,
+                         token: typing.Optional[str] = None) -> int:
+    """
+    Returns a GitHub repository subscribers (watchers) count.
+
+    Args:
+        org: GitHub organization name.
+        repo: GitHub repository name.
+        token: GitHub access token.
+
+    Returns:
+        Repository subscribers count.
+    """
+    url = f'{GITHUB_API_URL}/repos/{org}/{repo}'
+    data = get_http_client().get_json(url, headers=get_github_headers(token))
+    return data['subscribers_count']
+
+
+def _get_repo_stats(org: str, repo: str,
+                    listed_stats: typing.Optional[typing.Dict],
+                    releases: bool,
+                    token: typing.Optional[str]) -> typing.Dict:
+    if listed_stats is None:
+        stats = get_github_repo_stats(org, repo, token)
+    else:
+        stats = dict(listed_stats,
+                     subscribers=get_repo_subscribers(org, repo, token),
+                     ts=get_iso8601_ts())
+    if releases:
+        stats['downloads'] = get_release_downloads(org, repo, token)
+    return stats
+
+
+def collect(args: argparse.Namespace) -> typing.Iterator[
+        typing.Tuple[str, typing.Dict]]:
+    """
+    Collects GitHub repository statistics for the parsed command line
+    arguments.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Iterator over MQTT topic name and message pairs.
+    """
+    org = args.organization
+    if args.all:
+        listed_stats = get_org_repos_stats(org, args.token)
+        targets = [(org, repo, stats, args.releases, args.token)
+                   for repo, stats in sorted(listed_stats.items())]
+    else:
+        targets = [(org, repo, None, args.releases, args.token)
+                   for repo in args.repo]
+    for (_, repo, *_), repo_stats in fetch_concurrently(
+            _get_repo_stats, targets,
+            get_host=lambda target: GITHUB_API_HOST,
+            max_workers=args.concurrency,
+            max_per_host=args.host_concurrency,
+            rate_limiter=get_http_client().rate_limiter):
+        yield f'stats/social/github/{org}/{repo}', repo_stats
+
+
+def main(sys_args: typing.List[str]):
+    arg_parser = init_arg_parser()
+    args = arg_parser.parse_args(sys_args)
+    with guarded_run('github_repo', args, sys_args), \
+            open_publisher(args) as publisher:
+        for mqtt_topic, repo_stats in collect(args):
+            publisher.publish(mqtt_topic, repo_stats)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
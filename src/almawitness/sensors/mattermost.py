@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: Eugene Zamriy <ezamriy@almalinux.org>
+# created: 2021-06-09
+
+"""
+Submits a Mattermost chat server statistics to an MQTT topic.
+
+MQTT topic name format:
+
+    stats/social/{chat_server}
+
+    stats/social/{chat_server}/{team}
+
+The program uses the JSON format to encode a message:
+
+    {
+      "total_users": int,
+      "active_users": int,
+      "monthly_active_users": int,
+      "banned_users": int,
+      "posts": int,
+      "public_channels": int,
+      "private_channels": int,
+      "teams": int,
+      "posts_per_day": int,
+      "posting_users_per_day": int,
+      "ts": str
+    }
+
+The following data is reported:
+
+  * total_users - total registered users count
+  * active_users - daily active users count
+  * monthly_active_users - monthly active users count
+  * banned_users - total banned users count
+  * posts - total posts count
+  * public_channels - public channels count
+  * private_channels - private channels count
+  * teams - teams count
+  * posts_per_day - posts count for the last complete day
+  * posting_users_per_day - count of users who posted during the last
+    complete day
+
+Analytics reports are requested concurrently and merged into a single
+message. With the `--teams` argument the same reports are requested for each
+team and submitted to the `stats/social/{chat_server}/{team}` topics. Team
+messages don't include the active_users, monthly_active_users, banned_users
+and teams values because they are server-wide.
+
+Execution example:
+
+    $ mattermost_stats_sensor.py -c chat.almalinux.org -t YOUR_TOKEN_HERE
+"""
+
+import argparse
+import datetime
+import sys
+import typing
+import urllib.parse
+
+from almawitness.sensors.common import (
+    add_fetch_arg_parser_args,
+    add_mqtt_arg_parser_args,
+    add_run_arg_parser_args,
+    fetch_concurrently,
+    get_http_client,
+    get_iso8601_ts,
+    guarded_run,
+    open_publisher
+)
+
+
+STANDARD_REPORT_MAPPING = {
+    'unique_user_count': 'total_users',
+    'daily_active_users': 'active_users',
+    'monthly_active_users': 'monthly_active_users',
+    'inactive_user_count': 'banned_users',
+    'post_count': 'posts',
+    'channel_open_count': 'public_channels',
+    'channel_private_count': 'private_channels',
+    'team_count': 'teams'
+}
+"""Standard analytics report record names to message fields mapping."""
+
+SERVER_WIDE_FIELDS = ('active_users', 'monthly_active_users', 'banned_users',
+                      'teams')
+"""Standard analytics report fields which ignore a team filter."""
+
+DAILY_REPORTS = {
+    'post_counts_day': 'posts_per_day',
+    'user_counts_with_posts_day': 'posting_users_per_day'
+}
+"""Daily analytics report names to message fields mapping."""
+
+TEAMS_PAGE_SIZE = 200
+
+
+def init_arg_parser() -> argparse.ArgumentParser:
+    """
+    Creates and initializes a command line arguments parser.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        Command line arguments parser.
+    """
+    arg_parser = argparse.ArgumentParser(
+        description="Mattermost chat statistics sensor"
+    )
+    arg_parser.add_argument('-c', '--chat-server', required=True,
+                            help='Mattermost chat server domain name or IP '
+                                 'address')
+    arg_parser.add_argument('-t', '--token', required=True,
+                            help='Authentication token')
+    arg_parser.add_argument('--teams', action='store_true',
+                            help='Submit per-team statistics as well')
+    add_fetch_arg_parser_args(arg_parser)
+    add_run_arg_parser_args(arg_parser)
+    add_mqtt_arg_parser_args(arg_parser)
+    return arg_parser
+
+
+def _get_headers(token: str) -> dict:
+    return {'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json'}
+
+
+def get_analytics_report(server: str, token: str, name: str,
+                         team_id: typing.Optional[str] = None
+                         ) -> typing.Iterator[dict]:
+    """
+    Returns a Mattermost analytics report records.
+
+    The response is parsed incrementally, so a large report of a busy server
+    is never kept in memory as a whole.
+
+    Parameters
+    ----------
+    server : str
+        Mattermost server domain name or IP address.
+    token : str
+        Authentication token.
+    name : str
+        Analytics report name (e.g. standard or post_counts_day).
+    team_id : str, optional
+        Team identifier. Server-wide report is returned if omitted.
+
+    Returns
+    -------
+    typing.Iterator[dict]
+        Iterator over report records, each record has the "name" and
+        "value" keys.
+    """
+    params = {'name': name}
+    if team_id:
+        params['team_id'] = team_id
+    url = (f'https://{server}/api/v4/analytics/old?'
+           f'{urllib.parse.urlencode(params)}')
+    with get_http_client().get(url, headers=_get_headers(token)) as rsp:
+        yield from rsp.iter_json_array()
+
+
+def get_mattermost_teams(server: str, token: str) -> typing.List[dict]:
+    """
+    Returns a Mattermost chat server teams list.
+
+    Parameters
+    ----------
+    server : str
+        Mattermost server domain name or IP address.
+    token : str
+        Authentication token.
+
+    Returns
+    -------
+    list
+        List of teams, each team is a dictionary with the "id" and "name"
+        keys among others.
+    """
+    teams = []
+    page = 0
+    while True:
+        params = urllib.parse.urlencode({'page': page,
+                                         'per_page': TEAMS_PAGE_SIZE})
+        url = f'https://{server}/api/v4/teams?{params}'
+        teams_page = get_http_client().get_json(url,
+                                                headers=_get_headers(token))
+        teams.extend(teams_page)
+        if len(teams_page) < TEAMS_PAGE_SIZE:
+            return teams
+        page += 1
+
+
+def get_report_stats(server: str, token: str, report: str,
+                     team_id: typing.Optional[str] = None) -> dict:
+    """
+    Returns statistics extracted from a Mattermost analytics report.
+
+    Parameters
+    ----------
+    server : str
+        Mattermost server domain name or IP address.
+    token : str
+        Authentication token.
+    report : str
+        Analytics report name, either "standard" or one of the
+        `DAILY_REPORTS` keys.
+    team_id : str, optional
+        Team identifier. Server-wide statistics are returned if omitted.
+
+    Returns
+    -------
+    dict
+        Dictionary containing message fields.
+    """
+    records = get_analytics_report(server, token, report, team_id)
+    if report == 'standard':
+        stats = {STANDARD_REPORT_MAPPING[rec['name']]: rec['value']
+                 for rec in records
+                 if rec['name'] in STANDARD_REPORT_MAPPING}
+        if team_id:
+            for field in SERVER_WIDE_FIELDS:
+                stats.pop(field, None)
+        return stats
+    # daily reports contain one record per day named like 2021-06-09, the
+    # current day is incomplete so the previous one is reported
+    today = datetime.datetime.utcnow().strftime('%Y-%m-%d')
+    last_day = latest_day = None
+    for rec in records:
+        day = rec['name']
+        if latest_day is None or day > latest_day[0]:
+            latest_day = (day, rec['value'])
+        if day < today and (last_day is None or day > last_day[0]):
+            last_day = (day, rec['value'])
+    last_day = last_day or latest_day
+    if last_day is None:
+        return {}
+    return {DAILY_REPORTS[report]: last_day[1]}
+
+
+def get_mattermost_stats(server: str, token: str) -> dict:
+    """
+    Returns a Mattermost chat server statistics.
+
+    Parameters
+    ----------
+    server : str
+        Mattermost server domain name or IP address.
+    token : str
+        Authentication token.
+
+    Returns
+    -------
+    dict
+        Dictionary containing a chat server statistics.
+    """
+    stats = get_report_stats(server, token, 'standard')
+    stats['ts'] = get_iso8601_ts()
+    return stats
+
+
+def collect(args: argparse.Namespace) -> typing.Iterator[
+        typing.Tuple[str, dict]]:
+    """
+    Collects Mattermost chat server statistics for the parsed command line
+    arguments.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Parsed command line arguments.
+
+    Returns
+    -------
+    typing.Iterator[typing.Tuple[str, dict]]
+        Iterator over MQTT topic name and message pairs.
+    """
+    chat_server = args.chat_server
+    teams = {}
+    if args.teams:
+        teams = {team['id']: team['name']
+                 for team in get_mattermost_teams(chat_server, args.token)}
+    targets = [(chat_server, args.token, 'standard', None)]
+    for team_id in [None] + list(teams):
+        targets.extend((chat_server, args.token, report, team_id)
+                       for report in DAILY_REPORTS)
+    if teams:
+        targets.extend((chat_server, args.token, 'standard', team_id)
+                       for team_id in teams)
+    ts = get_iso8601_ts()
+    merged = {None: {}}
+    merged.update((team_id, {}) for team_id in teams)
+    for target, stats in fetch_concurrently(
+            get_report_stats, targets, max_workers=args.concurrency,
+            max_per_host=args.host_concurrency):
+        merged[target[3]].update(stats)
+    yield f'stats/social/{chat_server}', dict(merged.pop(None), ts=ts)
+    for team_id, stats in merged.items():
+        if stats:
+            yield (f'stats/social/{chat_server}/{teams[team_id]}',
+                   dict(stats, ts=ts))
+
+
+def main(sys_args: list):
+    arg_parser = init_arg_parser()
+    args = arg_parser.parse_args(sys_args)
+    with guarded_run('mattermost', args, sys_args):
+        messages = list(collect(args))
+        #
+        with open_publisher(args) as publisher:
+            for mqtt_topic, chat_stats in messages:
+                publisher.publish(mqtt_topic, chat_stats)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
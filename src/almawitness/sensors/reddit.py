@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: Eugene Zamriy <ezamriy@almalinux.org>
+# created: 2021-06-10
+
+"""
+Submits a Reddit community statistics to an MQTT topic.
+
+MQTT topic name format:
+
+    stats/social/reddit/{subreddit}
+
+The program uses the JSON format to encode a message:
+
+    {
+      "total_users": int,
+      "active_users": int,
+      "ts": str
+    }
+
+The `active_users` field is optional and will be present only of Reddit API
+returns false value for the `accounts_active_is_fuzzed` field. Otherwise,
+the `active_users` number is not accurate and should be ignored. It is also
+absent unless the `--active-users` argument is specified (see below).
+
+Execution example:
+
+    $ reddit_stats_sensor.py -r AlmaLinux
+
+Several subreddits can be passed at once, they are requested in batches of
+up to 100 names using the Reddit `/api/info` endpoint:
+
+    $ reddit_stats_sensor.py -r AlmaLinux RockyLinux CentOS
+
+The `/api/info` response doesn't contain active users counts. Use the
+`--active-users` argument to request every subreddit about page instead
+(one request per subreddit) if they are needed:
+
+    $ reddit_stats_sensor.py -r AlmaLinux RockyLinux CentOS --active-users
+"""
+
+import argparse
+import collections
+import sys
+import typing
+import urllib.parse
+
+from almawitness.sensors.common import (
+    add_fetch_arg_parser_args,
+    add_mqtt_arg_parser_args,
+    add_run_arg_parser_args,
+    fetch_concurrently,
+    get_http_client,
+    get_iso8601_ts,
+    guarded_run,
+    open_publisher
+)
+
+
+INFO_MAX_NAMES = 100
+"""Maximum number of subreddit names in a single `/api/info` request."""
+
+
+def init_arg_parser() -> argparse.ArgumentParser:
+    """
+    Creates and initializes a command line arguments parser.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        Command line arguments parser.
+    """
+    arg_parser = argparse.ArgumentParser(
+        description="Reddit community statistics sensor"
+    )
+    arg_parser.add_argument('-r', '--reddit', required=True, nargs='+',
+                            help='Subreddit name(s)')
+    arg_parser.add_argument('--active-users', action='store_true',
+                            help='Submit active users counts as well, it '
+                                 'takes one request per subreddit')
+    add_fetch_arg_parser_args(arg_parser, host_concurrency=2)
+    add_run_arg_parser_args(arg_parser)
+    add_mqtt_arg_parser_args(arg_parser)
+    return arg_parser
+
+
+def _get_subreddit_stats(data: dict, ts: str) -> dict:
+    stats = {'total_users': data['subscribers'], 'ts': ts}
+    if not data['accounts_active_is_fuzzed'] \
+            and data.get('active_user_count') is not None:
+        stats['active_users'] = data['active_user_count']
+    return stats
+
+
+def get_reddit_stats(subreddit: str) -> dict:
+    """
+    Returns a subreddit user activity statistics.
+
+    Parameters
+    ----------
+    subreddit : str
+        Subreddit name.
+
+    Returns
+    -------
+    dict
+        Dictionary containing a subreddit user activity statistics.
+    """
+    url = f'https://www.reddit.com/r/{subreddit}/about.json'
+    data = get_http_client().get_json(url)['data']
+    return _get_subreddit_stats(data, get_iso8601_ts())
+
+
+def get_reddit_bulk_stats(subreddits: typing.List[str]
+                          ) -> typing.Dict[str, dict]:
+    """
+    Returns user activity statistics for several subreddits using a single
+    request.
+
+    Parameters
+    ----------
+    subreddits : list
+        Subreddit names, at most `INFO_MAX_NAMES` of them.
+
+    Returns
+    -------
+    dict
+        Subreddit names to user activity statistics mapping. Subreddits
+        which don't exist or aren't accessible are omitted. Active users
+        counts are usually missing, use `get_reddit_stats` to get them.
+    """
+    params = urllib.parse.urlencode({'sr_name': ','.join(subreddits)},
+                                    safe=',')
+    url = f'https://www.reddit.com/api/info.json?{params}'
+    listing = get_http_client().get_json(url)
+    ts = get_iso8601_ts()
+    # Reddit returns subreddit names in their canonical case
+    names = {name.lower(): name for name in subreddits}
+    stats = {}
+    for child in listing['data']['children']:
+        data = child['data']
+        name = names.get(data['display_name'].lower())
+        if name:
+            stats[name] = _get_subreddit_stats(data, ts)
+    return stats
+
+
+def collect(args: argparse.Namespace) -> typing.Iterator[
+        typing.Tuple[str, dict]]:
+    """
+    Collects subreddit statistics for the parsed command line arguments.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Parsed command line arguments.
+
+    Returns
+    -------
+    typing.Iterator[typing.Tuple[str, dict]]
+        Iterator over MQTT topic name and message pairs.
+    """
+    # subreddit names are case-insensitive
+    subreddits = collections.OrderedDict()
+    for subreddit in args.reddit:
+        subreddits.setdefault(subreddit.lower(), subreddit)
+    subreddits = list(subreddits.values())
+    if args.active_users:
+        # the bulk response doesn't contain active users counts
+        for (subreddit,), reddit_stats in fetch_concurrently(
+                get_reddit_stats, [(name,) for name in subreddits],
+                max_workers=args.concurrency,
+                max_per_host=args.host_concurrency):
+            yield f'stats/social/reddit/{subreddit}', reddit_stats
+        return
+    targets = [(subreddits[i:i + INFO_MAX_NAMES],)
+               for i in range(0, len(subreddits), INFO_MAX_NAMES)]
+    missing = []
+    for (names,), bulk_stats in fetch_concurrently(
+            get_reddit_bulk_stats, targets, max_workers=args.concurrency,
+            max_per_host=args.host_concurrency):
+        for subreddit in names:
+            if subreddit in bulk_stats:
+                yield (f'stats/social/reddit/{subreddit}',
+                       bulk_stats[subreddit])
+            else:
+                missing.append(subreddit)
+    if missing:
+        raise Exception(f'subreddit(s) {", ".join(missing)} are not found')
+
+
+def main(sys_args: typing.List[str]):
+    arg_parser = init_arg_parser()
+    args = arg_parser.parse_args(sys_args)
+    with guarded_run('reddit', args, sys_args), \
+            open_publisher(args) as publisher:
+        for mqtt_topic, reddit_stats in collect(args):
+            publisher.publish(mqtt_topic, reddit_stats)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: Eugene Zamriy <ezamriy@almalinux.org>
+# created: 2021-06-08
+
+"""
+Submits a Vagrant Cloud Box usage statistics to an MQTT topic.
+
+MQTT topic name format:
+
+    stats/usage/vagrantup/{organization}/{box_name}
+
+The program uses the JSON format to encode a message:
+
+    {"pulls": int, "ts": str}
+
+Execution example:
+
+    $ vagrantup_stats_sensor.py -i 8 -o almalinux
+
+All statistics are taken from a single organization boxes list request, so
+several boxes (or all of them with the `--all` argument) can be submitted at
+once:
+
+    $ vagrantup_stats_sensor.py -o almalinux -i 8 9
+    $ vagrantup_stats_sensor.py -o almalinux --all
+
+Use the `--versions` argument to additionally submit downloads count of every
+box version and version provider. Versions of each box are requested
+concurrently, the downloads counts are reported using separate fields, so
+they aren't mixed up with the box downloads count:
+
+    {"version_pulls": int, "version": str, "ts": str}
+
+    {"provider_pulls": int, "version": str, "provider": str, "ts": str}
+"""
+
+import argparse
+import sys
+import typing
+
+from almawitness.sensors.common import (
+    add_fetch_arg_parser_args,
+    add_mqtt_arg_parser_args,
+    add_run_arg_parser_args,
+    fetch_concurrently,
+    get_http_client,
+    get_iso8601_ts,
+    get_usage_stats_topic_name,
+    guarded_run,
+    open_publisher
+)
+
+
+def init_arg_parser() -> argparse.ArgumentParser:
+    """
+    Creates and initializes a command line arguments parser.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        Command line arguments parser.
+    """
+    arg_parser = argparse.ArgumentParser(
+        description="Vagrant box statistics sensor"
+    )
+    boxes_group = arg_parser.add_mutually_exclusive_group(required=True)
+    boxes_group.add_argument('-i', '--image', nargs='+',
+                             help='Vagrant box name(s)')
+    boxes_group.add_argument('--all', action='store_true',
+                             help='Submit statistics for all organization '
+                                  'boxes')
+    arg_parser.add_argument('-o', '--organization', required=True,
+                            help='Vagrant Cloud organization or user name')
+    arg_parser.add_argument('--versions', action='store_true',
+                            help='Submit box versions and providers '
+                                 'statistics as well')
+    add_fetch_arg_parser_args(arg_parser)
+    add_run_arg_parser_args(arg_parser)
+    add_mqtt_arg_parser_args(arg_parser)
+    return arg_parser
+
+
+def get_box_stats(org: str, box_name: str) -> dict:
+    """
+    Returns a Vagrant box downloads count.
+
+    Parameters
+    ----------
+    org : str
+        Vagrant Cloud organization or user name.
+    box_name : str
+        Vagrant box name.
+
+    Returns
+    -------
+    dict
+        Dictionary containing a box downloads count.
+    """
+    for box in get_org_boxes(org):
+        if box['name'] == box_name:
+            return {'pulls': box['downloads'],
+                    'ts':  get_iso8601_ts()}
+    raise Exception(f'box {org}/{box_name} is not found')
+
+
+def get_org_boxes(org: str) -> typing.List[dict]:
+    """
+    Returns all Vagrant Cloud organization boxes.
+
+    Parameters
+    ----------
+    org : str
+        Vagrant Cloud organization or user name.
+
+    Returns
+    -------
+    list
+        List of box descriptions returned by the Vagrant Cloud API.
+    """
+    url = f'https://app.vagrantup.com/api/v1/user/{org}/'
+    return get_http_client().get_json(url).get('boxes', [])
+
+
+def get_box_versions_stats(org: str, box_name: str) -> typing.List[dict]:
+    """
+    Returns downloads count of every Vagrant box version and version
+    provider.
+
+    Parameters
+    ----------
+    org : str
+        Vagrant Cloud organization or user name.
+    box_name : str
+        Vagrant box name.
+
+    Returns
+    -------
+    list
+        List of dictionaries containing a version ("version_pulls") or a
+        version provider ("provider_pulls") downloads count, version and
+        provider (for version providers only).
+    """
+    url = f'https://app.vagrantup.com/api/v1/box/{org}/{box_name}'
+    j = get_http_client().get_json(url)
+    ts = get_iso8601_ts()
+    stats = []
+    for version in j.get('versions', ()):
+        stats.append({'version_pulls': version['downloads'],
+                      'version': version['version'],
+                      'ts': ts})
+        for provider in version.get('providers', ()):
+            if 'downloads' not in provider:
+                continue
+            stats.append({'provider_pulls': provider['downloads'],
+                          'version': version['version'],
+                          'provider': provider['name'],
+                          'ts': ts})
+    return stats
+
+
+def collect(args: argparse.Namespace) -> typing.Iterator[
+        typing.Tuple[str, dict]]:
+    """
+    Collects Vagrant box statistics for the parsed command line arguments.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Parsed command line arguments.
+
+    Returns
+    -------
+    typing.Iterator[typing.Tuple[str, dict]]
+        Iterator over MQTT topic name and message pairs.
+    """
+    org = args.organization
+    boxes = {box['name']: box for box in get_org_boxes(org)}
+    box_names = sorted(boxes) if args.all else args.image
+    missing = [name for name in box_names if name not in boxes]
+    if missing:
+        raise Exception(f'box(es) {", ".join(missing)} are not found in '
+                        f'{org} organization')
+    ts = get_iso8601_ts()
+    for box_name in box_names:
+        yield (get_usage_stats_topic_name('vagrantup', org, box_name),
+               {'pulls': boxes[box_name]['downloads'], 'ts': ts})
+    if not args.versions:
+        return
+    for (_, box_name), versions_stats in fetch_concurrently(
+            get_box_versions_stats, [(org, name) for name in box_names],
+            max_workers=args.concurrency,
+            max_per_host=args.host_concurrency):
+        topic = get_usage_stats_topic_name('vagrantup', org, box_name)
+        for version_stats in versions_stats:
+            yield topic, version_stats
+
+
+def main(sys_args):
+    arg_parser = init_arg_parser()
+    args = arg_parser.parse_args(sys_args)
+    #
+    with guarded_run('vagrantup', args, sys_args), \
+            open_publisher(args) as publisher:
+        for mqtt_topic, box_stats in collect(args):
+            publisher.publish(mqtt_topic, box_stats)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
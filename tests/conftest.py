@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""
+Shared test fixtures: the benchmarks fake upstream server and MQTT broker
+stub, a scripted HTTP server and an isolated sensors cache directory.
+"""
+
+import http.server
+import os
+import socketserver
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'benchmarks'))
+
+from mqtt_stub import MQTTBrokerStub  # noqa: E402
+from upstream import FakeUpstream, UpstreamHTTPClient  # noqa: E402
+
+from almawitness.sensors import common  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """
+    Isolated sensors cache directory and fresh HTTP client and timings.
+    """
+    path = str(tmp_path / 'cache')
+    monkeypatch.setattr(common, 'CACHE_DIR', path)
+    monkeypatch.setattr(common, '_http_client', None)
+    monkeypatch.setattr(common, '_timings', None)
+    return path
+
+
+@pytest.fixture
+def broker():
+    """MQTT broker stub which keeps received messages."""
+    broker = MQTTBrokerStub(keep_messages=True)
+    broker.start()
+    yield broker
+    broker.stop()
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake upstream APIs server used by the sensors HTTP client."""
+    upstream = FakeUpstream(targets=3)
+    upstream.start()
+    monkeypatch.setattr(common, '_http_client', UpstreamHTTPClient(
+        upstream.port, timings=common.get_timings()
+    ))
+    yield upstream
+    upstream.stop()
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           http.server.HTTPServer):
+
+    daemon_threads = True
+
+
+class _ScriptedHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers.items())))
+        # the last response is repeated
+        if len(server.responses) > 1:
+            status, headers, body = server.responses.pop(0)
+        else:
+            status, headers, body = server.responses[0]
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_stub():
+    """
+    HTTP server which sends `responses` (a list of status, headers and
+    body tuples) in order and records `requests` (path and headers pairs).
+    """
+    server = _ThreadingHTTPServer(('127.0.0.1', 0), _ScriptedHandler)
+    server.responses = [(200, {'Content-Type': 'application/json'}, b'{}')]
+    server.requests = []
+    server.url = f'http://127.0.0.1:{server.server_address[1]}/'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""LastValueStore and change-only publishing tests."""
+
+import argparse
+import os
+import typing
+
+import pytest
+
+from almawitness.sensors.common import (
+    add_mqtt_arg_parser_args,
+    ChangesOnlyPublisher,
+    LastValueStore,
+    open_publisher
+)
+
+
+class ListPublisher:
+
+    """Publisher which keeps messages in a list."""
+
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, topic: str, message: dict):
+        self.messages.append((topic, message))
+
+    def flush(self):
+        pass
+
+
+@pytest.fixture
+def store(cache_dir):
+    store = LastValueStore(os.path.join(cache_dir, 'last-values.db'),
+                           deadband=5, heartbeat=3)
+    yield store
+    store.close()
+
+
+def publish_runs(store: LastValueStore, runs: typing.List[list]
+                 ) -> typing.List[list]:
+    published = []
+    for messages in runs:
+        output = ListPublisher()
+        publisher = ChangesOnlyPublisher(output, store)
+        for topic, message in messages:
+            publisher.publish(topic, message)
+        publisher.flush()
+        published.append([message for _, message in output.messages])
+    return published
+
+
+def test_deadband(store):
+    assert store.is_unchanged({'pulls': 100}, {'pulls': 105})
+    assert store.is_unchanged({'pulls': -100}, {'pulls': -95})
+    assert not store.is_unchanged({'pulls': 100}, {'pulls': 105.5})
+    assert not store.is_unchanged({'pulls': 0}, {'pulls': 1})
+    assert not store.is_unchanged({'pulls': 100}, {'pulls': 100, 'stars': 1})
+    assert store.is_unchanged({'version': '9.1'}, {'version': '9.1'})
+    assert not store.is_unchanged({'version': '9.1'}, {'version': '9.2'})
+
+
+def test_compares_to_published_values(store):
+    topic = 'stats/usage/dockerhub/library/almalinux'
+    runs = [[(topic, {'pulls': pulls, 'ts': str(i)})]
+            for i, pulls in enumerate((100, 103, 106, 108))]
+    # slowly growing counters are published when they leave the deadband
+    assert publish_runs(store, runs) == [[{'pulls': 100, 'ts': '0'}], [],
+                                         [{'pulls': 106, 'ts': '2'}], []]
+
+
+def test_heartbeat(store):
+    message = ('stats/social/reddit/AlmaLinux', {'total_users': 5})
+    published = publish_runs(store, [[message]] * 7)
+    assert [len(messages) for messages in published] == \
+        [1, 0, 0, 1, 0, 0, 1]
+
+
+def test_no_heartbeat(cache_dir):
+    store = LastValueStore(os.path.join(cache_dir, 'last-values.db'),
+                           heartbeat=0)
+    try:
+        message = ('stats/social/reddit/AlmaLinux', {'total_users': 5})
+        published = publish_runs(store, [[message]] * 20)
+    finally:
+        store.close()
+    assert sum(len(messages) for messages in published) == 1
+
+
+def test_tags(store):
+    topic = 'stats/usage/distrowatch/almalinux'
+    runs = [[(topic, {'hits': 10, 'span': span}) for span in (7, 30)]] * 2
+    # every tag value has its own last value
+    assert [len(messages) for messages in publish_runs(store, runs)] == [2, 0]
+
+
+def test_store_updated_on_flush(store):
+    message = ('stats/social/reddit/AlmaLinux', {'total_users': 5})
+    ChangesOnlyPublisher(ListPublisher(), store).publish(*message)
+    # values aren't saved if messages weren't delivered
+    assert publish_runs(store, [[message]]) == [[{'total_users': 5}]]
+
+
+def test_changes_only_argument(broker, cache_dir):
+    arg_parser = argparse.ArgumentParser()
+    add_mqtt_arg_parser_args(arg_parser)
+    args = arg_parser.parse_args([
+        '-s', '127.0.0.1', '-p', str(broker.port), '--changes-only',
+        '--state-db', os.path.join(cache_dir, 'last-values.db')
+    ])
+    for total_users in (5, 5, 6):
+        with open_publisher(args) as publisher:
+            publisher.publish('stats/social/reddit/AlmaLinux',
+                              {'total_users': total_users})
+    assert len(broker.messages) == 2
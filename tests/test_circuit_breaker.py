@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""CircuitBreaker tests."""
+
+import time
+import urllib.error
+
+import pytest
+
+from almawitness.sensors.common import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HTTPClient
+)
+
+
+def get_status(client: HTTPClient, url: str) -> int:
+    try:
+        with client.get(url) as rsp:
+            rsp.read()
+            return rsp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_open_after_failures():
+    breaker = CircuitBreaker(failure_threshold=3, recovery_time=60)
+    for _ in range(2):
+        breaker.acquire('hub.docker.com')
+        breaker.record('hub.docker.com', False)
+    # a success resets the consecutive failures count
+    breaker.acquire('hub.docker.com')
+    breaker.record('hub.docker.com', True)
+    for _ in range(2):
+        breaker.acquire('hub.docker.com')
+        breaker.record('hub.docker.com', False)
+    assert not breaker.is_open('hub.docker.com')
+    breaker.acquire('hub.docker.com')
+    breaker.record('hub.docker.com', False)
+    assert breaker.is_open('hub.docker.com')
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire('hub.docker.com')
+    # other hosts aren't affected
+    breaker.acquire('api.github.com')
+
+
+def test_half_open():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=0.2)
+    breaker.acquire('hub.docker.com')
+    breaker.record('hub.docker.com', False)
+    time.sleep(0.3)
+    # only a single probe request is let through
+    breaker.acquire('hub.docker.com')
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire('hub.docker.com')
+    # a cancelled probe doesn't change the circuit state
+    breaker.release('hub.docker.com')
+    breaker.acquire('hub.docker.com')
+    breaker.record('hub.docker.com', False)
+    # a failed probe opens the circuit again
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire('hub.docker.com')
+    time.sleep(0.3)
+    breaker.acquire('hub.docker.com')
+    breaker.record('hub.docker.com', True)
+    assert not breaker.is_open('hub.docker.com')
+    breaker.acquire('hub.docker.com')
+
+
+def test_client_requests(http_stub):
+    http_stub.responses = [(500, {}, b''), (500, {}, b''), (500, {}, b''),
+                           (200, {}, b'')]
+    client = HTTPClient(circuit_breaker=CircuitBreaker(failure_threshold=2,
+                                                       recovery_time=0.5))
+    assert [get_status(client, http_stub.url) for _ in range(2)] == \
+        [500, 500]
+    # requests to an unavailable host aren't sent
+    with pytest.raises(CircuitOpenError):
+        get_status(client, http_stub.url)
+    assert len(http_stub.requests) == 2
+    time.sleep(0.6)
+    assert get_status(client, http_stub.url) == 500
+    with pytest.raises(CircuitOpenError):
+        get_status(client, http_stub.url)
+    time.sleep(0.6)
+    assert get_status(client, http_stub.url) == 200
+    assert get_status(client, http_stub.url) == 200
+    assert len(http_stub.requests) == 5
+
+
+def test_client_connection_errors(http_stub):
+    url = http_stub.url
+    http_stub.shutdown()
+    http_stub.server_close()
+    client = HTTPClient(circuit_breaker=CircuitBreaker(failure_threshold=2))
+    for _ in range(2):
+        with pytest.raises(ConnectionRefusedError):
+            get_status(client, url)
+    with pytest.raises(CircuitOpenError):
+        get_status(client, url)
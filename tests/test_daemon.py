@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""Scheduler daemon tests."""
+
+import json
+import os
+import threading
+import time
+import typing
+
+import pytest
+
+from almawitness import daemon
+from almawitness.sensors.common import LastValueStore
+
+
+class StubJob(daemon.Job):
+
+    """Job which yields predefined messages instead of running a sensor."""
+
+    def __init__(self, name: str, messages: typing.List[tuple],
+                 interval: float = 3600, duration: float = 0):
+        self.name = name
+        self.sensor = 'stub'
+        self.args = []
+        self.interval = interval
+        self.jitter = 0
+        self.messages = messages
+        self.duration = duration
+        self.runs = 0
+
+    def collect(self) -> typing.Iterator[typing.Tuple[str, dict]]:
+        self.runs += 1
+        time.sleep(self.duration)
+        yield from self.messages
+
+
+def get_stats(broker, name: str) -> typing.List[dict]:
+    return [json.loads(payload) for topic, payload in list(broker.messages)
+            if topic == f'stats/witness/{name}']
+
+
+def run_jobs(broker, jobs: typing.List[StubJob],
+             until: typing.Callable[[], bool], timeout: float = 10,
+             **kwargs):
+    stop_event = threading.Event()
+    thread = threading.Thread(target=daemon.run_jobs, args=(
+        jobs, '127.0.0.1', broker.port, 1, stop_event
+    ), kwargs=kwargs)
+    thread.start()
+    try:
+        deadline = time.monotonic() + timeout
+        while not until():
+            assert time.monotonic() < deadline, 'jobs timed out'
+            time.sleep(0.05)
+    finally:
+        stop_event.set()
+        thread.join()
+
+
+def test_skipped_messages_stats(broker, cache_dir):
+    job = StubJob('reddit', [('stats/social/reddit/AlmaLinux',
+                              {'total_users': 5})], interval=0.2)
+    last_values = LastValueStore(os.path.join(cache_dir, 'state.db'))
+    try:
+        run_jobs(broker, [job], lambda: len(get_stats(broker, 'reddit')) >= 2,
+                 last_values=last_values)
+    finally:
+        last_values.close()
+    first, second = get_stats(broker, 'reddit')[:2]
+    assert (first['messages'], first['skipped_messages']) == (1, 0)
+    assert (second['messages'], second['skipped_messages']) == (1, 1)
+    assert 'skipped' not in second
+    assert second['errors'] == 0
+
+
+def test_phase_timings(broker):
+    job = StubJob('docker_hub', [('stats/usage/dockerhub/library/almalinux',
+                                  {'pulls': 1})], duration=0.2)
+    run_jobs(broker, [job], lambda: get_stats(broker, 'docker_hub'))
+    stats, = get_stats(broker, 'docker_hub')
+    assert stats['collect_time'] >= 0.2
+    assert 0 < stats['publish_time'] < stats['run_time']
+    assert stats['run_time'] >= stats['collect_time']
+
+
+@pytest.mark.parametrize('changes_only', [False, True])
+def test_stats_without_skipped(broker, cache_dir, changes_only):
+    job = StubJob('github', [('stats/social/github/almalinux/repo',
+                              {'stars': 1})])
+    last_values = LastValueStore(os.path.join(cache_dir, 'state.db')) \
+        if changes_only else None
+    try:
+        run_jobs(broker, [job], lambda: get_stats(broker, 'github'),
+                 last_values=last_values)
+    finally:
+        if last_values is not None:
+            last_values.close()
+    stats, = get_stats(broker, 'github')
+    assert stats['skipped_messages'] == 0
+
+
+def test_schedule(broker):
+    fast = StubJob('fast', [('stats/test/fast', {'value': 1})],
+                   interval=0.2)
+    slow = StubJob('slow', [('stats/test/slow', {'value': 1})],
+                   interval=60)
+    start = time.monotonic()
+    run_jobs(broker, [fast, slow], lambda: fast.runs >= 5)
+    # every job runs with its own interval
+    assert time.monotonic() - start < 1.5
+    assert slow.runs == 1
+
+
+def test_skips_overlapping_runs(broker, caplog):
+    job = StubJob('hung', [('stats/test/hung', {'value': 1})], interval=0.1,
+                  duration=0.5)
+    run_jobs(broker, [job], lambda: caplog.text.count(
+        'hung: previous run is still in progress, skipping') >= 3)
+    # the job is scheduled every 0.1 seconds but runs only once at a time
+    assert job.runs == 1
+
+
+def test_failed_job(broker, caplog):
+    class FailedJob(StubJob):
+
+        def collect(self):
+            yield 'stats/test/failed', {'value': 1}
+            raise ConnectionError('upstream is unavailable')
+    #
+    job = FailedJob('failed', [], interval=0.2)
+    run_jobs(broker, [job], lambda: len(get_stats(broker, 'failed')) >= 2)
+    # a failed job is scheduled again
+    stats = get_stats(broker, 'failed')[0]
+    assert (stats['messages'], stats['errors']) == (1, 1)
+    assert 'failed: run failed: upstream is unavailable' in caplog.text
+
+
+def test_load_jobs(tmp_path):
+    config_path = str(tmp_path / 'witness.ini')
+    with open(config_path, 'w') as fd:
+        fd.write('[DEFAULT]\n'
+                 'interval = 600\n'
+                 '\n'
+                 '[almalinux-docker]\n'
+                 'sensor = docker_hub\n'
+                 'args = -o library -i almalinux "alma linux"\n'
+                 '\n'
+                 '[almalinux-reddit]\n'
+                 'sensor = reddit\n'
+                 'args = -r AlmaLinux\n'
+                 'interval = 3600\n'
+                 'jitter = 0\n')
+    docker, reddit = daemon.load_jobs(config_path)
+    assert (docker.name, docker.sensor, docker.interval, docker.jitter) == \
+        ('almalinux-docker', 'docker_hub', 600, 300)
+    assert docker.args == ['-o', 'library', '-i', 'almalinux', 'alma linux']
+    assert (reddit.interval, reddit.jitter) == (3600, 0)
+    assert reddit.next_delay() == 0
+    with open(config_path, 'a') as fd:
+        fd.write('\n[unknown]\nsensor = unknown\n')
+    with pytest.raises(ValueError):
+        daemon.load_jobs(config_path)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""DistroWatch sensor and page hit ranking parser tests."""
+
+import json
+
+import pytest
+
+from almawitness.sensors import distrowatch
+
+from fixtures import distrowatch_page
+
+
+# a fragment of the real DistroWatch front page markup
+RANKING_PAGE = """
+<table class="News" style="direction: ltr">
+<tr><td class="NewsText">Latest news <table><tr><td>1</td></tr></table>
+</td></tr></table>
+<table class="News" style="direction: ltr; width: 100%">
+  <tr>
+    <th class="Invert" colspan="3"
+        style="text-align: center; direction: ltr">Page Hit Ranking</th>
+  </tr>
+  <tr>
+    <th class="Invert" colspan="3" style="direction: ltr">
+      <form action="index.php" method="get">Data span:
+        <select name="dataspan">
+          <option value="1" selected>Last 7 days</option>
+          <option value="4">Last 1 month</option>
+        </select>
+      </form>
+    </th>
+  </tr>
+  <tr><th class="News">Rank</th><th class="News">Distribution</th>
+      <th class="News">HPD*</th></tr>
+  <tr>
+    <th class="phr1">1</th>
+    <td class="phr2"><a href="mint">Mint</a></td>
+    <td class="phr3" title="Yesterday: 2855">2855<img src="images/alevel.png"
+        alt="=" title="Yesterday: 2855"/></td>
+  </tr>
+  <tr>
+    <th class="phr1">2</th>
+    <td class="phr2"><a href="almalinux">AlmaLinux &amp; Co</a></td>
+    <td class="phr3" title="Yesterday: 912">903<img src="images/adown.png"
+        alt="&lt;" title="Yesterday: 912"/></td>
+  </tr>
+  <tr><th class="phr1">3</th><td class="phr2"><a href="x">Broken</a></td>
+      <td class="phr3">n/a</td></tr>
+  <tr><td class="News" colspan="3">* HPD = Hits Per Day</td></tr>
+</table>
+<table class="News"><tr><th class="phr1">1</th>
+<td class="phr2">Not a ranking</td><td class="phr3">1</td></tr></table>
+"""
+
+EXPECTED_RANKING = [{'rank': 1, 'name': 'Mint', 'hits': 2855},
+                    {'rank': 2, 'name': 'AlmaLinux & Co', 'hits': 903}]
+
+
+def parse(page: str, chunk_size: int) -> distrowatch._PageHitRankingParser:
+    parser = distrowatch._PageHitRankingParser()
+    for i in range(0, len(page), chunk_size):
+        parser.feed(page[i:i + chunk_size])
+    parser.close()
+    return parser
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_ranking_markup(chunk_size):
+    parser = parse(RANKING_PAGE, chunk_size)
+    assert parser.done
+    assert parser.ranking == EXPECTED_RANKING
+
+
+def test_done_after_table():
+    parser = distrowatch._PageHitRankingParser()
+    end = RANKING_PAGE.index('</table>', RANKING_PAGE.index('HPD = '))
+    parser.feed(RANKING_PAGE[:end])
+    assert not parser.done
+    parser.feed(RANKING_PAGE[end:end + len('</table>')])
+    # the rest of the page doesn't need to be parsed
+    assert parser.done
+    assert parser.ranking == EXPECTED_RANKING
+
+
+def test_page_without_ranking():
+    parser = parse('<html><body><table><tr><th class="phr1">1</th>'
+                   '</tr></table></body></html>', 64 * 1024)
+    assert not parser.done
+    assert parser.ranking == []
+
+
+def test_benchmark_fixture():
+    page = distrowatch_page(['AlmaLinux', 'Rocky Linux'], rows=50)
+    parser = parse(page.decode('utf-8'), 1000)
+    assert len(parser.ranking) == 50
+    assert parser.ranking[:2] == [
+        {'rank': 1, 'name': 'AlmaLinux', 'hits': 2993},
+        {'rank': 2, 'name': 'Rocky Linux', 'hits': 2986}
+    ]
+
+
+def test_distro_stats(upstream):
+    stats = distrowatch.get_distro_stats('^rocky')
+    assert (stats['rank'], stats['hits']) == (7, 3000 - 7 * 7)
+    assert distrowatch.get_distro_stats('^centos$') is None
+
+
+def test_span_tag(broker, upstream):
+    distrowatch.main(['-m', 'almalinux=^almalinux', '--span', '1', '4',
+                      '--no-cache', '-s', '127.0.0.1', '-p',
+                      str(broker.port), '--deadline', '0',
+                      '--no-self-stats'])
+    spans = sorted(json.loads(payload).get('span', 0)
+                   for _, payload in broker.messages)
+    # the default data span series has no span tag
+    assert spans == [0, 4]
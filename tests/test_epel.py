@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""EPEL sensor database download and statistics tests."""
+
+import filecmp
+import json
+import os
+import sqlite3
+
+import pytest
+
+from almawitness.sensors import epel
+from almawitness.sensors.common import FetchError
+
+from fixtures import create_countme_db
+
+
+COUNTME_ROWS = [
+    (10, 2859, 'AlmaLinux', 'epel-8'),
+    (5, 2859, 'almalinux', 'epel-8'),
+    (7, 2859, 'AlmaLinux', 'epel-9'),
+    (100, 2859, 'AlmaLinux', 'epel-testing-9'),
+    (3, 2859, 'AlmaLinux', 'epel-modular'),
+    (60, 2859, 'Rocky Linux', 'epel-8'),
+    (20, 2860, 'AlmaLinux', 'epel-8'),
+    (1, 2860, 'AlmaLinux', 'epel-9'),
+    (4, 2860, 'ALMALINUX', 'epel-9'),
+    (50, 2860, 'Rocky Linux', 'epel-9')
+]
+
+
+@pytest.fixture
+def totals_db(tmp_path):
+    """Small EPEL countme database with known hits."""
+    db_path = str(tmp_path / 'totals.db')
+    insert_rows(db_path, COUNTME_ROWS)
+    return db_path
+
+
+def insert_rows(db_path: str, rows: list):
+    with sqlite3.connect(db_path) as con:
+        con.execute('CREATE TABLE IF NOT EXISTS countme_totals ('
+                    '  hits INTEGER, weeknum TEXT, os_name TEXT, '
+                    '  os_version TEXT, sys_age TEXT, repo_tag TEXT, '
+                    '  repo_arch TEXT)')
+        con.executemany('INSERT INTO countme_totals VALUES '
+                        '(?, ?, ?, "", "1", ?, "x86_64")', rows)
+    con.close()
+
+
+@pytest.fixture
+def countme_db(upstream, tmp_path):
+    """EPEL countme database served by the fake upstream server."""
+    db_path = str(tmp_path / 'upstream-totals.db')
+    create_countme_db(db_path, weeks=4, os_names=('AlmaLinux', 'Rocky'))
+    upstream.countme_db_path = db_path
+    return db_path
+
+
+def test_download(upstream, countme_db, tmp_path):
+    db_path = str(tmp_path / 'totals.db')
+    assert epel.download_db(db_path, workers=3) == db_path
+    assert filecmp.cmp(db_path, countme_db, shallow=False)
+    assert not os.path.exists(f'{db_path}.part')
+    assert not os.path.exists(f'{db_path}.part.meta')
+    # HEAD and a request per byte range
+    assert upstream.requests == 4
+    # a fresh file isn't checked
+    epel.download_db(db_path)
+    assert upstream.requests == 4
+    # an outdated file isn't downloaded again if it's not changed
+    epel.download_db(db_path, expire_days=0)
+    assert upstream.requests == 5
+
+
+def test_resume(upstream, countme_db, tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'totals.db')
+    download_range = epel.download_range
+
+    def interrupted_download_range(url, part_path, rng, *args):
+        if rng[0] > 0:
+            raise ConnectionResetError('connection is reset')
+        download_range(url, part_path, rng, *args)
+    #
+    monkeypatch.setattr(epel, 'download_range', interrupted_download_range)
+    with pytest.raises(FetchError):
+        epel.download_db(db_path, workers=2)
+    assert not os.path.exists(db_path)
+    with open(f'{db_path}.part.meta', 'r') as fd:
+        ranges = json.load(fd)['ranges']
+    size = os.stat(countme_db).st_size
+    assert ranges == [[0, ranges[0][1], ranges[0][1]],
+                      [ranges[0][1], size, 0]]
+    monkeypatch.setattr(epel, 'download_range', download_range)
+    upstream.requests = 0
+    epel.download_db(db_path, workers=2)
+    # only the missing range is downloaded
+    assert upstream.requests == 2
+    assert filecmp.cmp(db_path, countme_db, shallow=False)
+    assert not os.path.exists(f'{db_path}.part.meta')
+
+
+def test_resume_changed_file(upstream, countme_db, tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'totals.db')
+    download_range = epel.download_range
+    monkeypatch.setattr(epel, 'download_range', _fail_download_range)
+    with pytest.raises(FetchError):
+        epel.download_db(db_path, workers=2)
+    monkeypatch.setattr(epel, 'download_range', download_range)
+    # the upstream file is replaced by a bigger one
+    create_countme_db(countme_db, weeks=5, os_names=('AlmaLinux', 'Rocky'))
+    epel.download_db(db_path, workers=2)
+    assert filecmp.cmp(db_path, countme_db, shallow=False)
+
+
+def test_broken_download(upstream, tmp_path):
+    broken_path = str(tmp_path / 'broken.db')
+    with open(broken_path, 'wb') as fd:
+        fd.write(b'not a database')
+    upstream.countme_db_path = broken_path
+    db_path = str(tmp_path / 'totals.db')
+    with pytest.raises(ValueError):
+        epel.download_db(db_path)
+    # a broken file never replaces the database
+    assert not os.path.exists(db_path)
+    assert not os.path.exists(f'{db_path}.part')
+
+
+def test_organizations_stats(totals_db):
+    stats = [(org, rec['version'], rec['hits']) for org, rec
+             in epel.get_organizations_epel_stats(totals_db, {
+                 'almalinux': 'almalinux%', 'rocky': 'Rocky%',
+                 'centos': 'centos%'
+             })]
+    # the last week hits, OS names are case-insensitive and non-standard
+    # repositories are skipped
+    assert stats == [('almalinux', '8', 20), ('almalinux', '9', 5),
+                     ('almalinux', 'all', 25), ('rocky', '9', 50),
+                     ('rocky', 'all', 50), ('centos', 'all', 0)]
+
+
+def test_summary_rebuild(totals_db):
+    summary_path = epel.build_summary_db(totals_db)
+    assert summary_path == f'{totals_db}.summary'
+    mtime = os.stat(summary_path).st_mtime_ns
+    assert epel.build_summary_db(totals_db) == summary_path
+    # the summary isn't rebuilt while the database is the same
+    assert os.stat(summary_path).st_mtime_ns == mtime
+    insert_rows(totals_db, [(1000, 2860, 'AlmaLinux', 'epel-10')])
+    assert [rec for rec in epel.get_epel_stats(totals_db, 'almalinux%')
+            if rec['version'] == 'all'][0]['hits'] == 1025
+
+
+def test_broken_summary(totals_db):
+    with open(f'{totals_db}.summary', 'wb') as fd:
+        fd.write(b'not a database')
+    assert [rec['hits'] for rec in epel.get_epel_stats(totals_db, 'rocky%')
+            ] == [50, 50]
+
+
+def test_history(totals_db):
+    history = [(org, rec['ts'], rec['version'], rec['hits']) for org, rec
+               in epel.iter_epel_history(totals_db, {
+                   'almalinux': 'almalinux%', 'rocky': 'Rocky%'
+               })]
+    # organization totals follow every week versions
+    assert history == [
+        ('almalinux', '2024-10-21T00:00:00Z', '8', 15),
+        ('almalinux', '2024-10-21T00:00:00Z', '9', 7),
+        ('rocky', '2024-10-21T00:00:00Z', '8', 60),
+        ('almalinux', '2024-10-21T00:00:00Z', 'all', 22),
+        ('rocky', '2024-10-21T00:00:00Z', 'all', 60),
+        ('almalinux', '2024-10-28T00:00:00Z', '8', 20),
+        ('almalinux', '2024-10-28T00:00:00Z', '9', 5),
+        ('rocky', '2024-10-28T00:00:00Z', '9', 50),
+        ('almalinux', '2024-10-28T00:00:00Z', 'all', 25),
+        ('rocky', '2024-10-28T00:00:00Z', 'all', 50)
+    ]
+
+
+def test_parse_week():
+    assert epel.parse_week('2860') == 2860
+    assert epel.parse_week('2024-10-28') == 2860
+    assert epel.parse_week('2024-11-03') == 2860
+    assert epel.get_week_iso8601_ts(2860) == '2024-10-28T00:00:00Z'
+
+
+def test_backfill(broker, totals_db):
+    epel.main(['-d', totals_db, '-o', 'almalinux', '--query', 'almalinux%',
+               '--backfill', '--since', '2024-10-28', '-s', '127.0.0.1',
+               '-p', str(broker.port), '--deadline', '0', '--no-self-stats'])
+    assert [(topic, json.loads(payload)) for topic, payload
+            in broker.messages] == [
+        ('stats/usage/epel/almalinux/8',
+         {'hits': 20, 'ts': '2024-10-28T00:00:00Z'}),
+        ('stats/usage/epel/almalinux/9',
+         {'hits': 5, 'ts': '2024-10-28T00:00:00Z'}),
+        ('stats/usage/epel/almalinux/all',
+         {'hits': 25, 'ts': '2024-10-28T00:00:00Z'})
+    ]
+
+
+def _fail_download_range(url, part_path, rng, *args):
+    raise ConnectionResetError('connection is reset')
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""guarded_run run lock and deadline tests."""
+
+import argparse
+import json
+import signal
+import time
+
+import pytest
+
+from almawitness.sensors import common
+from almawitness.sensors.common import (
+    add_mqtt_arg_parser_args,
+    add_run_arg_parser_args,
+    AlreadyRunningError,
+    DeadlineExceeded,
+    get_http_client,
+    guarded_run
+)
+
+
+def parse_run_args(broker, *args: str) -> argparse.Namespace:
+    arg_parser = argparse.ArgumentParser()
+    add_mqtt_arg_parser_args(arg_parser)
+    add_run_arg_parser_args(arg_parser)
+    return arg_parser.parse_args(['-s', '127.0.0.1', '-p', str(broker.port),
+                                  *args])
+
+
+def test_run_lock(broker):
+    args = parse_run_args(broker, '--deadline', '0', '--no-self-stats')
+    with guarded_run('reddit', args, ['-r', 'AlmaLinux']):
+        with pytest.raises(AlreadyRunningError):
+            with guarded_run('reddit', args, ['-r', 'AlmaLinux']):
+                pass
+        # runs with other arguments or of other sensors aren't blocked
+        with guarded_run('reddit', args, ['-r', 'CentOS']):
+            pass
+        with guarded_run('github_repo', args, ['-r', 'AlmaLinux']):
+            pass
+    with guarded_run('reddit', args, ['-r', 'AlmaLinux']):
+        pass
+
+
+def test_deadline_alarm(broker, monkeypatch):
+    monkeypatch.setattr(common, 'DEADLINE_GRACE_PERIOD', 0)
+    args = parse_run_args(broker, '--deadline', '1')
+    prev_handler = signal.getsignal(signal.SIGALRM)
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        with guarded_run('reddit', args, []):
+            # a hung run is interrupted in the main thread
+            time.sleep(5)
+    assert 0.9 < time.monotonic() - start < 3
+    # the previous handler is restored and the alarm is cancelled
+    assert signal.getsignal(signal.SIGALRM) is prev_handler
+    assert signal.alarm(0) == 0
+    (topic, payload), = broker.messages
+    assert topic == 'stats/witness/reddit'
+    assert json.loads(payload)['errors'] == 1
+
+
+def test_requests_deadline(broker, http_stub):
+    args = parse_run_args(broker, '--deadline', '0.5', '--timeout', '10',
+                          '--no-self-stats')
+    with guarded_run('reddit', args, []):
+        http_client = get_http_client()
+        assert http_client.get_request_timeout() <= 0.5
+        time.sleep(0.6)
+        with pytest.raises(DeadlineExceeded):
+            http_client.get_json(http_stub.url)
+        signal.alarm(0)
+    assert http_stub.requests == []
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""HTTPResponse streaming JSON decoding tests."""
+
+import gzip
+import http.server
+import json
+import threading
+
+import pytest
+
+from almawitness.sensors import common
+
+
+class _JSONStubHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body, gzipped = self.server.body, self.server.gzipped
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        if gzipped:
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = http.server.HTTPServer(('127.0.0.1', 0), _JSONStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def iter_json_array(server: http.server.HTTPServer, body: bytes,
+                    gzipped: bool = False) -> list:
+    server.body, server.gzipped = body, gzipped
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+    with common.HTTPClient().get(url) as rsp:
+        return list(rsp.iter_json_array())
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 4, 7, 64 * 1024])
+@pytest.mark.parametrize('body', [
+    b'[]',
+    b' [ ] ',
+    b'[10.25, 3]',
+    b'[1e5]',
+    b'[-1.5E+10,0,123456]',
+    b'[true, false, null]',
+    b'["a,]b\\u00e9", "\xd0\xb0\xd0\xb1"]',
+    b'[{"name": "2021-06-09", "value": [1, {"x": "]"}]}, {"name": "b"}]',
+    b'\n[\n  {"name": "post_count", "value": 10.5}\n]\n'
+])
+def test_chunk_boundaries(server, monkeypatch, chunk_size, body):
+    monkeypatch.setattr(common, 'HTTP_CHUNK_SIZE', chunk_size)
+    assert iter_json_array(server, body) == json.loads(body)
+
+
+def test_gzip_encoding(server, monkeypatch):
+    monkeypatch.setattr(common, 'HTTP_CHUNK_SIZE', 3)
+    items = [{'name': f'2021-06-{i:02}', 'value': i * 1.5}
+             for i in range(1, 31)]
+    body = json.dumps(items).encode('utf-8')
+    assert iter_json_array(server, body, gzipped=True) == items
+
+
+@pytest.mark.parametrize('chunk_size', [1, 64 * 1024])
+@pytest.mark.parametrize('body', [b'{"a": 1}', b'[1, 2', b'[1 2]', b'[1,]',
+                                  b''])
+def test_invalid_array(server, monkeypatch, chunk_size, body):
+    monkeypatch.setattr(common, 'HTTP_CHUNK_SIZE', chunk_size)
+    with pytest.raises(ValueError):
+        iter_json_array(server, body)
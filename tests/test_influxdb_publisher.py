@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""InfluxDBPublisher and the `--output influxdb` argument tests."""
+
+import argparse
+import gzip
+import http.server
+import threading
+import urllib.parse
+
+import pytest
+
+from almawitness import daemon
+from almawitness.sensors.common import (
+    add_mqtt_arg_parser_args,
+    FetchError,
+    InfluxDBPublisher,
+    open_publisher
+)
+
+
+class _InfluxDBStubHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.writes.append((self.path, dict(self.headers.items()),
+                                   body))
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def influxdb():
+    server = http.server.HTTPServer(('127.0.0.1', 0), _InfluxDBStubHandler)
+    server.writes = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get_url(server: http.server.HTTPServer) -> str:
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def get_lines(body: bytes) -> list:
+    return gzip.decompress(body).decode('utf-8').split('\n')
+
+
+def test_write_request(influxdb):
+    publisher = InfluxDBPublisher(get_url(influxdb), 'secret', 'AlmaLinux',
+                                  'distro_spread')
+    publisher.publish('stats/usage/docker_hub/library/almalinux',
+                      {'pulls': 10, 'ts': '2021-06-09T21:10:26Z'})
+    assert influxdb.writes == []
+    publisher.flush()
+    assert publisher.published == 1
+    (path, headers, body), = influxdb.writes
+    url = urllib.parse.urlsplit(path)
+    assert url.path == '/api/v2/write'
+    assert dict(urllib.parse.parse_qsl(url.query)) == {
+        'org': 'AlmaLinux', 'bucket': 'distro_spread', 'precision': 'ns'
+    }
+    assert headers['Authorization'] == 'Token secret'
+    assert headers['Content-Encoding'] == 'gzip'
+    assert get_lines(body) == [
+        'distro_spread,image=almalinux,org=library,platform=docker_hub '
+        'pulls=10.0 1623273026000000000'
+    ]
+
+
+def test_batching(influxdb):
+    publisher = InfluxDBPublisher(get_url(influxdb), 'secret', 'AlmaLinux',
+                                  'distro_spread', batch_size=2)
+    for i in range(5):
+        publisher.publish(f'stats/usage/docker_hub/library/image-{i}',
+                          {'pulls': i, 'ts': '2021-06-09T21:10:26Z'})
+    # full batches are sent without waiting for flush
+    assert [len(get_lines(body)) for _, _, body in influxdb.writes] == [2, 2]
+    publisher.flush()
+    publisher.flush()
+    assert [len(get_lines(body)) for _, _, body in influxdb.writes] == \
+        [2, 2, 1]
+    assert publisher.published == 5
+
+
+def test_skips_messages_without_fields(influxdb):
+    publisher = InfluxDBPublisher(get_url(influxdb), 'secret', 'AlmaLinux',
+                                  'distro_spread')
+    publisher.publish('stats/social/chat.almalinux.org',
+                      {'ts': '2021-06-09T21:10:26Z'})
+    publisher.flush()
+    assert influxdb.writes == []
+
+
+def test_skips_unknown_topics(influxdb):
+    publisher = InfluxDBPublisher(get_url(influxdb), 'secret', 'AlmaLinux',
+                                  'distro_spread')
+    publisher.publish('custom/topic', {'value': 1})
+    publisher.publish('stats/witness/reddit',
+                      {'run_time': 1.5, 'ts': '2021-06-09T21:10:26Z'})
+    publisher.flush()
+    (_, _, body), = influxdb.writes
+    assert get_lines(body) == [
+        'witness,sensor=reddit run_time=1.5 1623273026000000000'
+    ]
+
+
+def parse_output_args(influxdb, *args: str) -> argparse.Namespace:
+    arg_parser = argparse.ArgumentParser()
+    add_mqtt_arg_parser_args(arg_parser)
+    return arg_parser.parse_args([
+        '--output', 'influxdb', '--influxdb-url', get_url(influxdb),
+        '--influxdb-token', 'secret', *args
+    ])
+
+
+def test_flush_on_error(influxdb):
+    args = parse_output_args(influxdb)
+    with pytest.raises(FetchError):
+        with open_publisher(args) as publisher:
+            for i in range(4):
+                publisher.publish(f'stats/usage/docker_hub/library/image-{i}',
+                                  {'pulls': i, 'ts': '2021-06-09T21:10:26Z'})
+            raise FetchError([(('library', 'image-4'), OSError('failed'))])
+    # points of successful targets are written anyway
+    (_, _, body), = influxdb.writes
+    assert len(get_lines(body)) == 4
+
+
+def test_daemon_rejects_output(influxdb, capsys):
+    with pytest.raises(SystemExit):
+        daemon.main(['-c', 'witness.ini', '--output', 'influxdb'])
+    assert 'influxdb output is not supported' in capsys.readouterr().err
+
+
+def test_output_argument_and_tags_escaping(influxdb):
+    args = parse_output_args(influxdb, '--influxdb-tag', 'host=witness a,b=c')
+    with open_publisher(args) as publisher:
+        publisher.publish('stats/social/reddit/AlmaLinux',
+                          {'total_users': 5, 'ts': '2021-06-09T21:10:26Z'})
+    (_, headers, body), = influxdb.writes
+    assert headers['Authorization'] == 'Token secret'
+    assert get_lines(body) == [
+        'alma_social,host=witness\\ a\\,b\\=c,org=AlmaLinux,platform=reddit '
+        'total_users=5.0 1623273026000000000'
+    ]
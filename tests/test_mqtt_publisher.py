@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""mqtt_publisher and MQTTPublisher tests."""
+
+import json
+
+import pytest
+
+from almawitness.sensors.common import mqtt_publisher
+
+
+def test_publish(broker):
+    with mqtt_publisher('127.0.0.1', broker.port) as publisher:
+        publisher.publish('stats/social/reddit/AlmaLinux',
+                          {'total_users': 5, 'ts': '2021-06-09T21:10:26Z'})
+    topic, payload = broker.messages[0]
+    assert topic == 'stats/social/reddit/AlmaLinux'
+    assert json.loads(payload) == {'total_users': 5,
+                                   'ts': '2021-06-09T21:10:26Z'}
+
+
+def test_flush_on_error(broker):
+    with pytest.raises(RuntimeError):
+        with mqtt_publisher('127.0.0.1', broker.port) as publisher:
+            for i in range(2000):
+                publisher.publish('stats/test', {'value': i})
+            raise RuntimeError('one of the targets has failed')
+    # messages published before the error are acknowledged on exit
+    assert publisher.published == 2000
+    assert broker.received == 2000
+
+
+def test_batches(broker):
+    with mqtt_publisher('127.0.0.1', broker.port) as publisher:
+        first, second = publisher.batch(), publisher.batch()
+        first.publish('stats/first', {'value': 1})
+        second.publish('stats/second', {'value': 2})
+        first.flush()
+        second.flush()
+        assert (first.published, second.published) == (1, 1)
+    assert sorted(topic for topic, _ in broker.messages) == \
+        ['stats/first', 'stats/second']
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""RateLimiter tests."""
+
+import argparse
+import email.utils
+import json
+import time
+
+import pytest
+
+from almawitness.sensors import common
+from almawitness.sensors.common import (
+    add_mqtt_arg_parser_args,
+    add_run_arg_parser_args,
+    fetch_concurrently,
+    guarded_run,
+    HTTPClient,
+    RateLimiter,
+    RateLimitError
+)
+
+
+def parse_run_args(broker, *args: str) -> argparse.Namespace:
+    arg_parser = argparse.ArgumentParser()
+    add_mqtt_arg_parser_args(arg_parser)
+    add_run_arg_parser_args(arg_parser)
+    return arg_parser.parse_args(['-s', '127.0.0.1', '-p', str(broker.port),
+                                  '--deadline', '0', *args])
+
+
+def test_run_stats_budgets(broker, monkeypatch):
+    rate_limiter = RateLimiter()
+    monkeypatch.setattr(common, '_http_client',
+                        HTTPClient(rate_limiter=rate_limiter))
+    args = parse_run_args(broker)
+    with guarded_run('github_repo', args, []):
+        rate_limiter.acquire('api.github.com')
+        rate_limiter.update('api.github.com', 200, {
+            'X-RateLimit-Remaining': '42',
+            'X-RateLimit-Reset': str(int(time.time()) + 600)
+        })
+        rate_limiter.acquire('hub.docker.com')
+        rate_limiter.update('hub.docker.com', 200, {})
+    (topic, payload), = broker.messages
+    assert topic == 'stats/witness/github_repo'
+    stats = json.loads(payload)
+    assert stats['rate_limit_remaining_api.github.com'] == 42
+    # hosts which don't report their rate limits are omitted
+    assert 'rate_limit_remaining_hub.docker.com' not in stats
+
+
+def test_github_headers():
+    rate_limiter = RateLimiter()
+    rate_limiter.acquire('api.github.com')
+    assert rate_limiter.remaining('api.github.com') is None
+    rate_limiter.update('api.github.com', 200, {
+        'X-RateLimit-Remaining': '2',
+        # GitHub sends the reset epoch time
+        'X-RateLimit-Reset': str(int(time.time()) + 100)
+    })
+    assert rate_limiter.remaining('api.github.com') == 2
+    assert rate_limiter.delay('api.github.com') == 0
+    # requests in flight are taken from the budget
+    rate_limiter.acquire('api.github.com')
+    assert rate_limiter.remaining('api.github.com') == 1
+    rate_limiter.release('api.github.com')
+    assert rate_limiter.remaining('api.github.com') == 2
+
+
+def test_reddit_headers():
+    rate_limiter = RateLimiter()
+    rate_limiter.acquire('oauth.reddit.com')
+    # Reddit sends float numbers and the number of seconds until the reset
+    rate_limiter.update('oauth.reddit.com', 200, {
+        'X-RateLimit-Remaining': '0.0', 'X-RateLimit-Reset': '100'
+    })
+    assert rate_limiter.remaining('oauth.reddit.com') == 0
+    assert 98 < rate_limiter.delay('oauth.reddit.com') <= 100
+
+
+def test_out_of_order_responses():
+    rate_limiter = RateLimiter()
+    reset = str(int(time.time()) + 100)
+    for _ in range(2):
+        rate_limiter.acquire('api.github.com')
+    for remaining in ('10', '12'):
+        rate_limiter.update('api.github.com', 200, {
+            'X-RateLimit-Remaining': remaining, 'X-RateLimit-Reset': reset
+        })
+    assert rate_limiter.remaining('api.github.com') == 10
+    # a new window resets the budget
+    rate_limiter.acquire('api.github.com')
+    rate_limiter.update('api.github.com', 200, {
+        'X-RateLimit-Remaining': '4999',
+        'X-RateLimit-Reset': str(int(time.time()) + 3700)
+    })
+    assert rate_limiter.remaining('api.github.com') == 4999
+
+
+def test_window_reset():
+    rate_limiter = RateLimiter()
+    rate_limiter.acquire('api.github.com')
+    rate_limiter.update('api.github.com', 200, {
+        'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '0.1'
+    })
+    assert rate_limiter.delay('api.github.com') > 0
+    time.sleep(0.2)
+    assert rate_limiter.delay('api.github.com') == 0
+    assert rate_limiter.remaining('api.github.com') is None
+
+
+@pytest.mark.parametrize('http_date', [False, True])
+def test_retry_after(http_date):
+    retry_after = '100'
+    if http_date:
+        retry_after = email.utils.formatdate(time.time() + 100, usegmt=True)
+    rate_limiter = RateLimiter()
+    rate_limiter.acquire('hub.docker.com')
+    rate_limiter.update('hub.docker.com', 429, {'Retry-After': retry_after})
+    assert 98 < rate_limiter.delay('hub.docker.com') <= 100
+    assert rate_limiter.remaining('hub.docker.com') is None
+
+
+def test_default_backoff():
+    rate_limiter = RateLimiter(default_backoff=50)
+    rate_limiter.acquire('hub.docker.com')
+    rate_limiter.update('hub.docker.com', 429, {})
+    assert 48 < rate_limiter.delay('hub.docker.com') <= 50
+    # hosts which don't report rate limits are never throttled
+    rate_limiter.acquire('www.reddit.com')
+    rate_limiter.update('www.reddit.com', 200, {})
+    assert rate_limiter.delay('www.reddit.com') == 0
+    assert rate_limiter.get_budgets() == {'hub.docker.com': None,
+                                          'www.reddit.com': None}
+
+
+def test_max_wait():
+    rate_limiter = RateLimiter(max_wait=10)
+    rate_limiter.acquire('api.github.com')
+    rate_limiter.update('api.github.com', 200, {
+        'X-RateLimit-Remaining': '0',
+        'X-RateLimit-Reset': str(int(time.time()) + 100)
+    })
+    with pytest.raises(RateLimitError):
+        rate_limiter.acquire('api.github.com')
+
+
+def test_client_exhausted_budget(http_stub):
+    http_stub.responses = [(200, {
+        'Content-Type': 'application/json', 'X-RateLimit-Remaining': '0',
+        'X-RateLimit-Reset': str(int(time.time()) + 1000)
+    }, b'{"stars": 1}')]
+    client = HTTPClient(rate_limiter=RateLimiter())
+    assert client.get_json(http_stub.url) == {'stars': 1}
+    # the request isn't sent until the rate limit is reset
+    with pytest.raises(RateLimitError):
+        client.get_json(http_stub.url)
+    assert len(http_stub.requests) == 1
+
+
+def test_client_retries_throttled_request(http_stub):
+    http_stub.responses = [
+        (429, {'Retry-After': '1'}, b''),
+        (200, {'Content-Type': 'application/json'}, b'{"stars": 1}')
+    ]
+    client = HTTPClient(rate_limiter=RateLimiter())
+    start = time.monotonic()
+    assert client.get_json(http_stub.url) == {'stars': 1}
+    assert time.monotonic() - start >= 0.9
+    assert len(http_stub.requests) == 2
+
+
+def test_fetch_order():
+    rate_limiter = RateLimiter()
+    rate_limiter.acquire('api.github.com')
+    rate_limiter.update('api.github.com', 200, {
+        'X-RateLimit-Remaining': '0',
+        'X-RateLimit-Reset': str(int(time.time()) + 100)
+    })
+    targets = [('api.github.com', 'almalinux'),
+               ('hub.docker.com', 'almalinux')]
+    results = fetch_concurrently(lambda host, org: host, targets,
+                                 get_host=lambda target: target[0],
+                                 max_workers=1, rate_limiter=rate_limiter)
+    # targets of hosts with a request budget left are processed first
+    assert [host for _, host in results] == ['hub.docker.com',
+                                             'api.github.com']
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""Reddit sensor requests count tests."""
+
+import json
+
+from almawitness.sensors import reddit
+
+
+def run_sensor(broker, *args: str) -> dict:
+    reddit.main([*args, '-s', '127.0.0.1', '-p', str(broker.port),
+                 '--deadline', '0', '--no-self-stats'])
+    return {topic: json.loads(payload) for topic, payload in broker.messages}
+
+
+def test_bulk_requests(broker, upstream):
+    names = [f'subreddit-{i}' for i in range(250)]
+    messages = run_sensor(broker, '-r', *names)
+    # 100 subreddits per an /api/info request, no about pages
+    assert upstream.requests == 3
+    assert len(messages) == 250
+    stats = messages['stats/social/reddit/subreddit-0']
+    assert 'total_users' in stats
+    assert 'active_users' not in stats
+
+
+def test_active_users(broker, upstream):
+    names = [f'subreddit-{i}' for i in range(3)]
+    messages = run_sensor(broker, '-r', *names, '--active-users')
+    # one about page request per subreddit, no /api/info requests
+    assert upstream.requests == 3
+    assert len(messages) == 3
+    assert any('active_users' in stats for stats in messages.values())
+    assert all('total_users' in stats for stats in messages.values())
+
+
+def test_case_insensitive_duplicates(broker, upstream):
+    messages = run_sensor(broker, '-r', 'AlmaLinux', 'almalinux', 'CentOS')
+    assert upstream.requests == 1
+    assert sorted(messages) == ['stats/social/reddit/AlmaLinux',
+                                'stats/social/reddit/CentOS']
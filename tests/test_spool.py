@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""Spool and spooled publishing tests."""
+
+import argparse
+import json
+import os
+import socket
+
+from almawitness.sensors.common import (
+    add_mqtt_arg_parser_args,
+    drain_spool,
+    file_lock,
+    mqtt_publisher,
+    open_publisher,
+    Spool
+)
+
+
+def get_closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def parse_spool_args(port: int, spool_path: str) -> argparse.Namespace:
+    arg_parser = argparse.ArgumentParser()
+    add_mqtt_arg_parser_args(arg_parser)
+    return arg_parser.parse_args(['-s', '127.0.0.1', '-p', str(port),
+                                  '--spool', spool_path])
+
+
+def test_persistence(cache_dir):
+    db_path = os.path.join(cache_dir, 'spool.db')
+    spool = Spool(db_path, buffer_size=2)
+    for i in range(3):
+        spool.publish(f'stats/test/{i}', {'value': i})
+    assert len(spool) == 3
+    # buffered messages are written on close
+    spool.close()
+    spool = Spool(db_path)
+    try:
+        assert len(spool) == 3
+        assert [(topic, message) for _, topic, message
+                in spool.get_batch(10)] == \
+            [(f'stats/test/{i}', {'value': i}) for i in range(3)]
+        batch = spool.get_batch(2)
+        spool.delete(batch[-1][0])
+        assert [topic for _, topic, _ in spool.get_batch(10)] == \
+            ['stats/test/2']
+    finally:
+        spool.close()
+
+
+def test_capacity_eviction(cache_dir):
+    spool = Spool(os.path.join(cache_dir, 'spool.db'), max_messages=5,
+                  buffer_size=3)
+    try:
+        for i in range(8):
+            spool.publish(f'stats/test/{i}', {'value': i})
+        spool.flush()
+        # the oldest messages are dropped first
+        assert len(spool) == 5
+        assert [message['value'] for _, _, message
+                in spool.get_batch(10)] == [3, 4, 5, 6, 7]
+    finally:
+        spool.close()
+
+
+def test_replay(broker, cache_dir):
+    spool = Spool(os.path.join(cache_dir, 'spool.db'))
+    try:
+        for i in range(25):
+            spool.publish(f'stats/test/{i}', {'value': i})
+        with mqtt_publisher('127.0.0.1', broker.port) as publisher:
+            assert drain_spool(spool, publisher, batch_size=10) == 25
+        assert len(spool) == 0
+    finally:
+        spool.close()
+    assert [json.loads(payload)['value'] for _, payload in broker.messages] \
+        == list(range(25))
+
+
+def test_replay_lock(broker, cache_dir):
+    spool = Spool(os.path.join(cache_dir, 'spool.db'))
+    try:
+        spool.publish('stats/test', {'value': 1})
+        # the spool is drained by another process
+        with file_lock(f'{spool.db_path}.lock'):
+            with mqtt_publisher('127.0.0.1', broker.port) as publisher:
+                assert drain_spool(spool, publisher) == 0
+        assert len(spool) == 1
+    finally:
+        spool.close()
+    assert broker.messages == []
+
+
+def test_spooled_publisher(broker, cache_dir):
+    spool_path = os.path.join(cache_dir, 'spool.db')
+    # messages are kept while the MQTT server is unavailable
+    with open_publisher(parse_spool_args(get_closed_port(),
+                                         spool_path)) as publisher:
+        publisher.publish('stats/test/first', {'value': 1})
+    with open_publisher(parse_spool_args(broker.port,
+                                         spool_path)) as publisher:
+        publisher.publish('stats/test/second', {'value': 2})
+    assert [topic for topic, _ in broker.messages] == \
+        ['stats/test/first', 'stats/test/second']
+    spool = Spool(spool_path)
+    try:
+        assert len(spool) == 0
+    finally:
+        spool.close()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- mode:python; coding:utf-8; -*-
+# author: agent <agent@local>
+# created: 2026-10-17
+
+"""ValidatorCache and conditional JSON requests tests."""
+
+import os
+
+import pytest
+
+from almawitness.sensors.common import HTTPClient, ValidatorCache
+
+
+@pytest.fixture
+def client(cache_dir):
+    cache = ValidatorCache(os.path.join(cache_dir, 'http-cache.db'))
+    client = HTTPClient(cache=cache)
+    yield client
+    client.close()
+
+
+def test_get_key():
+    url = 'https://api.github.com/orgs/almalinux/repos'
+    assert ValidatorCache.get_key(url) == url
+    assert ValidatorCache.get_key(url, {'Accept': 'application/json'}) == url
+    key = ValidatorCache.get_key(url, {'authorization': 'token secret'})
+    assert key.startswith(f'{url} ')
+    assert 'secret' not in key
+    assert key == ValidatorCache.get_key(url, {'Authorization':
+                                               'token secret'})
+    assert key != ValidatorCache.get_key(url, {'Authorization':
+                                               'token other'})
+
+
+def test_conditional_request(client, http_stub):
+    http_stub.responses = [
+        (200, {'Content-Type': 'application/json', 'ETag': '"v1"'},
+         b'{"stars": 1}'),
+        (304, {'ETag': '"v1"'}, b'')
+    ]
+    assert client.get_json(http_stub.url) == {'stars': 1}
+    assert client.get_json(http_stub.url) == {'stars': 1}
+    (_, first), (_, second) = http_stub.requests
+    assert 'If-None-Match' not in first
+    assert second['If-None-Match'] == '"v1"'
+
+
+def test_credentials(client, http_stub):
+    http_stub.responses = [
+        (200, {'Content-Type': 'application/json', 'ETag': '"private"'},
+         b'["public", "private"]'),
+        (200, {'Content-Type': 'application/json', 'ETag': '"public"'},
+         b'["public"]'),
+        (304, {'ETag': '"private"'}, b'')
+    ]
+    token = {'Authorization': 'token secret'}
+    assert client.get_json(http_stub.url, headers=token) == \
+        ['public', 'private']
+    # a response for other credentials isn't reused
+    assert client.get_json(http_stub.url) == ['public']
+    assert client.get_json(http_stub.url, headers=token) == \
+        ['public', 'private']
+    headers = [headers for _, headers in http_stub.requests]
+    assert 'If-None-Match' not in headers[1]
+    assert headers[2]['If-None-Match'] == '"private"'